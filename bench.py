@@ -0,0 +1,743 @@
+"""
+Benchmarks the SFI workflow against a local dev chain.
+
+Deploys stand-in contracts (a WETH-style wSFI, ERC-20 aimm/usdc, a V2
+factory/router and a staking contract) on eth-tester or any local node such
+as anvil, points SFI at them and reports wall time, RPC calls and gas per
+operation and per full run() for a number of wallets.
+
+Requires py-solc-x to compile the stand-ins (pip install py-solc-x) and, for
+the default backend, eth-tester (pip install "eth-tester[py-evm]").
+
+	python3 bench.py
+	python3 bench.py --rpc http://127.0.0.1:8545 --wallets 1 10 100 -w 8
+	python3 bench.py --json bench_output.json
+"""
+from web3 import Web3
+from web3.middleware import Web3Middleware
+from eth_account import Account
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from collections import Counter
+import argparse, json, logging, os, subprocess, sys, threading, time
+
+import sfis
+
+SOLC_VERSION = "0.8.24"
+
+SOURCE = """
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+contract ERC20 {
+	string public name;
+	string public symbol;
+	uint8 public constant decimals = 18;
+	uint256 public totalSupply;
+	mapping(address => uint256) public balanceOf;
+	mapping(address => mapping(address => uint256)) public allowance;
+
+	event Transfer(address indexed from, address indexed to, uint256 value);
+	event Approval(address indexed owner, address indexed spender, uint256 value);
+
+	constructor(string memory _name, string memory _symbol) {
+		name = _name;
+		symbol = _symbol;
+	}
+
+	function approve(address spender, uint256 amount) external returns (bool) {
+		allowance[msg.sender][spender] = amount;
+		emit Approval(msg.sender, spender, amount);
+		return true;
+	}
+
+	function transfer(address to, uint256 amount) external returns (bool) {
+		_transfer(msg.sender, to, amount);
+		return true;
+	}
+
+	function transferFrom(address from, address to, uint256 amount) external returns (bool) {
+		uint256 allowed = allowance[from][msg.sender];
+		if (allowed != type(uint256).max) {
+			allowance[from][msg.sender] = allowed - amount;
+		}
+		_transfer(from, to, amount);
+		return true;
+	}
+
+	function _transfer(address from, address to, uint256 amount) internal {
+		balanceOf[from] -= amount;
+		balanceOf[to] += amount;
+		emit Transfer(from, to, amount);
+	}
+
+	function _mint(address to, uint256 amount) internal {
+		totalSupply += amount;
+		balanceOf[to] += amount;
+		emit Transfer(address(0), to, amount);
+	}
+
+	function _burn(address from, uint256 amount) internal {
+		balanceOf[from] -= amount;
+		totalSupply -= amount;
+		emit Transfer(from, address(0), amount);
+	}
+}
+
+contract Token is ERC20 {
+	constructor(string memory _name, string memory _symbol) ERC20(_name, _symbol) {}
+
+	function mint(address to, uint256 amount) external {
+		_mint(to, amount);
+	}
+}
+
+contract WSFI is ERC20 {
+	constructor() ERC20("Wrapped SFI", "wSFI") {}
+
+	function deposit() external payable {
+		_mint(msg.sender, msg.value);
+	}
+
+	function withdraw(uint256 amount) external {
+		_burn(msg.sender, amount);
+		payable(msg.sender).transfer(amount);
+	}
+}
+
+contract Staking {
+	struct UserInfo {
+		uint256 amount;
+		uint256 start;
+		uint256 end;
+		uint256 rewards;
+	}
+
+	ERC20 public immutable token;
+	mapping(address => UserInfo) public userInfo;
+
+	constructor(ERC20 _token) {
+		token = _token;
+	}
+
+	function deposit(uint256 _amount, uint256 _lockingPeriod) external {
+		token.transferFrom(msg.sender, address(this), _amount);
+		UserInfo storage user = userInfo[msg.sender];
+		user.amount += _amount;
+		if (user.end <= user.start) {
+			user.start = block.timestamp;
+			user.end = block.timestamp + _lockingPeriod;
+		}
+	}
+
+	function withdraw(uint256 _amount) public {
+		userInfo[msg.sender].amount -= _amount;
+		token.transfer(msg.sender, _amount);
+	}
+
+	function claim() public {
+		userInfo[msg.sender].rewards = 0;
+	}
+
+	function withdrawAndClaim(uint256 _amount) external {
+		withdraw(_amount);
+		claim();
+	}
+}
+
+contract Pair is ERC20 {
+	address public token0;
+	address public token1;
+	uint112 private reserve0;
+	uint112 private reserve1;
+	uint32 private blockTimestampLast;
+
+	event Sync(uint112 reserve0, uint112 reserve1);
+
+	constructor() ERC20("Citea LP", "CLP") {}
+
+	function initialize(address _token0, address _token1) external {
+		require(token0 == address(0), "INITIALIZED");
+		token0 = _token0;
+		token1 = _token1;
+	}
+
+	function getReserves() public view returns (uint112, uint112, uint32) {
+		return (reserve0, reserve1, blockTimestampLast);
+	}
+
+	function mint(address to) external returns (uint256 liquidity) {
+		uint256 amount0 = ERC20(token0).balanceOf(address(this)) - reserve0;
+		uint256 amount1 = ERC20(token1).balanceOf(address(this)) - reserve1;
+		if (totalSupply == 0) {
+			liquidity = _sqrt(amount0 * amount1);
+		} else {
+			uint256 liquidity0 = amount0 * totalSupply / reserve0;
+			uint256 liquidity1 = amount1 * totalSupply / reserve1;
+			liquidity = liquidity0 < liquidity1 ? liquidity0 : liquidity1;
+		}
+		require(liquidity > 0, "INSUFFICIENT_LIQUIDITY_MINTED");
+		_mint(to, liquidity);
+		_update();
+	}
+
+	function burn(address to) external returns (uint256 amount0, uint256 amount1) {
+		uint256 liquidity = balanceOf[address(this)];
+		amount0 = liquidity * ERC20(token0).balanceOf(address(this)) / totalSupply;
+		amount1 = liquidity * ERC20(token1).balanceOf(address(this)) / totalSupply;
+		_burn(address(this), liquidity);
+		ERC20(token0).transfer(to, amount0);
+		ERC20(token1).transfer(to, amount1);
+		_update();
+	}
+
+	function swap(uint256 amount0Out, uint256 amount1Out, address to) external {
+		require(amount0Out < reserve0 && amount1Out < reserve1, "INSUFFICIENT_LIQUIDITY");
+		if (amount0Out > 0) ERC20(token0).transfer(to, amount0Out);
+		if (amount1Out > 0) ERC20(token1).transfer(to, amount1Out);
+
+		uint256 balance0 = ERC20(token0).balanceOf(address(this));
+		uint256 balance1 = ERC20(token1).balanceOf(address(this));
+		uint256 amount0In = balance0 > reserve0 - amount0Out ? balance0 - (reserve0 - amount0Out) : 0;
+		uint256 amount1In = balance1 > reserve1 - amount1Out ? balance1 - (reserve1 - amount1Out) : 0;
+		require(amount0In > 0 || amount1In > 0, "INSUFFICIENT_INPUT_AMOUNT");
+
+		uint256 adjusted0 = balance0 * 1000 - amount0In * 3;
+		uint256 adjusted1 = balance1 * 1000 - amount1In * 3;
+		require(adjusted0 * adjusted1 >= uint256(reserve0) * reserve1 * 1000000, "K");
+		_update();
+	}
+
+	function _update() private {
+		reserve0 = uint112(ERC20(token0).balanceOf(address(this)));
+		reserve1 = uint112(ERC20(token1).balanceOf(address(this)));
+		blockTimestampLast = uint32(block.timestamp);
+		emit Sync(reserve0, reserve1);
+	}
+
+	function _sqrt(uint256 y) private pure returns (uint256 z) {
+		if (y > 3) {
+			z = y;
+			uint256 x = y / 2 + 1;
+			while (x < z) {
+				z = x;
+				x = (y / x + x) / 2;
+			}
+		} else if (y != 0) {
+			z = 1;
+		}
+	}
+}
+
+contract Factory {
+	mapping(address => mapping(address => address)) public getPair;
+	address[] public allPairs;
+
+	event PairCreated(address indexed token0, address indexed token1, address pair, uint256);
+
+	function createPair(address tokenA, address tokenB) external returns (address pair) {
+		(address token0, address token1) = tokenA < tokenB ? (tokenA, tokenB) : (tokenB, tokenA);
+		require(getPair[token0][token1] == address(0), "PAIR_EXISTS");
+		Pair created = new Pair();
+		created.initialize(token0, token1);
+		pair = address(created);
+		getPair[token0][token1] = pair;
+		getPair[token1][token0] = pair;
+		allPairs.push(pair);
+		emit PairCreated(token0, token1, pair, allPairs.length);
+	}
+}
+
+contract Router {
+	Factory public immutable factory;
+
+	constructor(Factory _factory) {
+		factory = _factory;
+	}
+
+	modifier ensure(uint256 deadline) {
+		require(deadline >= block.timestamp, "EXPIRED");
+		_;
+	}
+
+	function quote(uint256 amountA, uint256 reserveA, uint256 reserveB) public pure returns (uint256) {
+		return amountA * reserveB / reserveA;
+	}
+
+	function getAmountOut(uint256 amountIn, uint256 reserveIn, uint256 reserveOut) public pure returns (uint256) {
+		uint256 amountInWithFee = amountIn * 997;
+		return amountInWithFee * reserveOut / (reserveIn * 1000 + amountInWithFee);
+	}
+
+	function getAmountsOut(uint256 amountIn, address[] memory path) public view returns (uint256[] memory amounts) {
+		amounts = new uint256[](path.length);
+		amounts[0] = amountIn;
+		for (uint256 i; i < path.length - 1; i++) {
+			(uint256 reserveIn, uint256 reserveOut) = _reserves(path[i], path[i + 1]);
+			amounts[i + 1] = getAmountOut(amounts[i], reserveIn, reserveOut);
+		}
+	}
+
+	function addLiquidity(
+		address tokenA,
+		address tokenB,
+		uint256 amountADesired,
+		uint256 amountBDesired,
+		uint256 amountAMin,
+		uint256 amountBMin,
+		address to,
+		uint256 deadline
+	) external ensure(deadline) returns (uint256 amountA, uint256 amountB, uint256 liquidity) {
+		(amountA, amountB) = _addLiquidity(tokenA, tokenB, amountADesired, amountBDesired, amountAMin, amountBMin);
+		Pair pair = _pairFor(tokenA, tokenB);
+		ERC20(tokenA).transferFrom(msg.sender, address(pair), amountA);
+		ERC20(tokenB).transferFrom(msg.sender, address(pair), amountB);
+		liquidity = pair.mint(to);
+	}
+
+	function removeLiquidity(
+		address tokenA,
+		address tokenB,
+		uint256 liquidity,
+		uint256 amountAMin,
+		uint256 amountBMin,
+		address to,
+		uint256 deadline
+	) external ensure(deadline) returns (uint256 amountA, uint256 amountB) {
+		Pair pair = _pairFor(tokenA, tokenB);
+		pair.transferFrom(msg.sender, address(pair), liquidity);
+		(uint256 amount0, uint256 amount1) = pair.burn(to);
+		(amountA, amountB) = tokenA == pair.token0() ? (amount0, amount1) : (amount1, amount0);
+		require(amountA >= amountAMin, "INSUFFICIENT_A_AMOUNT");
+		require(amountB >= amountBMin, "INSUFFICIENT_B_AMOUNT");
+	}
+
+	function swapExactTokensForTokensSupportingFeeOnTransferTokens(
+		uint256 amountIn,
+		uint256 amountOutMin,
+		address[] calldata path,
+		address to,
+		uint256 deadline
+	) external ensure(deadline) {
+		ERC20(path[0]).transferFrom(msg.sender, address(_pairFor(path[0], path[1])), amountIn);
+		uint256 balanceBefore = ERC20(path[path.length - 1]).balanceOf(to);
+		for (uint256 i; i < path.length - 1; i++) {
+			address recipient = i < path.length - 2 ? address(_pairFor(path[i + 1], path[i + 2])) : to;
+			_swapHop(path[i], path[i + 1], recipient);
+		}
+		require(ERC20(path[path.length - 1]).balanceOf(to) - balanceBefore >= amountOutMin, "INSUFFICIENT_OUTPUT_AMOUNT");
+	}
+
+	function _addLiquidity(
+		address tokenA,
+		address tokenB,
+		uint256 amountADesired,
+		uint256 amountBDesired,
+		uint256 amountAMin,
+		uint256 amountBMin
+	) internal returns (uint256 amountA, uint256 amountB) {
+		if (factory.getPair(tokenA, tokenB) == address(0)) {
+			factory.createPair(tokenA, tokenB);
+		}
+		(uint256 reserveA, uint256 reserveB) = _reserves(tokenA, tokenB);
+		if (reserveA == 0 && reserveB == 0) {
+			return (amountADesired, amountBDesired);
+		}
+		uint256 amountBOptimal = quote(amountADesired, reserveA, reserveB);
+		if (amountBOptimal <= amountBDesired) {
+			require(amountBOptimal >= amountBMin, "INSUFFICIENT_B_AMOUNT");
+			return (amountADesired, amountBOptimal);
+		}
+		uint256 amountAOptimal = quote(amountBDesired, reserveB, reserveA);
+		require(amountAOptimal >= amountAMin, "INSUFFICIENT_A_AMOUNT");
+		return (amountAOptimal, amountBDesired);
+	}
+
+	function _swapHop(address input, address output, address to) internal {
+		Pair pair = _pairFor(input, output);
+		(uint256 reserveIn, uint256 reserveOut) = _reserves(input, output);
+		uint256 amountOutput = getAmountOut(ERC20(input).balanceOf(address(pair)) - reserveIn, reserveIn, reserveOut);
+		if (input == pair.token0()) {
+			pair.swap(0, amountOutput, to);
+		} else {
+			pair.swap(amountOutput, 0, to);
+		}
+	}
+
+	function _pairFor(address tokenA, address tokenB) internal view returns (Pair pair) {
+		pair = Pair(factory.getPair(tokenA, tokenB));
+		require(address(pair) != address(0), "NO_PAIR");
+	}
+
+	function _reserves(address tokenA, address tokenB) internal view returns (uint256 reserveA, uint256 reserveB) {
+		Pair pair = _pairFor(tokenA, tokenB);
+		(uint112 reserve0, uint112 reserve1, ) = pair.getReserves();
+		(reserveA, reserveB) = tokenA == pair.token0() ? (uint256(reserve0), uint256(reserve1)) : (uint256(reserve1), uint256(reserve0));
+	}
+}
+"""
+
+# Same amounts as `sfis.py -i -a`
+CONFIG = {
+	"wrapAmount": int(0.02 * 10**18),
+	"unwrapAmount": int(0.01 * 10**18),
+	"stakeAmount": int(0.01 * 10**18),
+	"unstakeAmount": int(0.01 * 10**18),
+	"bridgeAmount": int(0.02 * 10**18),
+	"citeaConfig": {
+		"pair": ["wsfi", "aimm"],
+		"swapAmount": int(0.015 * 10**18),
+		"addLiquidityAmount": int(0.01 * 10**18),
+		"removeLiquidityPerc": 0.2,
+		"slippage": 0.02
+	},
+	"withdrawalDb": ":memory:"
+}
+
+# What every benchmark wallet starts with
+WALLET_NATIVE = 10**18
+WALLET_WSFI = 10**18
+# Initial pool liquidity per token
+POOL_LIQUIDITY = 1000 * 10**18
+
+logger = logging.getLogger("bench")
+
+
+class RPCCounter:
+	"""
+	Counts JSON-RPC calls by method, and round trips (a batch counts once).
+	"""
+	def __init__(self) -> None:
+		self._lock = threading.Lock()
+		self.calls = Counter()
+		self.round_trips = 0
+
+	def snapshot(self) -> tuple:
+		with self._lock:
+			return Counter(self.calls), self.round_trips
+
+	def since(self, snapshot: tuple) -> dict:
+		calls, round_trips = self.snapshot()
+		calls.subtract(snapshot[0])
+		return {'calls': sum(calls.values()), 'roundTrips': round_trips - snapshot[1], 'byMethod': {method: count for method, count in sorted(calls.items()) if count}}
+
+	def middleware(self):
+		counter = self
+
+		class _Middleware(Web3Middleware):
+			def wrap_make_request(self, make_request):
+				def middleware(method, params):
+					with counter._lock:
+						counter.calls[method] += 1
+						counter.round_trips += 1
+					return make_request(method, params)
+				return middleware
+
+			def wrap_make_batch_request(self, make_batch_request):
+				def middleware(requests_info):
+					with counter._lock:
+						counter.calls.update(method for method, _ in requests_info)
+						counter.round_trips += 1
+					return make_batch_request(requests_info)
+				return middleware
+
+		return _Middleware
+
+
+class CrymboStub(BaseHTTPRequestHandler):
+	"""
+	Answers the Crymbo travel rules call locally, so runs don't leave the machine.
+	"""
+	def do_GET(self) -> None:
+		body = json.dumps({"msg": "Points added"}).encode()
+		self.send_response(200)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, *args) -> None:
+		pass
+
+
+def compileContracts() -> dict:
+	"""
+	Compiles the stand-in contracts. Returns {name: (abi, bytecode)}.
+	"""
+	try:
+		import solcx
+	except ImportError:
+		raise SystemExit("bench.py needs py-solc-x to compile the stand-in contracts: pip install py-solc-x")
+
+	if SOLC_VERSION not in [str(version) for version in solcx.get_installed_solc_versions()]:
+		logger.info(f"Installing solc {SOLC_VERSION}...")
+		solcx.install_solc(SOLC_VERSION)
+
+	compiled = solcx.compile_source(SOURCE, output_values=["abi", "bin"], solc_version=SOLC_VERSION, evm_version="paris")
+	return {name.split(":")[-1]: (output["abi"], output["bin"]) for name, output in compiled.items()}
+
+
+def connect(rpc: str = None) -> Web3:
+	if rpc:
+		web3 = Web3(Web3.HTTPProvider(rpc))
+	else:
+		try:
+			from web3 import EthereumTesterProvider
+			web3 = Web3(EthereumTesterProvider())
+		except Exception as e:
+			raise SystemExit(f"eth-tester is not available ({e}): pip install \"eth-tester[py-evm]\", or pass --rpc")
+
+	if not web3.is_connected():
+		raise SystemExit(f"Couldn't connect to {rpc or 'eth-tester'}.")
+	return web3
+
+
+def transact(web3: Web3, call, sender: str, value: int = 0):
+	tx_hash = call.transact({"from": sender, "value": value})
+	receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+	if receipt.status != 1:
+		raise RuntimeError(f"Setup transaction {tx_hash.hex()} reverted.")
+	return receipt
+
+
+def deploy(web3: Web3, artifacts: dict) -> dict:
+	"""
+	Deploys the stand-ins, seeds the wsfi/aimm and wsfi/usdc pools and returns
+	a copy of CONTRACTS pointing at them.
+	"""
+	deployer = web3.eth.accounts[0]
+
+	def _deploy(name: str, *args):
+		abi, bytecode = artifacts[name]
+		receipt = transact(web3, web3.eth.contract(abi=abi, bytecode=bytecode).constructor(*args), deployer)
+		return web3.eth.contract(address=receipt.contractAddress, abi=abi)
+
+	wsfi = _deploy("WSFI")
+	aimm = _deploy("Token", "AIMM", "AIMM")
+	usdc = _deploy("Token", "USD Coin", "USDC")
+	stake = _deploy("Staking", wsfi.address)
+	factory = _deploy("Factory")
+	router = _deploy("Router", factory.address)
+
+	transact(web3, wsfi.functions.deposit(), deployer, value=2 * POOL_LIQUIDITY)
+	for token in (aimm, usdc):
+		transact(web3, token.functions.mint(deployer, POOL_LIQUIDITY), deployer)
+		transact(web3, token.functions.approve(router.address, 2**256 - 1), deployer)
+		transact(web3, wsfi.functions.approve(router.address, 2**256 - 1), deployer)
+		transact(web3, router.functions.addLiquidity(wsfi.address, token.address, POOL_LIQUIDITY, POOL_LIQUIDITY, 0, 0, deployer, 2**256 - 1), deployer)
+
+	addresses = {'wsfi': wsfi, 'aimm': aimm, 'usdc': usdc, 'stake': stake, 'citeaFactory': factory, 'citeaRouter': router}
+	contracts = {network: dict(keys) for network, keys in sfis.CONTRACTS.items()}
+	for key, contract in addresses.items():
+		contracts['sfi'][key] = sfis.ContractEntry(contract.address, key)
+	return contracts
+
+
+def fundWallets(web3: Web3, contracts: dict, count: int) -> list:
+	"""
+	Creates `count` wallets holding WALLET_NATIVE and WALLET_WSFI. Returns their private keys.
+	"""
+	deployer = web3.eth.accounts[0]
+	wsfi = web3.eth.contract(address=contracts['sfi']['wsfi']['ca'], abi=contracts['sfi']['wsfi']['abi'])
+	transact(web3, wsfi.functions.deposit(), deployer, value=count * WALLET_WSFI)
+
+	keys = []
+	for _ in range(count):
+		account = Account.create()
+		web3.eth.wait_for_transaction_receipt(web3.eth.send_transaction({"from": deployer, "to": account.address, "value": WALLET_NATIVE}))
+		transact(web3, wsfi.functions.transfer(account.address, WALLET_WSFI), deployer)
+		keys.append(account.key.hex())
+	return keys
+
+
+def gasUsed(web3: Web3, from_block: int, to_block: int, senders: set = None) -> int:
+	"""
+	Sums the gas of the transactions mined in (from_block, to_block], optionally only those sent by `senders`.
+	"""
+	total = 0
+	for number in range(from_block + 1, to_block + 1):
+		for tx_hash in web3.eth.get_block(number)['transactions']:
+			receipt = web3.eth.get_transaction_receipt(tx_hash)
+			if senders is None or receipt['from'] in senders:
+				total += receipt['gasUsed']
+	return total
+
+
+def measure(web3: Web3, counter: RPCCounter, fn, senders: set = None) -> tuple:
+	"""
+	Runs `fn` and returns (result, stats) with its wall time, RPC calls and gas.
+	`web3` must not be instrumented, so that gas accounting isn't counted.
+	"""
+	snapshot = counter.snapshot()
+	start_block = web3.eth.block_number
+	start = time.perf_counter()
+	result = fn()
+	seconds = time.perf_counter() - start
+	rpc = counter.since(snapshot)
+	return result, {'seconds': round(seconds, 4), **rpc, 'gas': gasUsed(web3, start_block, web3.eth.block_number, senders)}
+
+
+def importTime(module: str = "sfis", samples: int = 3) -> tuple:
+	"""
+	Best time to import `module` in a fresh interpreter, as (total, module's own), the
+	total including its dependencies but not the interpreter's startup.
+	"""
+	def _run(code: str, *flags) -> tuple:
+		start = time.perf_counter()
+		output = subprocess.run([sys.executable, *flags, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)), check=True, capture_output=True, text=True)
+		return time.perf_counter() - start, output.stderr
+
+	baseline = min(_run("pass")[0] for _ in range(samples))
+	total = min(_run(f"import {module}")[0] for _ in range(samples)) - baseline
+	own = min(
+		int(line.split("|")[0].split(":")[1]) / 1e6
+		for _ in range(samples)
+		for line in _run(f"import {module}", "-X", "importtime")[1].splitlines()
+		if line.rstrip().endswith(f"| {module}")
+	)
+	return max(total, 0), own
+
+
+def benchStartup(web3: Web3, contracts: dict, rpc: str = None) -> dict:
+	"""
+	Measures what a -pk run pays before its first transaction: importing sfis, then
+	building a fresh chain context and wallet and submitting a wrap. With --rpc the
+	context opens its own endpoint pools, as a real run does.
+	"""
+	key = fundWallets(web3, contracts, 1)[0]
+	fresh = {network: {name: sfis.ContractEntry(entry['ca'], entry.name) for name, entry in entries.items()} for network, entries in contracts.items()}
+	sfis.loadABI.cache_clear()
+	networks = {'rpc_urls': {'sfi': [rpc], 'sep': [rpc]}} if rpc else {'web3': {network: Web3(web3.provider) for network in ("sfi", "sep")}}
+
+	start = time.perf_counter()
+	context = sfis.ChainContext(contracts=fresh, **networks)
+	sfi = sfis.SFI(key, context=context)
+	built = time.perf_counter()
+	with sfi.pipeline():
+		result = sfi.wrap(CONFIG["wrapAmount"])
+	submitted = time.perf_counter()
+	sfi.collectReceipts()
+	total_import, own_import = importTime()
+
+	return {
+		'status': result['status'],
+		'import': round(total_import, 4),
+		'importOwn': round(own_import, 4),
+		'context': round(built - start, 4),
+		'firstTx': round(submitted - start, 4),
+		'networksOpened': sorted(context.web3.connected()) if rpc else None
+	}
+
+
+def benchOperations(web3: Web3, counter: RPCCounter, contracts: dict) -> dict:
+	"""
+	Runs each workflow operation once on a fresh wallet.
+	"""
+	key = fundWallets(web3, contracts, 1)[0]
+	sfi = sfis.SFI(key)
+	citea = CONFIG["citeaConfig"]
+	operations = [
+		(sfi.wrap, CONFIG["wrapAmount"]),
+		(sfi.unwrap, CONFIG["unwrapAmount"]),
+		(sfi.stake, CONFIG["stakeAmount"]),
+		(sfi.unstake, CONFIG["unstakeAmount"]),
+		(sfi.claim,),
+		(sfi.swap, citea["swapAmount"], citea["pair"], citea["slippage"]),
+		(sfi.addLiquidity, citea["addLiquidityAmount"], citea["pair"], citea["slippage"]),
+		(sfi.removeLiquidity, citea["removeLiquidityPerc"], citea["pair"], citea["slippage"]),
+		(sfi.crymboTravelRules,),
+	]
+
+	results = {}
+	for operation, *args in operations:
+		result, stats = measure(web3, counter, lambda: operation(*args), {sfi.address})
+		results[operation.__name__] = {'status': result['status'], **stats}
+	return results
+
+
+def benchRuns(web3: Web3, counter: RPCCounter, contracts: dict, wallet_counts: list, workers: int, pipeline: bool) -> list:
+	"""
+	Runs the full daily workflow for each number of wallets.
+	"""
+	results = []
+	for count in wallet_counts:
+		keys = fundWallets(web3, contracts, count)
+		senders = {Account.from_key(key).address for key in keys}
+		summaries, stats = measure(web3, counter, lambda: sfis.runMany(keys, CONFIG, 0, min(workers, count), pipeline), senders)
+		completed = sum(1 for summary in summaries if summary['status'] == 'success')
+		results.append({
+			'wallets': count,
+			'completed': completed,
+			**stats,
+			'perWallet': {'seconds': round(stats['seconds'] / count, 4), 'calls': stats['calls'] / count, 'gas': stats['gas'] // count}
+		})
+	return results
+
+
+def gitRevision() -> str:
+	try:
+		return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+	except Exception:
+		return None
+
+
+def printReport(report: dict) -> None:
+	startup = report['startup']
+	print(f"startup: import {startup['import']:.3f}s ({startup['importOwn']:.3f}s in sfis itself), context + wallet {startup['context']:.3f}s, first tx submitted after {startup['firstTx']:.3f}s ({startup['status']})")
+	print()
+	print(f"{'operation':<20}{'status':>10}{'seconds':>10}{'calls':>8}{'trips':>8}{'gas':>12}")
+	for name, stats in report['operations'].items():
+		print(f"{name:<20}{stats['status']:>10}{stats['seconds']:>10.3f}{stats['calls']:>8}{stats['roundTrips']:>8}{stats['gas']:>12}")
+	print()
+	print(f"{'wallets':<10}{'completed':>10}{'seconds':>10}{'calls':>8}{'trips':>8}{'gas':>14}{'s/wallet':>10}{'calls/wallet':>14}")
+	for run in report['runs']:
+		print(f"{run['wallets']:<10}{run['completed']:>10}{run['seconds']:>10.2f}{run['calls']:>8}{run['roundTrips']:>8}{run['gas']:>14}{run['perWallet']['seconds']:>10.3f}{run['perWallet']['calls']:>14.1f}")
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Benchmarks the SFI workflow against a local dev chain', add_help=True)
+	parser.add_argument("--rpc", type=str, help="HTTP endpoint of a local node with unlocked, funded accounts, e.g. anvil (default: in-process eth-tester)")
+	parser.add_argument("--wallets", type=int, nargs="+", default=[1, 10, 100], help="wallet counts to run the full workflow for (default: 1 10 100)")
+	parser.add_argument("-w", "--workers", type=int, default=1, help="wallets to run concurrently; keep 1 with eth-tester (default: 1)")
+	parser.add_argument("--pipeline", action="store_true", help="run the workflow with --pipeline")
+	parser.add_argument("--json", type=str, help="also write the report to this file")
+	parser.add_argument("-v", "--verbose", action="store_true", help="show the workflow logs")
+
+	args = parser.parse_args()
+	logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+	logger.setLevel(logging.INFO)
+
+	artifacts = compileContracts()
+	web3 = connect(args.rpc)
+	contracts = deploy(web3, artifacts)
+
+	# SFI gets its own instrumented Web3 per network on the same provider.
+	counter = RPCCounter()
+	instrumented = {network: Web3(web3.provider) for network in ("sfi", "sep")}
+	for network_web3 in instrumented.values():
+		network_web3.middleware_onion.add(counter.middleware(), "rpc_counter")
+	sfis.ChainContext.configure(contracts=contracts, web3=instrumented)
+
+	server = ThreadingHTTPServer(("127.0.0.1", 0), CrymboStub)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	sfis.CRYMBO_API = f"http://127.0.0.1:{server.server_address[1]}"
+
+	report = {
+		'timestamp': int(time.time()),
+		'revision': gitRevision(),
+		'backend': args.rpc or 'eth-tester',
+		'workers': args.workers,
+		'pipeline': args.pipeline,
+		'startup': benchStartup(web3, contracts, args.rpc),
+		'operations': benchOperations(web3, counter, contracts),
+		'runs': benchRuns(web3, counter, contracts, args.wallets, args.workers, args.pipeline)
+	}
+	server.shutdown()
+
+	printReport(report)
+	if args.json:
+		with open(args.json, "w") as f:
+			json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+	main()
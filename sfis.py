@@ -1,560 +1,3749 @@
 # SingularityFinance Script
 # Github: https://github.com/ddatnee/sfis
 
-from web3 import Web3
-import requests, json, argparse, time, logging
-from typing import Dict
+from web3 import Web3, AsyncWeb3, WebSocketProvider
+from web3.exceptions import TimeExhausted, TransactionNotFound, ContractLogicError, ContractCustomError, Web3RPCError
+from web3.middleware import Web3Middleware
+from web3.providers import JSONBaseProvider, HTTPProvider
+from web3.providers.rpc import AsyncHTTPProvider
+from web3.providers.async_base import AsyncJSONBaseProvider
+from eth_account import Account
+from eth_utils.abi import collapse_if_tuple
+from eth_abi import decode as abi_decode
+from hexbytes import HexBytes
+import requests, aiohttp, asyncio, json, argparse, time, random, logging, threading, contextvars, sqlite3, bisect, atexit, hashlib, functools, os, heapq, collections, signal
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeout, wait as waitFutures, as_completed, FIRST_COMPLETED
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+from types import MappingProxyType
+from typing import Dict, Iterable
+from collections.abc import Mapping
+
+# Per-wallet log prefix, set by run() for the wallet being processed in the current thread
+wallet_label = contextvars.ContextVar("wallet_label", default="")
+# Operation in progress, set by executeOperation so metrics can attribute calls to it
+current_operation = contextvars.ContextVar("current_operation", default="")
+
+_record_factory = logging.getLogRecordFactory()
+
+def _walletRecordFactory(*args, **kwargs) -> logging.LogRecord:
+	record = _record_factory(*args, **kwargs)
+	label = wallet_label.get()
+	record.wallet = f"[{label}] " if label else ""
+	return record
+
+logging.setLogRecordFactory(_walletRecordFactory)
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] %(message)s')
+logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] %(wallet)s%(message)s')
 logger = logging.getLogger(__name__)
 
-class SFI:
-	def __init__(self, private_key: str) -> None:
+# Directory of the contract ABIs, one JSON file per CONTRACTS entry
+ABI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "abis")
+
+@functools.lru_cache(maxsize=None)
+def loadABI(name: str) -> list:
+	"""
+	Reads abis/<name>.json, once per process.
+	"""
+	with open(os.path.join(ABI_DIR, f"{name}.json"), "r") as f:
+		return json.load(f)
+
+class ContractEntry(dict):
+	"""
+	A CONTRACTS entry. Its 'abi' is read from abis/<name>.json the first time it is looked up.
+	"""
+	def __init__(self, ca: str, name: str) -> None:
+		super().__init__(ca=ca)
+		self.name = name
+
+	def __missing__(self, key: str):
+		if key != 'abi':
+			raise KeyError(key)
+		self['abi'] = loadABI(self.name)
+		return self['abi']
+
+CONTRACTS = {
+	'sep': {
+		'portal': ContractEntry('0x776CF4e50c7285810e4E25A79de56aA4E7116876', 'portal'),
+		'oracle': ContractEntry('0x1c56f18D964CB77743c1f6E57AcA0D9e783aDcfc', 'oracle')
+	},
+	'sfi': {
+		# Tokens
+		'wsfi': ContractEntry('0x6dC404EFd04B880B0Ab5a26eF461b63A12E3888D', 'wsfi'),
+		'aimm': ContractEntry('0xAa4aFA7C07405992e3f6799dCC260D389687077a', 'aimm'),
+		'usdc': ContractEntry('0xD2ED81BE83B33218737Ca188EB9AC28b79C6A0F3', 'usdc'),
+		# Contracts
+		'stake': ContractEntry('0x22Dbdc9e8dd7C5E409B014BBcb53a3ef39736515', 'stake'),
+		'msgpasser': ContractEntry('0x4200000000000000000000000000000000000016', 'msgpasser'),
+		'citeaRouter': ContractEntry('0xFEccff0ecf1cAa1669A71C5E00b51B48E4CBc6A1', 'citeaRouter'),
+		'citeaFactory': ContractEntry('0xd8388EECE67C003eF952D32c4E3943113C5f5608', 'citeaFactory')
+	}
+}
+
+# Minimal ABIs for contracts that aren't listed in CONTRACTS
+ERC20_ABI = [
+	{"constant":False,"inputs":[{"name":"spender","type":"address"},{"name":"value","type":"uint256"}],"name":"approve","outputs":[{"name":"","type":"bool"}],"payable":False,"stateMutability":"nonpayable","type":"function"},
+	{"constant":True,"inputs":[{"name":"account","type":"address"}],"name":"balanceOf","outputs":[{"name":"","type":"uint256"}],"payable":False,"stateMutability":"view","type":"function"},
+	{"constant":True,"inputs":[{"name":"owner","type":"address"},{"name":"spender","type":"address"}],"name":"allowance","outputs":[{"name":"","type":"uint256"}],"payable":False,"stateMutability":"view","type":"function"}
+]
+PAIR_ABI = [
+	{"constant":False,"inputs":[{"name":"guy","type":"address"},{"name":"wad","type":"uint256"}],"name":"approve","outputs":[{"name":"","type":"bool"}],"payable":False,"stateMutability":"nonpayable","type":"function"},
+	{"constant":True,"inputs":[{"name":"account","type":"address"}],"name":"balanceOf","outputs":[{"name":"","type":"uint256"}],"payable":False,"stateMutability":"view","type":"function"},
+	{"constant":True,"inputs":[{"name":"owner","type":"address"},{"name":"spender","type":"address"}],"name":"allowance","outputs":[{"name":"","type":"uint256"}],"payable":False,"stateMutability":"view","type":"function"},
+	{"constant":True,"inputs":[],"name":"totalSupply","outputs":[{"name":"","type":"uint256"}],"payable":False,"stateMutability":"view","type":"function"},
+	{"constant":True,"inputs":[],"name":"getReserves","outputs":[{"name":"_reserve0","type":"uint112"},{"name":"_reserve1","type":"uint112"},{"name":"_blockTimestampLast","type":"uint32"}],"payable":False,"stateMutability":"view","type":"function"},
+	{"anonymous":False,"inputs":[{"indexed":False,"name":"reserve0","type":"uint112"},{"indexed":False,"name":"reserve1","type":"uint112"}],"name":"Sync","type":"event"}
+]
+
+# Multicall3 is deployed at the same address on most EVM chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_ABI = [
+	{"inputs":[{"components":[{"name":"target","type":"address"},{"name":"allowFailure","type":"bool"},{"name":"callData","type":"bytes"}],"name":"calls","type":"tuple[]"}],"name":"aggregate3","outputs":[{"components":[{"name":"success","type":"bool"},{"name":"returnData","type":"bytes"}],"name":"returnData","type":"tuple[]"}],"stateMutability":"payable","type":"function"}
+]
+
+# RPC endpoints per network, overridable with rpcEndpoints in config.json
+RPC_URLS = {
+	'sfi': ["https://rpc-testnet.singularityfinance.ai"],
+	'sep': ["https://ethereum-sepolia-rpc.publicnode.com", "https://sepolia.drpc.org"]
+}
+GELATO_API = "https://api.gelato.digital/raas/public/bridge/transactions"
+CRYMBO_API = "https://oracle-partners.crymbo.io/"
+
+# Swap fee of Citea pairs, in basis points (Uniswap V2: 0.3%)
+CITEA_FEE_BPS = 30
+# How long a polled block number is reused when no newHeads subscription is running, in seconds
+BLOCK_NUMBER_TTL = 1
+# How long a block number from newHeads is trusted without a newer head, in seconds.
+# Past this, e.g. when the subscription stalls, the block number is polled again.
+HEAD_TTL = 30
+
+def sortTokens(tokenA: str, tokenB: str) -> tuple:
+	"""
+	Orders two tokens the way V2 pairs store them (token0 has the lower address).
+	"""
+	return (tokenA, tokenB) if int(tokenA, 16) < int(tokenB, 16) else (tokenB, tokenA)
+
+def getAmountOut(amountIn: int, reserveIn: int, reserveOut: int, fee_bps: int = CITEA_FEE_BPS) -> int:
+	amountInWithFee = amountIn * (10000 - fee_bps)
+	return amountInWithFee * reserveOut // (reserveIn * 10000 + amountInWithFee)
+
+def getAmountIn(amountOut: int, reserveIn: int, reserveOut: int, fee_bps: int = CITEA_FEE_BPS) -> int:
+	return reserveIn * amountOut * 10000 // ((reserveOut - amountOut) * (10000 - fee_bps)) + 1
+
+def getAmountsOut(amountIn: int, reserves: list, fee_bps: int = CITEA_FEE_BPS) -> list:
+	"""
+	Same result as the router's getAmountsOut, given the (reserveIn, reserveOut) of every hop of the path.
+	"""
+	amounts = [amountIn]
+	for reserveIn, reserveOut in reserves:
+		amounts.append(getAmountOut(amounts[-1], reserveIn, reserveOut, fee_bps))
+	return amounts
+
+def getAmountsIn(amountOut: int, reserves: list, fee_bps: int = CITEA_FEE_BPS) -> list:
+	"""
+	Same result as the router's getAmountsIn, given the (reserveIn, reserveOut) of every hop of the path.
+	"""
+	amounts = [amountOut]
+	for reserveIn, reserveOut in reversed(reserves):
+		amounts.insert(0, getAmountIn(amounts[0], reserveIn, reserveOut, fee_bps))
+	return amounts
+
+def getBurnAmounts(liquidity: int, totalSupply: int, reserveA: int, reserveB: int) -> tuple:
+	"""
+	Token amounts returned for burning `liquidity` LP tokens, as computed by the pair.
+	"""
+	return (liquidity * reserveA // totalSupply, liquidity * reserveB // totalSupply)
+
+class EventDecoder:
+	"""
+	Decodes the logs of one event. The signature hash and argument types are worked out once.
+	"""
+	def __init__(self, event_abi: dict) -> None:
+		self.name = event_abi['name']
+		types = [collapse_if_tuple(i) for i in event_abi['inputs']]
+		self.topic = bytes(Web3.keccak(text=f"{self.name}({','.join(types)})"))
+
+		indexed = [(i['name'], t) for i, t in zip(event_abi['inputs'], types) if i.get('indexed')]
+		data = [(i['name'], t) for i, t in zip(event_abi['inputs'], types) if not i.get('indexed')]
+		self.indexed_names = tuple(name for name, _ in indexed)
+		# Indexed dynamic values are only present as their keccak hash.
+		self.indexed_types = tuple('bytes32' if self._isDynamic(t) else t for _, t in indexed)
+		self.data_names = tuple(name for name, _ in data)
+		self.data_types = tuple(t for _, t in data)
+
+	@staticmethod
+	def _isDynamic(abi_type: str) -> bool:
+		return abi_type in ('string', 'bytes') or abi_type.endswith(']') or abi_type.startswith('(')
+
+	def decode(self, log) -> dict:
+		args = dict(zip(self.indexed_names, abi_decode(self.indexed_types, b''.join(log['topics'][1:]))))
+		args.update(zip(self.data_names, abi_decode(self.data_types, bytes(log['data']))))
+		return args
+
+class EventRegistry:
+	"""
+	Maps topic0 to the decoder of every event the tool reads, so that a receipt's
+	logs are decoded in one pass with a dict lookup per log.
+	"""
+	def __init__(self, abis: Iterable[list] = ()) -> None:
+		self._decoders = {}
+		for abi in abis:
+			self.register(abi)
+
+	def register(self, abi: list) -> None:
+		for item in abi:
+			if item.get('type') == 'event' and not item.get('anonymous'):
+				decoder = EventDecoder(item)
+				self._decoders[decoder.topic] = decoder
+
+	def decodeLog(self, log) -> dict:
+		"""
+		Returns {'event', 'address', 'logIndex', 'args'} for a known log, otherwise None.
+		"""
+		if not log['topics']:
+			return None
+		decoder = self._decoders.get(bytes(log['topics'][0]))
+		if decoder is None:
+			return None
+		return {'event': decoder.name, 'address': log['address'], 'logIndex': log.get('logIndex'), 'args': decoder.decode(log)}
+
+	def decodeReceipt(self, receipt, event: str = None) -> list:
+		"""
+		Decodes every known log of a receipt, optionally only those of one event.
+		"""
+		decoded = (self.decodeLog(log) for log in receipt['logs'])
+		return [entry for entry in decoded if entry is not None and (event is None or entry['event'] == event)]
+
+	def decodeReceipts(self, receipts: Iterable, event: str = None) -> Iterable:
+		"""
+		Lazily decodes many receipts, e.g. a wallet's whole bridge history. Yields (receipt, events) pairs.
+		"""
+		for receipt in receipts:
+			yield receipt, self.decodeReceipt(receipt, event)
+
+# eth_call errors that mean the transaction can't succeed from the current balance
+INSUFFICIENT_FUNDS_ERRORS = ("insufficient funds", "insufficient balance")
+
+class ErrorRegistry:
+	"""
+	Maps the selector of every custom error in the tool's ABIs to its name and argument
+	types, so a reverted simulation can report e.g. ERC20InsufficientBalance(...) instead
+	of raw revert data. The ABIs are only read when the first revert needs decoding.
+	"""
+	def __init__(self, contracts: dict) -> None:
+		self.contracts = contracts
+		self._errors = None
+		self._lock = threading.Lock()
+
+	def _load(self) -> dict:
+		with self._lock:
+			if self._errors is None:
+				errors = {}
+				abis = [entry['abi'] for network in self.contracts.values() for entry in network.values()]
+				for abi in abis + [ERC20_ABI, PAIR_ABI]:
+					for item in abi:
+						if item.get('type') == 'error':
+							types = [collapse_if_tuple(i) for i in item['inputs']]
+							selector = bytes(Web3.keccak(text=f"{item['name']}({','.join(types)})")[:4])
+							errors[selector] = (item['name'], tuple(i['name'] for i in item['inputs']), tuple(types))
+				self._errors = errors
+		return self._errors
+
+	def decode(self, data) -> dict:
+		"""
+		Returns {'name', 'args'} for revert data of a known custom error, otherwise None.
+		"""
+		data = HexBytes(data) if data else b''
+		error = self._load().get(bytes(data[:4])) if len(data) >= 4 else None
+		if error is None:
+			return None
+		name, names, types = error
+		try:
+			return {'name': name, 'args': dict(zip(names, abi_decode(types, bytes(data[4:]))))}
+		except Exception:
+			return {'name': name, 'args': {}}
+
+	def describe(self, error: Exception) -> dict:
+		"""
+		Turns a failed eth_call into a 'skipped' result with a readable `error`
+		and, for custom errors, the decoded `revert`.
+		"""
+		decoded = self.decode(error.data) if isinstance(error, ContractCustomError) and isinstance(error.data, str) else None
+		if decoded is not None:
+			args = ", ".join(f"{key}={value}" for key, value in decoded['args'].items())
+			return {'status': 'skipped', 'error': f"{decoded['name']}({args})", 'revert': decoded}
+		return {'status': 'skipped', 'error': getattr(error, 'message', None) or str(error)}
+
+class ReserveCache:
+	"""
+	Pair reserves shared by every wallet, keyed by the block they were read at.
+
+	An entry answers lookups for its own block; Sync events in receipts seen
+	by this process move it forward without another getReserves call.
+	"""
+	def __init__(self, events: EventRegistry) -> None:
+		self._lock = threading.Lock()
+		self._reserves = {}
+		self.events = events
+
+	def get(self, pair_address: str, block_number: int) -> tuple:
+		with self._lock:
+			entry = self._reserves.get(pair_address)
+		if entry and entry[0] >= block_number:
+			return entry[1]
+		return None
+
+	def put(self, pair_address: str, block_number: int, reserves: tuple) -> None:
+		with self._lock:
+			entry = self._reserves.get(pair_address)
+			if not entry or entry[0] <= block_number:
+				self._reserves[pair_address] = (block_number, reserves)
+
+	def applyReceipt(self, receipt) -> None:
+		"""
+		Updates the reserves of every pair that emitted a Sync event in the receipt.
+		"""
+		for sync in self.events.decodeReceipt(receipt, 'Sync'):
+			self.put(sync['address'], receipt['blockNumber'], (sync['args']['reserve0'], sync['args']['reserve1']))
+
+# Predeploy holding the sent-message mapping that withdrawals are proven against
+L2_TO_L1_MESSAGE_PASSER = "0x4200000000000000000000000000000000000016"
+# Threads shared by a context for independent RPC reads
+IO_WORKERS = 16
+
+# Default time to wait for a receipt, same as web3's wait_for_transaction_receipt
+RECEIPT_TIMEOUT = 120
+
+# Receipt polling interval, same as web3's wait_for_transaction_receipt
+RECEIPT_POLL = 0.1
+
+# Stuck transaction replacement, overridden by the replacement config key:
+# blocks to wait before replacing, and the highest multiple of the original fees to pay
+REPLACEMENT = {"afterBlocks": 5, "feeCap": 3}
+
+# Headroom on top of the gas used by previous transactions of the same kind
+GAS_MARGIN = 1.2
+# Functions whose gas doesn't depend on the wallet or on pool state (wrap, unwrap, claim), the only ones profiled
+PROFILED_FUNCTIONS = ("deposit()", "withdraw(uint256)", "claim()")
+PROFILED_SELECTORS = frozenset(Web3.to_hex(Web3.keccak(text=signature)[:4]) for signature in PROFILED_FUNCTIONS)
+# How long fee suggestions stay valid when no newHeads subscription refreshes them, in seconds
+FEE_TTL = 12
+
+class GasProfiles:
+	"""
+	Gas limits learned from receipts, keyed by (network, contract address, function selector).
+
+	Wrap, unwrap and claim use nearly the same gas for every wallet, so once one of
+	them is mined the others can skip eth_estimateGas. Other calls (swaps, liquidity,
+	withdrawal proofs, even approve) depend on state and are always estimated.
+	"""
+	def __init__(self, margin: float = GAS_MARGIN) -> None:
+		self.margin = margin
+		self._lock = threading.Lock()
+		self._profiles = {}
+
+	@staticmethod
+	def key(network: str, transaction: dict) -> tuple:
+		return (network, transaction.get('to'), transaction.get('data', '0x')[:10])
+
+	def get(self, key: tuple) -> int:
+		if key[2] not in PROFILED_SELECTORS:
+			return None
+		with self._lock:
+			gas_used = self._profiles.get(key)
+		return int(gas_used * self.margin) if gas_used else None
+
+	def record(self, key: tuple, receipt) -> None:
+		"""
+		Learns from a mined transaction. Reverted ones drop the profile, so the next build re-estimates.
+		"""
+		if key[2] not in PROFILED_SELECTORS:
+			return
+		with self._lock:
+			if receipt['status'] == 1:
+				self._profiles[key] = max(self._profiles.get(key, 0), receipt['gasUsed'])
+			else:
+				self._profiles.pop(key, None)
+
+def feesFromBlock(block, priority_fee: int) -> dict:
+	"""
+	EIP-1559 fee parameters that stay valid through a few blocks of base fee increases.
+	"""
+	return {
+		'maxFeePerGas': 2 * block['baseFeePerGas'] + priority_fee,
+		'maxPriorityFeePerGas': priority_fee
+	}
+
+# Fee increase per bump; nodes only accept a replacement paying at least 10% more
+FEE_BUMP = 1.125
+
+def bumpFees(fees: dict, times: int) -> dict:
+	"""
+	Raises every fee parameter by FEE_BUMP, `times` times over.
+	"""
+	if times <= 0:
+		return fees
+	return {key: int(value * FEE_BUMP ** times) for key, value in fees.items()}
+
+FEE_KEYS = ("maxFeePerGas", "maxPriorityFeePerGas", "gasPrice")
+
+def replacementFees(transaction: dict, current: dict, original: dict, cap: float) -> dict:
+	"""
+	Fees for replacing a pending transaction: FEE_BUMP over its own, or the current
+	network fees when those are higher. None when they would exceed `cap` times the
+	fees of the `original` transaction.
+	"""
+	bumped = bumpFees({key: transaction[key] for key in FEE_KEYS if key in transaction}, 1)
+	fees = {key: max(value, current.get(key, 0)) for key, value in bumped.items()}
+	if any(value > original[key] * cap for key, value in fees.items()):
+		return None
+	return fees
+
+class ReceiptWatcher:
+	"""
+	Resolves receipts of pending transactions from newHeads notifications over a WebSocket.
+
+	One watcher serves every wallet on a network, so RPC load grows with the
+	number of blocks (one get_block each) instead of with the number of pending
+	transactions being polled. It runs its own event loop in a daemon thread.
+	"""
+	def __init__(self, url: str, network: str, on_head = None) -> None:
+		self.url = url
+		self.network = network
+		self.on_head = on_head
+		self._lock = threading.Lock()
+		self._pending = {}
+		self._closed = False
+		self._loop = None
+		self._task = None
+		self._thread = threading.Thread(target=self._run, name=f"receipts-{network}", daemon=True)
+		self._thread.start()
+
+	def _run(self) -> None:
+		try:
+			asyncio.run(self._listen())
+		except asyncio.CancelledError:
+			pass
+
+	def close(self) -> None:
+		"""
+		Stops listening and closes the WebSocket. Transactions still watched are cancelled.
+		"""
+		self._closed = True
+		if self._loop is not None:
+			self._loop.call_soon_threadsafe(self._task.cancel)
+		self._thread.join(timeout=5)
+		with self._lock:
+			pending, self._pending = self._pending, {}
+		for future in pending.values():
+			future.cancel()
+
+	def watch(self, tx_hash) -> Future:
+		"""
+		Returns a future that resolves with the transaction's receipt once it is mined.
+		"""
+		with self._lock:
+			return self._pending.setdefault(bytes(tx_hash), Future())
+
+	def unwatch(self, tx_hash) -> None:
+		with self._lock:
+			self._pending.pop(bytes(tx_hash), None)
+
+	def waitForReceipt(self, web3: Web3, tx_hash, timeout: float = RECEIPT_TIMEOUT):
+		"""
+		Blocking counterpart of web3's wait_for_transaction_receipt.
+		"""
+		future = self.watch(tx_hash)
+		try:
+			# The transaction may have been mined before it was watched.
+			try:
+				return web3.eth.get_transaction_receipt(tx_hash)
+			except TransactionNotFound:
+				pass
+			return future.result(timeout=timeout)
+		except FutureTimeout:
+			raise TimeExhausted(f"Transaction {tx_hash.hex()} is not in the chain after {timeout} seconds")
+		finally:
+			self.unwatch(tx_hash)
+
+	async def _resolve(self, web3: AsyncWeb3, tx_hashes: list) -> None:
+		for tx_hash in tx_hashes:
+			try:
+				receipt = await web3.eth.get_transaction_receipt(tx_hash)
+			except TransactionNotFound:
+				continue
+			with self._lock:
+				future = self._pending.pop(bytes(tx_hash), None)
+			if future is not None and not future.done():
+				future.set_result(receipt)
+
+	async def _listen(self) -> None:
+		self._task = asyncio.current_task()
+		self._loop = asyncio.get_running_loop()
+		while not self._closed:
+			try:
+				async with AsyncWeb3(WebSocketProvider(self.url)) as web3:
+					web3.middleware_onion.add(rateLimitMiddleware(self.url), "rate_limit")
+					await web3.eth.subscribe("newHeads")
+					# Catch up on anything mined while (re)connecting.
+					with self._lock:
+						watched = list(self._pending)
+					await self._resolve(web3, watched)
+
+					async for message in web3.socket.process_subscriptions():
+						if self.on_head:
+							self.on_head(message["result"])
+						block = await web3.eth.get_block(message["result"]["number"])
+						with self._lock:
+							watched = set(self._pending)
+						await self._resolve(web3, [tx for tx in block["transactions"] if bytes(tx) in watched])
+
+			except Exception as e:
+				logger.warning(f"Receipt watcher for {self.network} disconnected: {str(e)}")
+				await asyncio.sleep(1)
+
+# Upper bounds of the call latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+class Metrics:
+	"""
+	Process-wide counts, errors and latency histograms of RPC and HTTP calls.
+
+	Calls are keyed by (kind, target, method, operation), where the target is the
+	network for RPC calls and the host for HTTP calls, and the operation is the one
+	executeOperation is running. Per-wallet totals are kept separately so that
+	long multi-wallet runs don't grow a histogram per wallet.
+	"""
+	def __init__(self) -> None:
+		self._lock = threading.Lock()
+		self._calls = {}
+		self._wallets = {}
+		self._retries = {}
+		self.started = time.time()
+
+	def record(self, kind: str, target: str, method: str, seconds: float, error: bool = False) -> None:
+		key = (kind, target, method, current_operation.get())
+		bucket = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+		wallet = wallet_label.get()
+		with self._lock:
+			stats = self._calls.get(key)
+			if stats is None:
+				stats = self._calls[key] = {'count': 0, 'errors': 0, 'seconds': 0.0, 'buckets': [0] * (len(LATENCY_BUCKETS) + 1)}
+			stats['count'] += 1
+			stats['errors'] += error
+			stats['seconds'] += seconds
+			stats['buckets'][bucket] += 1
+
+			if wallet:
+				totals = self._wallets.setdefault(wallet, {'calls': 0, 'errors': 0, 'seconds': 0.0, 'retries': 0, 'retrySeconds': 0.0})
+				totals['calls'] += 1
+				totals['errors'] += error
+				totals['seconds'] += seconds
+
+	def retry(self, operation: str, seconds: float = 0.0) -> None:
+		"""
+		Counts a failed attempt of an operation that is about to be retried,
+		and the `seconds` lost to the attempt and the wait before the next one.
+		"""
+		wallet = wallet_label.get()
+		with self._lock:
+			retries = self._retries.setdefault(operation, [0, 0.0])
+			retries[0] += 1
+			retries[1] += seconds
+			if wallet:
+				totals = self._wallets.setdefault(wallet, {'calls': 0, 'errors': 0, 'seconds': 0.0, 'retries': 0, 'retrySeconds': 0.0})
+				totals['retries'] += 1
+				totals['retrySeconds'] += seconds
+
+	def summary(self) -> dict:
+		"""
+		Returns the metrics as a JSON-serializable dict, methods sorted by total time.
+		"""
+		with self._lock:
+			calls = {key: dict(stats, buckets=list(stats['buckets'])) for key, stats in self._calls.items()}
+			wallets = {wallet: dict(totals) for wallet, totals in self._wallets.items()}
+			retries = {operation: tuple(entry) for operation, entry in self._retries.items()}
+
+		methods = {}
+		operations = {}
+		for (kind, target, method, operation), stats in calls.items():
+			by_method = methods.setdefault(f"{kind} {target} {method}", {'calls': 0, 'errors': 0, 'seconds': 0.0})
+			by_operation = operations.setdefault(operation or "-", {'calls': 0, 'errors': 0, 'seconds': 0.0, 'retries': 0, 'retrySeconds': 0.0})
+			for totals in (by_method, by_operation):
+				totals['calls'] += stats['count']
+				totals['errors'] += stats['errors']
+				totals['seconds'] += stats['seconds']
+		for operation, (count, seconds) in retries.items():
+			operations.setdefault(operation, {'calls': 0, 'errors': 0, 'seconds': 0.0, 'retries': 0, 'retrySeconds': 0.0}).update(retries=count, retrySeconds=seconds)
+
+		return {
+			'started': int(self.started),
+			'elapsed': round(time.time() - self.started, 3),
+			'methods': dict(sorted(methods.items(), key=lambda item: -item[1]['seconds'])),
+			'operations': dict(sorted(operations.items(), key=lambda item: -item[1]['seconds'])),
+			'calls': [
+				{'kind': kind, 'target': target, 'method': method, 'operation': operation, **stats}
+				for (kind, target, method, operation), stats in calls.items()
+			],
+			'wallets': wallets,
+			'buckets': list(LATENCY_BUCKETS)
+		}
+
+	def dump(self, path: str) -> None:
+		with open(path, "w") as f:
+			json.dump(self.summary(), f, indent=4)
+		logger.info(f"Metrics written to {path}")
+
+	def prometheus(self) -> str:
+		"""
+		Renders the metrics in the Prometheus text exposition format.
+		"""
+		with self._lock:
+			calls = [(key, dict(stats, buckets=list(stats['buckets']))) for key, stats in self._calls.items()]
+			wallets = [(wallet, dict(totals)) for wallet, totals in self._wallets.items()]
+			retries = [(operation, tuple(entry)) for operation, entry in self._retries.items()]
+
+		lines = [
+			"# HELP sfis_call_duration_seconds Latency of RPC and HTTP calls.",
+			"# TYPE sfis_call_duration_seconds histogram"
+		]
+		for (kind, target, method, operation), stats in calls:
+			labels = f'kind="{kind}",target="{target}",method="{method}",operation="{operation}"'
+			cumulative = 0
+			for bound, count in zip(LATENCY_BUCKETS, stats['buckets']):
+				cumulative += count
+				lines.append(f'sfis_call_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+			lines.append(f'sfis_call_duration_seconds_bucket{{{labels},le="+Inf"}} {stats["count"]}')
+			lines.append(f'sfis_call_duration_seconds_sum{{{labels}}} {stats["seconds"]}')
+			lines.append(f'sfis_call_duration_seconds_count{{{labels}}} {stats["count"]}')
+
+		lines += ["# HELP sfis_call_errors_total Failed RPC and HTTP calls.", "# TYPE sfis_call_errors_total counter"]
+		for (kind, target, method, operation), stats in calls:
+			lines.append(f'sfis_call_errors_total{{kind="{kind}",target="{target}",method="{method}",operation="{operation}"}} {stats["errors"]}')
+
+		lines += ["# HELP sfis_operation_retries_total Failed operation attempts that were retried.", "# TYPE sfis_operation_retries_total counter"]
+		for operation, (count, _) in retries:
+			lines.append(f'sfis_operation_retries_total{{operation="{operation}"}} {count}')
+
+		lines += ["# HELP sfis_operation_retry_seconds_total Time spent on failed attempts and backoff.", "# TYPE sfis_operation_retry_seconds_total counter"]
+		for operation, (_, seconds) in retries:
+			lines.append(f'sfis_operation_retry_seconds_total{{operation="{operation}"}} {seconds}')
+
+		for name, field, help_text in (("calls", "calls", "RPC and HTTP calls"), ("errors", "errors", "Failed RPC and HTTP calls"), ("retries", "retries", "Retried operation attempts")):
+			lines += [f"# HELP sfis_wallet_{name}_total {help_text} per wallet.", f"# TYPE sfis_wallet_{name}_total counter"]
+			for wallet, totals in wallets:
+				lines.append(f'sfis_wallet_{name}_total{{wallet="{wallet}"}} {totals[field]}')
+
+		return "\n".join(lines) + "\n"
+
+	def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+		"""
+		Serves the Prometheus text format on http://host:port/metrics from a daemon thread.
+		"""
+		metrics = self
+
+		class _Handler(BaseHTTPRequestHandler):
+			def do_GET(self) -> None:
+				if self.path.split("?")[0] != "/metrics":
+					self.send_error(404)
+					return
+				body = metrics.prometheus().encode()
+				self.send_response(200)
+				self.send_header("Content-Type", "text/plain; version=0.0.4")
+				self.send_header("Content-Length", str(len(body)))
+				self.end_headers()
+				self.wfile.write(body)
+
+			def log_message(self, *args) -> None:
+				pass
+
+		server = ThreadingHTTPServer((host, port), _Handler)
+		threading.Thread(target=server.serve_forever, name="sfis-metrics", daemon=True).start()
+		logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+		return server
+
+metrics = Metrics()
+
+def _rpcFailed(response) -> bool:
+	return not isinstance(response, dict) or "error" in response
+
+def rpcMetricsMiddleware(network: str) -> type:
+	"""
+	Returns a web3 middleware that records the requests of a `network` provider in `metrics`.
+	Requests in a batch are recorded individually, each with the latency of the whole batch.
+	"""
+	class _Middleware(Web3Middleware):
+		def wrap_make_request(self, make_request):
+			def middleware(method, params):
+				start = time.perf_counter()
+				response = None
+				try:
+					response = make_request(method, params)
+					return response
+				finally:
+					metrics.record("rpc", network, method, time.perf_counter() - start, _rpcFailed(response))
+			return middleware
+
+		def wrap_make_batch_request(self, make_batch_request):
+			def middleware(requests_info):
+				start = time.perf_counter()
+				response = None
+				try:
+					response = make_batch_request(requests_info)
+					return response
+				finally:
+					_recordBatch(network, requests_info, response, time.perf_counter() - start)
+			return middleware
+
+		async def async_wrap_make_request(self, make_request):
+			async def middleware(method, params):
+				start = time.perf_counter()
+				response = None
+				try:
+					response = await make_request(method, params)
+					return response
+				finally:
+					metrics.record("rpc", network, method, time.perf_counter() - start, _rpcFailed(response))
+			return middleware
+
+		async def async_wrap_make_batch_request(self, make_batch_request):
+			async def middleware(requests_info):
+				start = time.perf_counter()
+				response = None
+				try:
+					response = await make_batch_request(requests_info)
+					return response
+				finally:
+					_recordBatch(network, requests_info, response, time.perf_counter() - start)
+			return middleware
+
+	return _Middleware
+
+def _recordBatch(network: str, requests_info: list, response, seconds: float) -> None:
+	responses = response if isinstance(response, list) else [response] * len(requests_info)
+	for (method, _), item in zip(requests_info, responses):
+		metrics.record("rpc", network, method, seconds, _rpcFailed(item))
+
+def _httpLabels(method: str, url) -> tuple:
+	parts = urlsplit(str(url))
+	return parts.netloc, f"{method} {parts.path.replace('//', '/') or '/'}"
+
+def httpRequest(method: str, url: str, **kwargs) -> requests.Response:
+	"""
+	requests.request, paced by `rate_limits` and recorded in `metrics`. Responses with an error status count as errors.
+	"""
+	rate_limits.acquire(url)
+	start = time.perf_counter()
+	response = None
+	try:
+		response = requests.request(method, url, **kwargs)
+		if response.status_code == 429:
+			rate_limits.throttle(url)
+		return response
+	finally:
+		metrics.record("http", *_httpLabels(method, url), time.perf_counter() - start, response is None or response.status_code >= 400)
+
+def httpTraceConfig() -> aiohttp.TraceConfig:
+	"""
+	aiohttp tracing that paces the requests of a session by `rate_limits` and records them in `metrics`.
+	"""
+	async def onRequestStart(session, context, params) -> None:
+		await rate_limits.acquireAsync(params.url)
+		context.start = time.perf_counter()
+
+	async def onRequestEnd(session, context, params) -> None:
+		if params.response.status == 429:
+			rate_limits.throttle(params.url)
+		metrics.record("http", *_httpLabels(params.method, params.url), time.perf_counter() - context.start, params.response.status >= 400)
+
+	async def onRequestException(session, context, params) -> None:
+		metrics.record("http", *_httpLabels(params.method, params.url), time.perf_counter() - context.start, True)
+
+	trace_config = aiohttp.TraceConfig()
+	trace_config.on_request_start.append(onRequestStart)
+	trace_config.on_request_end.append(onRequestEnd)
+	trace_config.on_request_exception.append(onRequestException)
+	return trace_config
+
+# Requests per second and burst allowed per host when config.json's rateLimits doesn't list it
+RATE_LIMIT = {"rps": 20, "burst": 40}
+
+class TokenBucket:
+	"""
+	Token bucket shared by every wallet calling one host.
+
+	Callers that find the bucket empty queue up per wallet and are served round-robin
+	across wallets, so one wallet with many requests in flight can't starve the others.
+	Waiting works from threads (acquire) and from the event loop (acquireAsync).
+	"""
+	def __init__(self, rate: float, burst: int) -> None:
+		self.rate = rate
+		self.burst = max(burst, 1)
+		self.tokens = float(self.burst)
+		self._updated = time.monotonic()
+		self._lock = threading.Lock()
+		# wallet -> waiters; the order is the round-robin order
+		self._queues = {}
+
+	def _refill(self, now: float) -> None:
+		self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+		self._updated = now
+
+	def _position(self, wallet: str, waiter: object) -> int:
+		"""
+		How many waiters are served before `waiter`, interleaving the wallets' queues.
+		"""
+		index = self._queues[wallet].index(waiter)
+		position = 0
+		before = True
+		for other, queue in self._queues.items():
+			if other == wallet:
+				before = False
+			position += min(len(queue), index + 1 if before else index)
+		return position
+
+	def _take(self, wallet: str, waiter: object) -> float:
+		"""
+		Takes a token if it's `waiter`'s turn. Returns 0 when taken, otherwise the time to wait before trying again.
+		"""
+		with self._lock:
+			self._refill(time.monotonic())
+			position = self._position(wallet, waiter)
+			if position < int(self.tokens):
+				self.tokens -= 1
+				queue = self._queues.pop(wallet)
+				queue.remove(waiter)
+				# Served wallets go to the back of the round-robin order
+				if queue:
+					self._queues[wallet] = queue
+				return 0
+			return max((position + 1 - self.tokens) / self.rate, 0.001)
+
+	def _enqueue(self) -> tuple:
+		wallet = wallet_label.get()
+		waiter = object()
+		with self._lock:
+			self._refill(time.monotonic())
+			if not self._queues and self.tokens >= 1:
+				self.tokens -= 1
+				return wallet, None
+			self._queues.setdefault(wallet, []).append(waiter)
+		return wallet, waiter
+
+	def acquire(self) -> None:
+		wallet, waiter = self._enqueue()
+		while waiter is not None:
+			delay = self._take(wallet, waiter)
+			if not delay:
+				return
+			time.sleep(delay)
+
+	async def acquireAsync(self) -> None:
+		wallet, waiter = self._enqueue()
+		while waiter is not None:
+			delay = self._take(wallet, waiter)
+			if not delay:
+				return
+			await asyncio.sleep(delay)
+
+	def throttle(self) -> None:
+		"""
+		Empties the bucket after the host rate limited us, so everyone waits for fresh tokens.
+		"""
+		with self._lock:
+			self._refill(time.monotonic())
+			self.tokens = min(self.tokens, 0)
+
+class RateLimits:
+	"""
+	Process-wide token buckets, one per host, that every RPC request, health check and API call waits on.
+	"""
+	def __init__(self) -> None:
+		self._lock = threading.Lock()
+		self._limits = {}
+		self._buckets = {}
+
+	def configure(self, limits: dict = None) -> None:
+		"""
+		Sets {"rps": ..., "burst": ...} per host, and for "default". An rps of 0 disables limiting.
+		"""
+		with self._lock:
+			self._limits = dict(limits or {})
+			self._buckets = {}
+
+	def bucket(self, url: str) -> TokenBucket:
+		host = urlsplit(str(url)).netloc or str(url)
+		with self._lock:
+			if host not in self._buckets:
+				limit = {**RATE_LIMIT, **self._limits.get("default", {}), **self._limits.get(host, {})}
+				self._buckets[host] = TokenBucket(limit["rps"], limit.get("burst", limit["rps"])) if limit["rps"] else None
+			return self._buckets[host]
+
+	def acquire(self, url: str) -> None:
+		bucket = self.bucket(url)
+		if bucket is not None:
+			bucket.acquire()
+
+	async def acquireAsync(self, url: str) -> None:
+		bucket = self.bucket(url)
+		if bucket is not None:
+			await bucket.acquireAsync()
+
+	def throttle(self, url: str) -> None:
+		bucket = self.bucket(url)
+		if bucket is not None:
+			bucket.throttle()
+
+rate_limits = RateLimits()
+
+def rateLimitMiddleware(url: str) -> type:
+	"""
+	Returns a web3 middleware that paces a provider's requests by `rate_limits` under `url`'s host.
+	Pooled providers pace each request themselves, per endpoint; this covers the others:
+	injected Web3 instances and the receipt watchers' WebSockets. A batch counts as one request.
+	"""
+	class _Middleware(Web3Middleware):
+		def wrap_make_request(self, make_request):
+			def middleware(method, params):
+				return _paced(url, lambda: make_request(method, params))
+			return middleware
+
+		def wrap_make_batch_request(self, make_batch_request):
+			def middleware(requests_info):
+				return _paced(url, lambda: make_batch_request(requests_info))
+			return middleware
+
+		async def async_wrap_make_request(self, make_request):
+			async def middleware(method, params):
+				return await _pacedAsync(url, lambda: make_request(method, params))
+			return middleware
+
+		async def async_wrap_make_batch_request(self, make_batch_request):
+			async def middleware(requests_info):
+				return await _pacedAsync(url, lambda: make_batch_request(requests_info))
+			return middleware
+
+	return _Middleware
+
+def _paced(url: str, request):
+	rate_limits.acquire(url)
+	try:
+		response = request()
+	except Exception as e:
+		if _status(e) == 429:
+			rate_limits.throttle(url)
+		raise
+	if _rateLimited(response):
+		rate_limits.throttle(url)
+	return response
+
+async def _pacedAsync(url: str, request):
+	await rate_limits.acquireAsync(url)
+	try:
+		response = await request()
+	except Exception as e:
+		if _status(e) == 429:
+			rate_limits.throttle(url)
+		raise
+	if _rateLimited(response):
+		rate_limits.throttle(url)
+	return response
+
+# Methods sent to the wallet's sticky endpoint, so that its nonces and submissions stay consistent
+STICKY_METHODS = ("eth_sendRawTransaction", "eth_sendTransaction", "eth_getTransactionCount")
+# How often every endpoint of a pool is pinged, in seconds
+HEALTH_CHECK_INTERVAL = 30
+# Endpoints this many blocks behind the most advanced one are treated as down until the next check
+MAX_BLOCK_LAG = 10
+# Weight of the newest sample in an endpoint's average latency
+LATENCY_ALPHA = 0.3
+# JSON-RPC error messages that mean the node is rate limiting us rather than rejecting the request
+RATE_LIMIT_ERRORS = ("rate limit", "too many requests", "limit exceeded", "exceeded the quota")
+# JSON-RPC error codes that nodes use for rate limiting
+RATE_LIMIT_CODES = (429, -32005)
+
+class Endpoint:
+	def __init__(self, url: str) -> None:
+		self.url = url
+		self.latency = None
+		self.failures = 0
+		self.down_until = 0.0
+
+	def healthy(self, now: float) -> bool:
+		return self.down_until <= now
+
+class EndpointPool:
+	"""
+	Health and latency of the RPC endpoints of one network, and the order to try them in.
+
+	Reads are spread over the healthy endpoints in proportion to their speed. A wallet's
+	writes and nonce lookups stick to one endpoint until it fails. Endpoints that time out,
+	refuse connections or rate limit sit out an exponentially growing cooldown, and are
+	only tried as a last resort while they do.
+	"""
+	def __init__(self, network: str, urls: Iterable[str]) -> None:
+		self.network = network
+		self.endpoints = [Endpoint(url) for url in urls]
+		self._lock = threading.Lock()
+		self._sticky = {}
+
+	def _weighted(self, endpoints: list) -> list:
+		"""
+		Orders endpoints randomly, faster ones first more often.
+		"""
+		known = [endpoint.latency for endpoint in endpoints if endpoint.latency]
+		default = sum(known) / len(known) if known else 1.0
+		return sorted(endpoints, key=lambda endpoint: random.random() ** (endpoint.latency or default), reverse=True)
+
+	def candidates(self, method: str) -> list:
+		"""
+		Returns the endpoints to try for `method`, in order.
+		"""
+		now = time.monotonic()
+		with self._lock:
+			healthy = self._weighted([endpoint for endpoint in self.endpoints if endpoint.healthy(now)])
+			down = sorted((endpoint for endpoint in self.endpoints if not endpoint.healthy(now)), key=lambda endpoint: endpoint.down_until)
+
+			if method in STICKY_METHODS and healthy:
+				wallet = wallet_label.get()
+				sticky = self._sticky.get(wallet)
+				if sticky not in healthy:
+					sticky = self._sticky[wallet] = healthy[0]
+				healthy.remove(sticky)
+				healthy.insert(0, sticky)
+
+		return healthy + down
+
+	def succeeded(self, endpoint: Endpoint, seconds: float) -> None:
+		with self._lock:
+			endpoint.latency = seconds if endpoint.latency is None else (1 - LATENCY_ALPHA) * endpoint.latency + LATENCY_ALPHA * seconds
+			recovered = endpoint.failures > 0
+			endpoint.failures = 0
+			endpoint.down_until = 0.0
+		if recovered:
+			logger.info(f"RPC endpoint {endpoint.url} ({self.network}) is back up.")
+
+	def failed(self, endpoint: Endpoint, error) -> None:
+		with self._lock:
+			endpoint.failures += 1
+			endpoint.down_until = time.monotonic() + backoffDelay(endpoint.failures)
+		logger.warning(f"RPC endpoint {endpoint.url} ({self.network}) failed: {error}")
+
+	def checked(self, results: list) -> None:
+		"""
+		Applies a round of health checks: (endpoint, seconds, block number) tuples, seconds and block being None on failure.
+		"""
+		best = max((block for _, _, block in results if block is not None), default=None)
+		for endpoint, seconds, block in results:
+			if block is None:
+				self.failed(endpoint, "health check failed")
+			elif best - block > MAX_BLOCK_LAG:
+				with self._lock:
+					endpoint.down_until = time.monotonic() + HEALTH_CHECK_INTERVAL
+				logger.warning(f"RPC endpoint {endpoint.url} ({self.network}) is {best - block} blocks behind.")
+			else:
+				self.succeeded(endpoint, seconds)
+
+def _rateLimited(response) -> bool:
+	items = response if isinstance(response, list) else [response]
+	for item in items:
+		error = item.get('error') if isinstance(item, dict) else None
+		if isinstance(error, dict) and (error.get('code') in RATE_LIMIT_CODES or any(text in str(error.get('message', '')).lower() for text in RATE_LIMIT_ERRORS)):
+			return True
+	return False
+
+def _shouldFailOver(error: Exception) -> bool:
+	"""
+	Whether a request error is the endpoint's fault (unreachable, slow, rate limiting or
+	overloaded), so the request can be sent to another endpoint.
+	"""
+	if isinstance(error, (requests.HTTPError, aiohttp.ClientResponseError)):
+		status = _status(error)
+		return status == 429 or (status or 0) >= 500
+	return isinstance(error, (requests.ConnectionError, requests.Timeout, aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+def _status(error: Exception) -> int:
+	"""
+	HTTP status of a requests or aiohttp error, if it has one.
+	"""
+	if isinstance(error, requests.HTTPError):
+		return error.response.status_code if error.response is not None else None
+	return getattr(error, 'status', None)
+
+class PooledHTTPProvider(JSONBaseProvider):
+	"""
+	Sends each request to the first endpoint of an EndpointPool that answers it.
+	"""
+	def __init__(self, pool: EndpointPool) -> None:
+		super().__init__()
+		self.pool = pool
+		# With a single endpoint there is nothing to fail over to, so keep web3's own retries
+		retries = {} if len(pool.endpoints) == 1 else {'exception_retry_configuration': None}
+		self._providers = {endpoint.url: HTTPProvider(endpoint.url, **retries) for endpoint in pool.endpoints}
+
+	def __str__(self) -> str:
+		return f"RPC pool {self.pool.network} ({len(self.pool.endpoints)} endpoints)"
+
+	def _send(self, method: str, request):
+		error = None
+		response = None
+		for endpoint in self.pool.candidates(method):
+			rate_limits.acquire(endpoint.url)
+			start = time.perf_counter()
+			try:
+				response = request(self._providers[endpoint.url])
+			except Exception as e:
+				if not _shouldFailOver(e):
+					raise
+				if _status(e) == 429:
+					rate_limits.throttle(endpoint.url)
+				self.pool.failed(endpoint, e)
+				error = e
+				continue
+
+			if _rateLimited(response):
+				rate_limits.throttle(endpoint.url)
+				self.pool.failed(endpoint, "rate limited")
+				continue
+			self.pool.succeeded(endpoint, time.perf_counter() - start)
+			return response
+
+		if response is not None:
+			return response
+		raise error
+
+	def make_request(self, method, params):
+		return self._send(method, lambda provider: provider.make_request(method, params))
+
+	def make_batch_request(self, requests_info):
+		return self._send(requests_info[0][0] if requests_info else None, lambda provider: provider.make_batch_request(requests_info))
+
+	def check(self) -> None:
+		results = []
+		for endpoint in self.pool.endpoints:
+			rate_limits.acquire(endpoint.url)
+			start = time.perf_counter()
+			try:
+				response = self._providers[endpoint.url].make_request("eth_blockNumber", [])
+				results.append((endpoint, time.perf_counter() - start, int(response['result'], 16)))
+			except Exception:
+				results.append((endpoint, None, None))
+		self.pool.checked(results)
+
+class AsyncPooledHTTPProvider(AsyncJSONBaseProvider):
+	"""
+	Asynchronous counterpart of PooledHTTPProvider.
+	"""
+	def __init__(self, pool: EndpointPool) -> None:
+		super().__init__()
+		self.pool = pool
+		retries = {} if len(pool.endpoints) == 1 else {'exception_retry_configuration': None}
+		self._providers = {endpoint.url: AsyncHTTPProvider(endpoint.url, **retries) for endpoint in pool.endpoints}
+
+	def __str__(self) -> str:
+		return f"Async RPC pool {self.pool.network} ({len(self.pool.endpoints)} endpoints)"
+
+	async def _send(self, method: str, request):
+		error = None
+		response = None
+		for endpoint in self.pool.candidates(method):
+			await rate_limits.acquireAsync(endpoint.url)
+			start = time.perf_counter()
+			try:
+				response = await request(self._providers[endpoint.url])
+			except Exception as e:
+				if not _shouldFailOver(e):
+					raise
+				if _status(e) == 429:
+					rate_limits.throttle(endpoint.url)
+				self.pool.failed(endpoint, e)
+				error = e
+				continue
+
+			if _rateLimited(response):
+				rate_limits.throttle(endpoint.url)
+				self.pool.failed(endpoint, "rate limited")
+				continue
+			self.pool.succeeded(endpoint, time.perf_counter() - start)
+			return response
+
+		if response is not None:
+			return response
+		raise error
+
+	async def make_request(self, method, params):
+		return await self._send(method, lambda provider: provider.make_request(method, params))
+
+	async def make_batch_request(self, requests_info):
+		return await self._send(requests_info[0][0] if requests_info else None, lambda provider: provider.make_batch_request(requests_info))
+
+	async def check(self) -> None:
+		async def _ping(endpoint: Endpoint) -> tuple:
+			await rate_limits.acquireAsync(endpoint.url)
+			start = time.perf_counter()
+			try:
+				response = await self._providers[endpoint.url].make_request("eth_blockNumber", [])
+				return endpoint, time.perf_counter() - start, int(response['result'], 16)
+			except Exception:
+				return endpoint, None, None
+
+		self.pool.checked(list(await asyncio.gather(*(_ping(endpoint) for endpoint in self.pool.endpoints))))
+
+	async def disconnect(self) -> None:
+		for provider in self._providers.values():
+			await provider.disconnect()
+
+def _endpointLists(rpc_urls: Dict[str, Iterable[str]] = None) -> MappingProxyType:
+	"""
+	Merges configured endpoints over RPC_URLS. A network may be given a single URL or a list.
+	"""
+	merged = {**RPC_URLS, **(rpc_urls or {})}
+	return MappingProxyType({network: (urls,) if isinstance(urls, str) else tuple(urls) for network, urls in merged.items()})
+
+class LazyNetworks(Mapping):
+	"""
+	Web3 instance per network, opened by `connect` the first time the network is used,
+	so runs that never touch a network don't pay for connecting to it.
+	"""
+	def __init__(self, networks: Iterable[str], connect) -> None:
+		self._networks = tuple(networks)
+		self._connect = connect
+		self._lock = threading.Lock()
+		self._connected = {}
+
+	def __getitem__(self, network: str):
+		web3 = self._connected.get(network)
+		if web3 is None:
+			if network not in self._networks:
+				raise KeyError(network)
+			with self._lock:
+				if network not in self._connected:
+					self._connected[network] = self._connect(network)
+				web3 = self._connected[network]
+		return web3
+
+	def __iter__(self):
+		return iter(self._networks)
+
+	def __len__(self) -> int:
+		return len(self._networks)
+
+	def connected(self) -> dict:
+		"""
+		Returns the networks opened so far.
+		"""
+		return dict(self._connected)
+
+class ChainContext:
+	"""
+	Process-wide chain state shared by every SFI wallet handle.
+
+	Holds one Web3 provider per network and lazily caches contract objects,
+	chain IDs and pair addresses, none of which depend on the wallet. The
+	configuration is fixed at construction; the caches only ever fill up.
+	Networks with a WebSocket endpoint in `ws_urls` get a shared ReceiptWatcher.
+	Each network's RPC requests go through an EndpointPool over its `rpc_urls`, opened
+	when the network is first used and health-checked in the background when there is
+	more than one endpoint.
+	Prebuilt Web3 instances can be passed in `web3` instead, e.g. for a local dev chain.
+	Their requests are paced by `rate_limits` too when the provider has an endpoint URI.
+	"""
+	_shared = None
+	_shared_kwargs = {}
+	_shared_lock = threading.Lock()
+
+	def __init__(self, rpc_urls: Dict[str, Iterable[str]] = None, contracts: dict = None, ws_urls: Dict[str, str] = None, citea_fee_bps: int = CITEA_FEE_BPS, web3: Dict[str, Web3] = None) -> None:
+		self.rpc_urls = _endpointLists(rpc_urls)
+		self.ws_urls = MappingProxyType(dict(ws_urls or {}))
+		self.contracts = contracts or CONTRACTS
+		self.citea_fee_bps = citea_fee_bps
+		if web3:
+			self.web3 = MappingProxyType(dict(web3))
+			for network, instance in self.web3.items():
+				instance.middleware_onion.add(rpcMetricsMiddleware(network), "metrics")
+				# In-process providers such as eth-tester have no host to pace.
+				url = getattr(instance.provider, "endpoint_uri", None)
+				if url:
+					instance.middleware_onion.add(rateLimitMiddleware(url), "rate_limit")
+			if not all(instance.is_connected() for instance in self.web3.values()):
+				raise ConnectionError("Couldn't connect to Web3 RPC. Try again later.")
+		else:
+			self.web3 = LazyNetworks(self.rpc_urls, self._connect)
+
+		self._lock = threading.Lock()
+		self._contract_cache = {}
+		self._chain_ids = {}
+		self._pairs = {}
+		self._multicall = {}
+		self._watchers = {}
+		self._fees = {}
+		self._fee_locks = {network: threading.Lock() for network in self.web3}
+		self._heads = {}
+		self._receipts = {}
+		self._blocks = {}
+		self._proofs = {}
+		self._l2_outputs = {}
+		self._io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="sfis-io")
+		self._closed = threading.Event()
+		self.gas_profiles = GasProfiles()
+		# The msgpasser ABI is only loaded once a withdrawal receipt is decoded, see withdrawalEvents.
+		self.events = EventRegistry([PAIR_ABI])
+		self._withdrawal_events = False
+		self.errors = ErrorRegistry(self.contracts)
+		self.reserves = ReserveCache(self.events)
+
+	def _connect(self, network: str) -> Web3:
+		"""
+		Opens the network's endpoint pool. Fails when none of its endpoints answers.
+		"""
+		provider = PooledHTTPProvider(EndpointPool(network, self.rpc_urls[network]))
+		provider.check()
+		now = time.monotonic()
+		if not any(endpoint.healthy(now) for endpoint in provider.pool.endpoints):
+			raise ConnectionError(f"Couldn't connect to the {network} RPC. Try again later.")
+
+		web3 = Web3(provider)
+		web3.middleware_onion.add(rpcMetricsMiddleware(network), "metrics")
+		if len(provider.pool.endpoints) > 1:
+			threading.Thread(target=self._checkEndpoints, args=(provider,), name=f"sfis-health-{network}", daemon=True).start()
+		return web3
+
+	def _checkEndpoints(self, provider: PooledHTTPProvider) -> None:
+		while not self._closed.wait(HEALTH_CHECK_INTERVAL):
+			try:
+				provider.check()
+			except Exception as e:
+				logger.error(f"Health check of {provider} failed: {str(e)}")
+
+	@classmethod
+	def configure(cls, **kwargs) -> None:
+		"""
+		Sets the constructor arguments of the process-wide context before it is first used.
+		"""
+		with cls._shared_lock:
+			cls._shared_kwargs = kwargs
+
+	@classmethod
+	def shared(cls) -> "ChainContext":
+		"""
+		Returns the process-wide context, creating it on first use.
+		"""
+		with cls._shared_lock:
+			if cls._shared is None:
+				cls._shared = cls(**cls._shared_kwargs)
+			return cls._shared
+
+	@classmethod
+	def reset(cls, pending: Iterable[Future] = ()) -> None:
+		"""
+		Drops the process-wide context, so the next shared() builds one from the current
+		configuration. Wallet handles that hold the old one keep using it until the
+		`pending` futures of their runs are done; the old context is closed after that.
+		"""
+		with cls._shared_lock:
+			context, cls._shared = cls._shared, None
+		if context is None:
+			return
+
+		pending = [future for future in pending if not future.done()]
+		if not pending:
+			context.close()
+			return
+
+		def _closeWhenIdle() -> None:
+			waitFutures(pending)
+			context.close()
+		threading.Thread(target=_closeWhenIdle, name="sfis-context-close", daemon=True).start()
+
+	def close(self) -> None:
+		"""
+		Stops the context's receipt watchers and endpoint health checks and shuts down its IO pool.
+		"""
+		self._closed.set()
+		with self._lock:
+			watchers, self._watchers = self._watchers, {}
+		for watcher in watchers.values():
+			watcher.close()
+		self._io_pool.shutdown(wait=True)
+
+	def withdrawalEvents(self) -> EventRegistry:
+		"""
+		Returns the event registry with the msgpasser events registered, loading their ABI on first use.
+		"""
+		if not self._withdrawal_events:
+			with self._lock:
+				if not self._withdrawal_events:
+					self.events.register(self.contracts['sfi']['msgpasser']['abi'])
+					self._withdrawal_events = True
+		return self.events
+
+	def getReceiptWatcher(self, network: str = "sfi") -> ReceiptWatcher:
+		"""
+		Returns the network's receipt watcher, or None when no WebSocket endpoint is configured.
+		"""
+		if network not in self.ws_urls:
+			return None
+		with self._lock:
+			if network not in self._watchers:
+				self._watchers[network] = ReceiptWatcher(self.ws_urls[network], network, lambda head: self._onHead(network, head))
+			return self._watchers[network]
+
+	def _onHead(self, network: str, head) -> None:
+		self._heads[network] = (time.monotonic() + HEAD_TTL, head['number'])
+
+		# Keep the fee suggestion in step with the chain without extra RPCs.
+		cached = self._fees.get(network)
+		if cached and head.get('baseFeePerGas') is not None and 'maxPriorityFeePerGas' in cached[1]:
+			self._fees[network] = (time.monotonic(), feesFromBlock(head, cached[1]['maxPriorityFeePerGas']))
+
+	def getBlockNumber(self, network: str = "sfi") -> int:
+		"""
+		Returns the latest block number, from newHeads when a receipt watcher runs
+		(for up to HEAD_TTL seconds after the last head) and otherwise polled at most
+		once every BLOCK_NUMBER_TTL seconds.
+		"""
+		cached = self._heads.get(network)
+		if cached and time.monotonic() < cached[0]:
+			return cached[1]
+
+		block_number = self.web3[network].eth.block_number
+		self._heads[network] = (time.monotonic() + BLOCK_NUMBER_TTL, block_number)
+		return block_number
+
+	def getReserves(self, tokenA: str, tokenB: str) -> tuple:
+		"""
+		Returns the (reserveA, reserveB) of a Citea pair at the latest block, reading the pair at most once per block.
+		"""
+		pair_address = self.getPairAddress([tokenA, tokenB])
+		block_number = self.getBlockNumber()
+
+		reserves = self.reserves.get(pair_address, block_number)
+		if reserves is None:
+			reserve0, reserve1, _ = self.getContractAt(pair_address, PAIR_ABI).functions.getReserves().call(block_identifier=block_number)
+			reserves = (reserve0, reserve1)
+			self.reserves.put(pair_address, block_number, reserves)
+
+		return reserves if sortTokens(tokenA, tokenB)[0] == tokenA else reserves[::-1]
+
+	def batchCallWithReserves(self, path: list, calls: list) -> list:
+		"""
+		Executes `calls` in the same batch as the getReserves reads of the pairs along `path`
+		that aren't cached for the latest block, so a later getReserves costs no round trip.
+		"""
+		block_number = self.getBlockNumber()
+		missing = []
+		for tokenA, tokenB in zip(path, path[1:]):
+			pair_address = self.getPairAddress([tokenA, tokenB])
+			if self.reserves.get(pair_address, block_number) is None and pair_address not in missing:
+				missing.append(pair_address)
+
+		results = self.batchCall(list(calls) + [self.getContractAt(pair_address, PAIR_ABI).functions.getReserves() for pair_address in missing])
+		for pair_address, (reserve0, reserve1, _) in zip(missing, results[len(calls):]):
+			self.reserves.put(pair_address, block_number, (reserve0, reserve1))
+		return results[:len(calls)]
+
+	def getFees(self, network: str = "sfi") -> dict:
+		"""
+		Returns fee parameters for new transactions, shared by every wallet.
+		Refreshed on each new head when a receipt watcher runs, otherwise every FEE_TTL seconds.
+		"""
+		with self._fee_locks[network]:
+			cached = self._fees.get(network)
+			if cached and time.monotonic() - cached[0] < FEE_TTL:
+				return cached[1]
+
+			web3 = self.web3[network]
+			block = web3.eth.get_block('latest')
+			if block.get('baseFeePerGas') is not None:
+				fees = feesFromBlock(block, web3.eth.max_priority_fee)
+			else:
+				fees = {'gasPrice': web3.eth.gas_price}
+
+			self._fees[network] = (time.monotonic(), fees)
+			return fees
+
+	def _cached(self, cache: dict, key, factory):
+		value = cache.get(key)
+		if value is None:
+			value = factory()
+			with self._lock:
+				value = cache.setdefault(key, value)
+		return value
+
+	def _coalesced(self, cache: dict, key, fetch):
+		"""
+		Like _cached, but concurrent lookups of a missing key share a single fetch.
+		Failed fetches aren't cached.
+		"""
+		with self._lock:
+			future = cache.get(key)
+			owner = future is None
+			if owner:
+				future = cache[key] = Future()
+
+		if owner:
+			try:
+				future.set_result(fetch())
+			except Exception as e:
+				with self._lock:
+					cache.pop(key, None)
+				future.set_exception(e)
+		return future.result()
+
+	def submit(self, fn, *args) -> Future:
+		"""
+		Runs a read on the shared I/O pool. The function must not submit work itself.
+		"""
+		return self._io_pool.submit(contextvars.copy_context().run, fn, *args)
+
+	def getReceipt(self, tx_hash, network: str = "sfi"):
+		"""
+		Returns the receipt of a mined transaction. Receipts don't change once mined, so each is fetched once.
+		"""
+		return self._coalesced(self._receipts, (network, HexBytes(tx_hash)), lambda: self.web3[network].eth.get_transaction_receipt(tx_hash))
+
+	def getReceipts(self, tx_hashes: list, network: str = "sfi") -> list:
+		"""
+		Looks up the receipts of several transactions in one JSON-RPC batch, falling back
+		to individual requests if the node rejects batches.
+
+		Returns:
+			list: The receipts in the order of `tx_hashes`, None for the ones not mined yet.
+		"""
+		web3 = self.web3[network]
+		if len(tx_hashes) > 1:
+			try:
+				# Raw responses: web3's formatters raise for a missing receipt, which would fail the whole batch.
+				responses = web3.provider.batch_request_func(web3, web3.middleware_onion)([("eth_getTransactionReceipt", [Web3.to_hex(tx_hash)]) for tx_hash in tx_hashes])
+				mined = [response['result'] is not None for response in responses]
+				# Only the mined ones are fetched again, formatted.
+				return [self.getReceipt(tx_hash, network) if found else None for tx_hash, found in zip(tx_hashes, mined)]
+			except Exception as e:
+				logger.debug(f"Batch request failed, falling back to individual calls: {str(e)}")
+
+		receipts = []
+		for tx_hash in tx_hashes:
+			try:
+				receipts.append(web3.eth.get_transaction_receipt(tx_hash))
+			except TransactionNotFound:
+				receipts.append(None)
+		return receipts
+
+	def getBlock(self, block_number: int, network: str = "sfi"):
+		return self._coalesced(self._blocks, (network, block_number), lambda: self.web3[network].eth.get_block(block_number))
+
+	def getProof(self, address: str, slots: list, block_number: int, network: str = "sfi"):
+		key = (network, address, tuple(HexBytes(slot) for slot in slots), block_number)
+		return self._coalesced(self._proofs, key, lambda: self.web3[network].eth.get_proof(address, slots, block_number))
+
+	def getL2OutputIndexAfter(self, l2_block_number: int) -> int:
+		"""
+		Returns the index of the first L2 output covering the block. Raises until that output is proposed.
+		"""
+		return self._coalesced(self._l2_outputs, ('index', l2_block_number), lambda: self.getContract('oracle', 'sep').functions.getL2OutputIndexAfter(l2_block_number).call())
+
+	def getL2Output(self, l2_output_index: int) -> list:
+		return self._coalesced(self._l2_outputs, ('output', l2_output_index), lambda: self.getContract('oracle', 'sep').functions.getL2Output(l2_output_index).call())
+
+	def getContract(self, key: str, network: str = "sfi"):
+		"""
+		Returns the contract object for a key in CONTRACTS.
+		"""
+		contract_info = self.contracts[network][key]
+		return self._cached(self._contract_cache, (network, key), lambda: self.web3[network].eth.contract(address=contract_info['ca'], abi=contract_info['abi']))
+
+	def getContractAt(self, address: str, abi: list, network: str = "sfi"):
+		"""
+		Returns a contract object for an arbitrary address, e.g. a pair or a token outside CONTRACTS.
+		"""
+		address = Web3.to_checksum_address(address)
+		abi_key = tuple(item.get('name') for item in abi)
+		return self._cached(self._contract_cache, (network, address, abi_key), lambda: self.web3[network].eth.contract(address=address, abi=abi))
+
+	def getChainId(self, network: str = "sfi") -> int:
+		return self._cached(self._chain_ids, network, lambda: self.web3[network].eth.chain_id)
+
+	def hasMulticall(self, network: str = "sfi") -> bool:
+		return self._cached(self._multicall, network, lambda: len(self.web3[network].eth.get_code(MULTICALL3_ADDRESS)) > 0)
+
+	def batchCall(self, calls: list, network: str = "sfi") -> list:
+		"""
+		Executes several view calls in one round trip.
+
+		Uses Multicall3 when it is deployed on the network, otherwise a JSON-RPC
+		batch request, and falls back to individual calls if the node rejects batches.
+
+		Args:
+			calls (list): Bound contract function calls, e.g. contract.functions.balanceOf(address).
+			network (str): The network the contracts live on.
+
+		Returns:
+			list: The decoded results, in the same order as `calls`.
+		"""
+		if not calls:
+			return []
+
+		web3 = self.web3[network]
+
+		if self.hasMulticall(network):
+			multicall = self.getContractAt(MULTICALL3_ADDRESS, MULTICALL3_ABI, network)
+			results = multicall.functions.aggregate3([
+				(call.address, False, bytes.fromhex(call.selector[2:]) + web3.codec.encode(list(call.argument_types), list(call.args)))
+				for call in calls
+			]).call()
+
+			decoded = []
+			for call, (_, return_data) in zip(calls, results):
+				values = web3.codec.decode([collapse_if_tuple(output) for output in call.abi['outputs']], return_data)
+				decoded.append(values[0] if len(values) == 1 else list(values))
+			return decoded
+
+		try:
+			with web3.batch_requests() as batch:
+				for call in calls:
+					batch.add(call)
+				return list(batch.execute())
+		except Exception as e:
+			logger.debug(f"Batch request failed, falling back to individual calls: {str(e)}")
+			return [call.call() for call in calls]
+
+	def getPairAddress(self, pair: list) -> str:
+		"""
+		Resolves a Citea pair address from the factory. Pair addresses never change once created.
+		"""
+		key = frozenset(pair)
+		address = self._pairs.get(key)
+		if address is None:
+			address = self.getContract('citeaFactory').functions.getPair(pair[0], pair[1]).call()
+			# Don't cache pairs that don't exist (yet).
+			if int(address, 16) != 0:
+				with self._lock:
+					address = self._pairs.setdefault(key, address)
+		return address
+
+# Retry backoff for failed attempts, in seconds
+BACKOFF_BASE = 2
+BACKOFF_CAP = 60
+
+def backoffDelay(failures: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+	"""
+	Returns the delay before the next retry: exponential in the number of
+	consecutive failures, capped, with jitter so that wallets don't retry in lockstep.
+	"""
+	delay = min(cap, base * 2 ** max(failures - 1, 0))
+	return random.uniform(delay / 2, delay)
+
+# Send errors after which the local nonce can no longer be trusted
+NONCE_ERRORS = ("nonce too low", "nonce too high", "invalid nonce", "replacement transaction underpriced")
+# Send errors meaning the node already has the transaction, e.g. when a send that timed out
+# is retried on another endpoint: the transaction was sent
+KNOWN_TRANSACTION_ERRORS = ("already known", "known transaction", "already imported")
+
+def alreadyKnown(error: Exception) -> bool:
+	return any(err in str(error).lower() for err in KNOWN_TRANSACTION_ERRORS)
+
+class NonceManager:
+	"""
+	Hands out transaction nonces locally per (address, network).
+
+	Each account is seeded once from the pending transaction count and then
+	incremented in-process, so building a transaction doesn't need an RPC round trip.
+	"""
+	def __init__(self) -> None:
+		self._lock = threading.Lock()
+		self._key_locks = {}
+		self._nonces = {}
+
+	def _keyLock(self, key: tuple) -> threading.Lock:
+		with self._lock:
+			return self._key_locks.setdefault(key, threading.Lock())
+
+	def allocate(self, web3: Web3, address: str, network: str) -> int:
+		"""
+		Returns the next nonce for the account, seeding it from the chain on first use.
+		"""
+		key = (address, network)
+		with self._keyLock(key):
+			if key not in self._nonces:
+				self._nonces[key] = web3.eth.get_transaction_count(address, 'pending')
+			nonce = self._nonces[key]
+			self._nonces[key] += 1
+			return nonce
+
+	def resync(self, web3: Web3, address: str, network: str) -> int:
+		"""
+		Reseeds the account from the chain, e.g. after a rejected or dropped transaction.
+		"""
+		key = (address, network)
+		with self._keyLock(key):
+			self._nonces[key] = web3.eth.get_transaction_count(address, 'pending')
+			logger.info(f"Resynced {network} nonce to {self._nonces[key]}.")
+			return self._nonces[key]
+
+nonce_manager = NonceManager()
+
+# Retry limits, overridden by the retryPolicy config key
+RETRY_POLICY = {"maxAttempts": 8, "operationBudget": 900, "walletBudget": 3600}
+
+# Failure classes and the error messages that identify them, checked in order
+# after the HTTP status and JSON-RPC error code (see failureResult)
+FAILURE_CLASSES = (
+	("underpriced", ("transaction underpriced", "fee too low", "less than block base fee")),
+	("nonce", ("nonce too low", "nonce too high", "invalid nonce")),
+	("funds", ("insufficient funds", "cannot afford")),
+	("rateLimit", RATE_LIMIT_ERRORS),
+	("timeout", ("timed out", "timeout", "is not in the chain after", "connection refused", "connection reset", "connection aborted")),
+	("revert", ("execution reverted", "reverted"))
+)
+
+# Exceptions of requests that didn't get an answer in time or at all
+TIMEOUT_EXCEPTIONS = (TimeExhausted, requests.Timeout, requests.ConnectionError, aiohttp.ClientConnectionError, asyncio.TimeoutError, FutureTimeout)
+
+def failureResult(error: Exception) -> dict:
+	"""
+	Returns the failed result for an exception, with the HTTP status and JSON-RPC
+	error code of the request that raised it when there is one.
+	"""
+	result = {'status': 'failed', 'error': str(error)}
+	if isinstance(error, (requests.HTTPError, aiohttp.ClientResponseError)) and _status(error) is not None:
+		result['httpStatus'] = _status(error)
+	rpc_error = (getattr(error, 'rpc_response', None) or {}).get('error')
+	if isinstance(rpc_error, dict) and rpc_error.get('code') is not None:
+		result['code'] = rpc_error['code']
+	if isinstance(error, TIMEOUT_EXCEPTIONS):
+		result['timeout'] = True
+	return result
+
+def classifyFailure(result: dict) -> str:
+	"""
+	Returns the failure class of a failed operation result: 'permanent' when the
+	operation marked it as not worth retrying, 'revert' for a mined transaction that
+	failed and 'other' when the error isn't recognized.
+	Rate limits and timeouts are told by HTTP status, JSON-RPC code and exception type;
+	FAILURE_CLASSES phrases only apply after those.
+	"""
+	if result.get('permanent'):
+		return "permanent"
+	error = str(result.get('error', '')).lower()
+	if not error and result.get('tx'):
+		return "revert"
+	status = result.get('httpStatus')
+	if status == 429 or result.get('code') in RATE_LIMIT_CODES:
+		return "rateLimit"
+	if result.get('timeout') or (status or 0) >= 500:
+		return "timeout"
+	for name, patterns in FAILURE_CLASSES:
+		if any(pattern in error for pattern in patterns):
+			return name
+	return "other"
+
+class RetryPolicy:
+	"""
+	Bounds the retries of one wallet's run.
+
+	Failures are classified by classifyFailure and handled by class: nonce errors are
+	retried at once (the nonce was already resynced when the send failed), underpriced
+	transactions are retried at once with bumped fees, a wallet that can't pay for gas
+	is skipped, permanent failures are given up and everything else backs off. Each operation gets `maxAttempts` failed
+	attempts and `operationBudget` seconds, and the whole wallet `walletBudget` seconds.
+	Time spent on failed attempts and backoff is reported per failure class.
+	"""
+	def __init__(self, wallet=None, settings: dict = None) -> None:
+		settings = {**RETRY_POLICY, **(settings or {})}
+		self.max_attempts = settings["maxAttempts"]
+		self.operation_budget = settings["operationBudget"]
+		self.wallet_budget = settings["walletBudget"]
+		self.wallet = wallet
+		self.started = time.monotonic()
+		self.abandoned = None
+		self._operations = {}
+		self._retries = {}
+
+	def begin(self, name: str) -> None:
+		self._operations.setdefault(name, {'started': time.monotonic(), 'attempts': 0, 'consecutive': 0})
+
+	def expired(self) -> bool:
+		"""
+		Whether the wallet's budget is used up; the wallet is then abandoned.
+		"""
+		if self.abandoned is None and time.monotonic() - self.started >= self.wallet_budget:
+			self.abandoned = f"Wallet budget of {self.wallet_budget}s exhausted"
+			logger.warning(f"{self.abandoned}, skipping the remaining operations.")
+		return self.abandoned is not None
+
+	def succeeded(self, name: str) -> None:
+		self._operations[name]['consecutive'] = 0
+		if self.wallet is not None:
+			self.wallet.fee_bump = 0
+
+	def failed(self, name: str, result: dict, seconds: float = 0.0) -> float:
+		"""
+		Accounts a failed attempt that took `seconds`.
+
+		Returns:
+			float: The delay before retrying, or None to give up on the operation.
+		"""
+		kind = classifyFailure(result)
+		state = self._operations[name]
+		state['attempts'] += 1
+		state['consecutive'] += 1
+
+		delay = None
+		if kind == "funds":
+			self.abandoned = f"Insufficient funds during {name}"
+			logger.warning(f"{self.abandoned}, skipping wallet.")
+		elif kind == "permanent":
+			logger.warning(f"Giving up on {name}: {result.get('error')}")
+		elif state['attempts'] >= self.max_attempts:
+			logger.warning(f"Giving up on {name} after {state['attempts']} failed attempt(s), last: {kind}.")
+		elif kind in ("nonce", "underpriced"):
+			delay = 0.0
+			if kind == "underpriced" and self.wallet is not None:
+				self.wallet.fee_bump += 1
+		else:
+			delay = backoffDelay(state['consecutive'])
+
+		if delay is not None:
+			now = time.monotonic()
+			remaining = min(state['started'] + self.operation_budget, self.started + self.wallet_budget) - now
+			if delay >= remaining:
+				logger.warning(f"Giving up on {name}: retrying would exceed its time budget.")
+				delay = None
+
+		retries = self._retries.setdefault(kind, {'attempts': 0, 'seconds': 0.0})
+		retries['attempts'] += 1
+		retries['seconds'] += seconds + (delay or 0.0)
+		if delay is not None:
+			metrics.retry(name, seconds + delay)
+		return delay
+
+	def report(self) -> dict:
+		"""
+		Returns the failed attempts and the seconds they and their backoff took, in total and per failure class.
+		"""
+		return {
+			'attempts': sum(entry['attempts'] for entry in self._retries.values()),
+			'seconds': round(sum(entry['seconds'] for entry in self._retries.values()), 3),
+			'classes': {kind: dict(entry, seconds=round(entry['seconds'], 3)) for kind, entry in self._retries.items()}
+		}
+
+class SQLiteStore:
+	"""
+	Base for the local SQLite stores. Each file is opened once per process and
+	the connection is shared by every wallet, serialized by a lock.
+	"""
+	SCHEMA = ""
+	DEFAULT_PATH = None
+
+	_shared = {}
+	_shared_lock = threading.Lock()
+
+	def __init__(self, path: str = None) -> None:
+		self.path = path or self.DEFAULT_PATH
+		self._lock = threading.Lock()
+		self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+		self._db.execute("PRAGMA journal_mode=WAL")
+		self._db.execute("PRAGMA synchronous=NORMAL")
+		self._db.executescript(self.SCHEMA)
+
+	@classmethod
+	def shared(cls, path: str = None):
+		"""
+		Returns the process-wide store at `path`, opening it on first use.
+		"""
+		key = (cls, path or cls.DEFAULT_PATH)
+		with cls._shared_lock:
+			if key not in SQLiteStore._shared:
+				SQLiteStore._shared[key] = cls(path)
+			return SQLiteStore._shared[key]
+
+	@contextmanager
+	def _transaction(self):
+		with self._lock:
+			self._db.execute("BEGIN")
+			try:
+				yield self._db
+			except BaseException:
+				self._db.execute("ROLLBACK")
+				raise
+			self._db.execute("COMMIT")
+
+# Default location of the local withdrawal index
+WITHDRAWAL_DB = "withdrawals.db"
+# States a withdrawal goes through, in order
+WITHDRAWAL_STATES = ("initiated", "proven", "finalized")
+# How long an address' withdrawal list from the Gelato API is used before it is fetched again, in seconds
+WITHDRAWAL_SYNC_INTERVAL = 3600
+
+class WithdrawalIndex(SQLiteStore):
+	"""
+	Local SQLite record of every withdrawal per address and how far it has got,
+	so that prove and finalize passes only touch withdrawals that still need work.
+	Withdrawals remember the L1 block they were last checked at, so a pass at the same
+	head skips them instead of checking them again, and addresses when their list was
+	last synced, so it is refetched at most every WITHDRAWAL_SYNC_INTERVAL seconds.
+	"""
+	SCHEMA = """
+		CREATE TABLE IF NOT EXISTS withdrawals (
+			address TEXT NOT NULL,
+			tx_hash TEXT NOT NULL,
+			state TEXT NOT NULL DEFAULT 'initiated',
+			checked_block INTEGER,
+			updated_at REAL,
+			PRIMARY KEY (address, tx_hash)
+		);
+		CREATE INDEX IF NOT EXISTS withdrawals_state ON withdrawals (address, state);
+		CREATE TABLE IF NOT EXISTS syncs (
+			address TEXT PRIMARY KEY,
+			checked_block INTEGER NOT NULL,
+			updated_at REAL
+		);
+	"""
+	DEFAULT_PATH = WITHDRAWAL_DB
+
+	@staticmethod
+	def _key(tx_hash: str) -> str:
+		return Web3.to_hex(HexBytes(tx_hash))
+
+	def add(self, address: str, tx_hashes: Iterable[str], checked_block: int = None) -> int:
+		"""
+		Indexes withdrawals that aren't known yet as initiated. Returns how many were new.
+		With `checked_block`, the address is recorded as synced at that L1 block.
+		"""
+		rows = [(address, self._key(tx_hash), time.time()) for tx_hash in tx_hashes]
+		with self._transaction() as db:
+			changes = db.total_changes
+			db.executemany("INSERT OR IGNORE INTO withdrawals (address, tx_hash, updated_at) VALUES (?, ?, ?)", rows)
+			added = db.total_changes - changes
+			if checked_block is not None:
+				db.execute("INSERT OR REPLACE INTO syncs (address, checked_block, updated_at) VALUES (?, ?, ?)", (address, checked_block, time.time()))
+			return added
+
+	def synced(self, address: str, max_age: float = WITHDRAWAL_SYNC_INTERVAL) -> bool:
+		"""
+		Whether the address' withdrawal list was synced less than `max_age` seconds ago.
+		"""
+		with self._lock:
+			row = self._db.execute("SELECT updated_at FROM syncs WHERE address = ?", (address,)).fetchone()
+		return row is not None and row[0] is not None and time.time() - row[0] < max_age
+
+	def pending(self, address: str, states: Iterable[str], head: int = None) -> list:
+		"""
+		Returns the transaction hashes of the address' withdrawals in any of `states`, oldest first.
+		With `head`, withdrawals already checked at or after that L1 block are left out.
+		"""
+		states = tuple(states)
+		query = f"SELECT tx_hash FROM withdrawals WHERE address = ? AND state IN ({', '.join('?' * len(states))})"
+		params = (address, *states)
+		if head is not None:
+			query += " AND (checked_block IS NULL OR checked_block < ?)"
+			params += (head,)
+		with self._lock:
+			rows = self._db.execute(query + " ORDER BY rowid", params).fetchall()
+		return [row[0] for row in rows]
+
+	def update(self, address: str, tx_hash: str, checked_block: int, state: str = None) -> None:
+		"""
+		Records that a withdrawal was checked at an L1 block and, if given, the state it reached.
+		"""
+		with self._lock:
+			self._db.execute(
+				"UPDATE withdrawals SET state = COALESCE(?, state), checked_block = ?, updated_at = ? WHERE address = ? AND tx_hash = ?",
+				(state, checked_block, time.time(), address, self._key(tx_hash))
+			)
+
+	def counts(self, address: str) -> dict:
+		with self._lock:
+			rows = self._db.execute("SELECT state, COUNT(*) FROM withdrawals WHERE address = ? GROUP BY state", (address,)).fetchall()
+		return {state: 0 for state in WITHDRAWAL_STATES} | dict(rows)
+
+# Default location of the run journal
+JOURNAL_DB = "journal.db"
+
+class RunJournal(SQLiteStore):
+	"""
+	Durable record of every wallet's progress through a run: successful attempts
+	per operation and transactions that were sent but not yet accounted for.
+	A restarted run resumes from it instead of repeating transactions.
+	"""
+	SCHEMA = """
+		CREATE TABLE IF NOT EXISTS progress (
+			run_id TEXT NOT NULL,
+			address TEXT NOT NULL,
+			operation TEXT NOT NULL,
+			successes INTEGER NOT NULL DEFAULT 0,
+			PRIMARY KEY (run_id, address, operation)
+		);
+		CREATE TABLE IF NOT EXISTS inflight (
+			run_id TEXT NOT NULL,
+			address TEXT NOT NULL,
+			tx_hash TEXT NOT NULL,
+			network TEXT NOT NULL,
+			operation TEXT,
+			counted INTEGER NOT NULL,
+			sent_at REAL,
+			PRIMARY KEY (run_id, tx_hash)
+		);
+		CREATE TABLE IF NOT EXISTS wallets (
+			run_id TEXT NOT NULL,
+			address TEXT NOT NULL,
+			completed_at REAL,
+			PRIMARY KEY (run_id, address)
+		);
+	"""
+	DEFAULT_PATH = JOURNAL_DB
+
+	@staticmethod
+	def runId(opr_type: int = 0, at: float = None) -> str:
+		"""
+		Default run id: one run per UTC day and mode, matching the daily tasks. `at` picks the day (default: today).
+		"""
+		return f"{time.strftime('%Y-%m-%d', time.gmtime(at))}/{opr_type}"
+
+	def wallet(self, run_id: str, address: str) -> "WalletJournal":
+		return WalletJournal(self, run_id, address)
+
+	def completed(self, run_id: str) -> int:
+		"""
+		Returns the number of wallets that finished the run.
+		"""
+		with self._lock:
+			return self._db.execute("SELECT COUNT(*) FROM wallets WHERE run_id = ?", (run_id,)).fetchone()[0]
+
+	def clear(self, run_id: str) -> None:
+		"""
+		Forgets everything recorded for a run, so that it starts from scratch.
+		"""
+		with self._transaction() as db:
+			for table in ("progress", "inflight", "wallets"):
+				db.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+
+	def successes(self, run_id: str, address: str) -> dict:
+		with self._lock:
+			rows = self._db.execute("SELECT operation, successes FROM progress WHERE run_id = ? AND address = ?", (run_id, address)).fetchall()
+		return dict(rows)
+
+	def record(self, run_id: str, address: str, operation: str, successes: int) -> None:
+		"""
+		Stores the operation's success count and drops its counted transactions
+		from the in-flight list in the same transaction, so none is counted twice.
+		"""
+		with self._transaction() as db:
+			db.execute(
+				"INSERT INTO progress (run_id, address, operation, successes) VALUES (?, ?, ?, ?) "
+				"ON CONFLICT (run_id, address, operation) DO UPDATE SET successes = excluded.successes",
+				(run_id, address, operation, successes)
+			)
+			db.execute("DELETE FROM inflight WHERE run_id = ? AND address = ? AND operation = ? AND counted = 1", (run_id, address, operation))
+
+	def sent(self, run_id: str, address: str, tx_hash, network: str, operation: str, counted: bool = True) -> None:
+		with self._lock:
+			self._db.execute(
+				"INSERT OR REPLACE INTO inflight (run_id, address, tx_hash, network, operation, counted, sent_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+				(run_id, address, Web3.to_hex(HexBytes(tx_hash)), network, operation, int(counted), time.time())
+			)
+
+	def settled(self, run_id: str, tx_hash) -> None:
+		with self._lock:
+			self._db.execute("DELETE FROM inflight WHERE run_id = ? AND tx_hash = ?", (run_id, Web3.to_hex(HexBytes(tx_hash))))
+
+	def inflight(self, run_id: str, address: str) -> list:
+		"""
+		Returns (tx_hash, network, operation, counted) of the address's transactions left unaccounted for, in sending order.
+		"""
+		with self._lock:
+			rows = self._db.execute(
+				"SELECT tx_hash, network, operation, counted FROM inflight WHERE run_id = ? AND address = ? ORDER BY sent_at",
+				(run_id, address)
+			).fetchall()
+		return [(tx_hash, network, operation, bool(counted)) for tx_hash, network, operation, counted in rows]
+
+	def complete(self, run_id: str, address: str) -> None:
+		with self._lock:
+			self._db.execute("INSERT OR REPLACE INTO wallets (run_id, address, completed_at) VALUES (?, ?, ?)", (run_id, address, time.time()))
+
+	def isComplete(self, run_id: str, address: str) -> bool:
+		with self._lock:
+			return self._db.execute("SELECT 1 FROM wallets WHERE run_id = ? AND address = ?", (run_id, address)).fetchone() is not None
+
+class WalletJournal:
+	"""
+	One wallet's view of the run journal. `operation` names the operation whose
+	transactions are being sent, and is set by the runners before each attempt.
+	"""
+	def __init__(self, journal: RunJournal, run_id: str, address: str) -> None:
+		self.journal = journal
+		self.run_id = run_id
+		self.address = address
+		self.operation = None
+
+	def successes(self) -> dict:
+		return self.journal.successes(self.run_id, self.address)
+
+	def record(self, operation: str, successes: int) -> None:
+		self.journal.record(self.run_id, self.address, operation, successes)
+
+	def sent(self, tx_hash, network: str, counted: bool = True) -> None:
+		"""
+		Records a transaction that was broadcast. `counted` transactions are the ones
+		whose success is a success of the current operation (i.e. not approvals).
+		"""
+		self.journal.sent(self.run_id, self.address, tx_hash, network, self.operation, counted)
+
+	def settled(self, tx_hash) -> None:
+		self.journal.settled(self.run_id, tx_hash)
+
+	def inflight(self) -> list:
+		return self.journal.inflight(self.run_id, self.address)
+
+	def complete(self) -> None:
+		self.journal.complete(self.run_id, self.address)
+
+	def isComplete(self) -> bool:
+		return self.journal.isComplete(self.run_id, self.address)
+
+class WalletBase:
+	"""
+	The parts of a wallet handle that don't do I/O, shared by SFI and AsyncSFI:
+	settings, contract lookups, transaction parameters, quote math, result shaping
+	and withdrawal bookkeeping. The subclasses add the blocking or asynchronous calls.
+	"""
+	def __init__(self, private_key: str, context, confirmations: int = 1, approve_max: bool = False, withdrawals: WithdrawalIndex = None, simulate: bool = False, replacement: dict = None) -> None:
+		self.GELATO_API = GELATO_API
+		self.CRYMBO_API = CRYMBO_API
+
+		self.context = context
+		self.contracts = self.context.contracts
+
+		self.pk = private_key
+		self.address = Account.from_key(self.pk).address
+		self.confirmations = confirmations
+		self.approve_max = approve_max
+		self.approvals_saved = 0
+		self._withdrawals = withdrawals
+		self.simulate = simulate
+		self.skipped = {}
+		self.fee_bump = 0
+		replacement = {**REPLACEMENT, **(replacement or {})}
+		self.replace_after = replacement["afterBlocks"]
+		self.fee_cap = replacement["feeCap"]
+		self.journal = None
+
+	@property
+	def withdrawals(self) -> WithdrawalIndex:
+		"""
+		The withdrawal index given to the handle, or an in-memory one opened on first use.
+		"""
+		if self._withdrawals is None:
+			self._withdrawals = WithdrawalIndex(":memory:")
+		return self._withdrawals
+
+	@property
+	def sfi_web3(self):
+		return self.context.web3['sfi']
+
+	@property
+	def sep_web3(self):
+		return self.context.web3['sep']
+
+	def _getContractAddress(self, key: str, network: str = "sfi") -> str:
+		"""
+		Retrieves a contract address.
+		"""
+		try:
+			return self.contracts[network][key]['ca']
+		except:
+			logger.error(f"Contract not defined.")
+			raise
+
+	def _getContract(self, key: str, network: str = "sfi"):
+		"""
+		Retrieves a contract instance.
+		"""
+		try:
+			return self.context.getContract(key, network)
+		except:
+			logger.error(f"Contract not defined.")
+			raise
+
+	def _convertKeyPair(self, pair: list) -> list:
+		try:
+			return [self._getContractAddress(token) for token in pair]
+		except KeyError as e:
+			logger.error(f"Token '{e.args[0]}' not found in CONTRACTS.")
+			return []
+
+	def _getTokenContract(self, _token: str, network: str = "sfi", abi: list = None):
+		"""
+		Resolves a token key from CONTRACTS, or a token address with the given (or the default ERC-20) ABI.
+		"""
+		if _token in self.contracts[network]:
+			return self._getContract(_token, network)
+		return self.context.getContractAt(_token, abi or ERC20_ABI, network)
+
+	def _allowanceCall(self, _token: str, _spender: str, network: str = "sfi", abi: list = None):
+		"""
+		Returns the allowance view call for _spender, so operations can batch it with their other reads.
+		"""
+		contract = self._getTokenContract(_token, network, abi)
+		return contract.functions.allowance(self.address, self.contracts[network][_spender]['ca'])
+
+	def _decodeMessagePassed(self, receipt) -> dict:
+		events = self.context.withdrawalEvents().decodeReceipt(receipt, 'MessagePassed')
+		return events[0]['args'] if events else {}
+
+	def _transactionParams(self, call, network: str, chain_id: int, fees: dict, value: int = None) -> dict:
+		"""
+		Parameters to build a transaction for the call with. The nonce is assigned right before signing.
+		"""
+		params = {
+			"chainId": chain_id,
+			"from": self.address,
+			**bumpFees(fees, self.fee_bump)
+		}
+		if value is not None:
+			params["value"] = value
+
+		# Reuse the gas limit learned from earlier receipts of the same call, if any.
+		gas = self.context.gas_profiles.get((network, call.address, call.selector))
+		if gas:
+			params["gas"] = gas
+		return params
+
+	def _simulationParams(self, value: int = None) -> dict:
+		params = {"from": self.address}
+		if value is not None:
+			params["value"] = value
+		return params
+
+	def _simulationFailed(self, error: Exception) -> dict:
+		"""
+		Turns the error of a reverted simulation into a 'skipped' result with the decoded
+		revert reason. Errors that don't mean the call would revert are raised again.
+		"""
+		if isinstance(error, ContractLogicError):
+			result = self.context.errors.describe(error)
+		elif isinstance(error, Web3RPCError) and any(err in str(error).lower() for err in INSUFFICIENT_FUNDS_ERRORS):
+			result = {'status': 'skipped', 'error': str(error)}
+		else:
+			raise error
+
+		self.skipped[current_operation.get()] = result['error']
+		logger.warning(f"Simulation reverted, not sending: {result['error']}")
+		return result
+
+	def _settleReceipt(self, tx_hash, receipt, network: str, transaction: dict = None, counted: bool = True) -> None:
+		"""
+		Feeds a mined transaction to the shared gas profiles and reserve cache, and drops it
+		from the journal unless it is a counted success, which stays until its operation's
+		progress is recorded.
+		"""
+		if transaction is not None:
+			self.context.gas_profiles.record(GasProfiles.key(network, transaction), receipt)
+		if network == "sfi":
+			self.context.reserves.applyReceipt(receipt)
+		if self.journal is not None and (receipt.status != 1 or not counted):
+			self.journal.settled(tx_hash)
+
+	@staticmethod
+	def _receiptResult(tx_hash, receipt) -> dict:
+		if receipt.status == 1:
+			logger.info(f"Transaction successful: {tx_hash.hex()}")
+			return {'status': 'success', 'tx': tx_hash.hex()}
+		logger.error(f"Transaction failed: {tx_hash.hex()}")
+		return {'status': 'failed', 'tx': tx_hash.hex()}
+
+	def _settleReplaced(self, hashes: list, mined) -> None:
+		"""
+		Drops the transactions that lost the race to the mined one (`mined`) from the journal.
+		"""
+		if self.journal is not None:
+			for sent in hashes:
+				if sent != mined:
+					self.journal.settled(sent)
+
+	def _approveCall(self, contract, _spender: str, _amount: int, allowance: int, network: str = "sfi"):
+		"""
+		Returns the approve call for _amount, or None when `allowance` already covers it.
+		"""
+		if allowance >= _amount:
+			self.approvals_saved += 1
+			logger.info(f"Allowance {allowance} already covers {_amount}, skipping approval.")
+			return None
+		return contract.functions.approve(self.contracts[network][_spender]['ca'], 2**256-1 if self.approve_max else _amount)
+
+	@staticmethod
+	def _lockPeriodOf(userInfo: list) -> int:
+		_lockPeriod = int(userInfo[2] - userInfo[1])
+		if _lockPeriod <= 0:
+			logger.warning("Invalid lock period detected, setting to default (100 days).")
+			_lockPeriod = 8640000 # 100 Days
+		return _lockPeriod
+
+	def _swapCall(self, _amount: int, _amountsOut: list, pair: list, pairKey: list, slippage: float):
+		_amountOutMin = int(_amountsOut[1]*(1 - slippage))
+
+		logger.info(f"Setting slippage to {slippage*100}%")
+		logger.info(f"Swapping {_amount} {pairKey[0]} for {_amountOutMin} {pairKey[1]} ...")
+		return self._getContract('citeaRouter').functions.swapExactTokensForTokensSupportingFeeOnTransferTokens(_amount, _amountOutMin, pair, self.address, 2**256-1)
+
+	def _addLiquidityCall(self, _amountA: int, _amountB: int, pair: list, pairKey: list, slippage: float):
+		logger.info(f"Setting slippage to {slippage*100}%")
+		logger.info(f"Adding {_amountA} {pairKey[0]} and {_amountB} {pairKey[1]} to liquidity pool ...")
+		return self._getContract('citeaRouter').functions.addLiquidity(
+			pair[0],
+			pair[1],
+			_amountA,
+			_amountB,
+			int(_amountA * (1 - slippage)),
+			int(_amountB * (1 - slippage)),
+			self.address,
+			2**256-1
+		)
+
+	def _removeLiquidityCall(self, liquidity: int, supply: int, reserves: tuple, pair: list, slippage: float):
+		_amountA, _amountB = getBurnAmounts(liquidity, supply, *reserves)
+
+		logger.info(f"Setting slippage to {slippage*100}%")
+		logger.info(f"Removing {liquidity} liquidity from pool ...")
+		return self._getContract('citeaRouter').functions.removeLiquidity(
+			pair[0],
+			pair[1],
+			liquidity,
+			int(_amountA * (1 - slippage)),
+			int(_amountB * (1 - slippage)),
+			self.address,
+			2**256-1
+		)
+
+	@staticmethod
+	def _crymboResult(res: dict) -> dict:
+		logger.info(res)
+		if res['msg'] == "Points added":
+			return {"status": "success", "msg": "Points added"}
+		# The API answered; asking again won't change its mind today.
+		return {"status": "failed", "error": res.get('msg'), "permanent": True}
+
+	def _gelatoWithdrawal(self, amount: int, tx_hash: str, raw_tx: str) -> dict:
+		"""
+		The Gelato API request that registers an initiated withdrawal for bridging.
+		"""
+		return {
+			"direction": 1,
+			"from": self.address,
+			"to": self.address,
+			"l1Token": "0x9a3f60032941C91cdeF5dBB58f2cE80e47e3ddCA",
+			"l2Token": "0x9a3f60032941C91cdeF5dBB58f2cE80e47e3ddCA",
+			"amount": str(amount),
+			"data": "0x",
+			"logIndex": 0,
+			"blockNumber": 0,
+			"transactionHash": f"0x{tx_hash}",
+			"timestamp": int(time.time() * 1000.0),
+			"messageStatus": 2,
+			"button": True,
+			"slug": "singularity-finance-testnet",
+			"isWithdraw": True,
+			"rawTx": raw_tx
+		}
+
+	@staticmethod
+	def _checkWithdrawalEvent(event_data: dict) -> dict:
+		"""
+		Returns the failed result for missing or incomplete MessagePassed data, otherwise None.
+		"""
+		if not event_data:
+			logger.error("Failed to fetch event data for the transaction.")
+			return {'status': 'failed', 'error': 'Event data not found'}
+		if not (event_data.get('withdrawalHash') and event_data.get('nonce') and event_data.get('value')):
+			logger.error("Incomplete event data.")
+			return {'status': 'failed', 'error': 'Incomplete event data'}
+		return None
+
+	def _withdrawalTransaction(self, event_data: dict) -> tuple:
+		return (event_data['nonce'], self.address, self.address, event_data['value'], event_data['gasLimit'], "0x")
+
+	def _proveCall(self, event_data: dict, output_index: int, block, proof_data) -> tuple:
+		"""
+		Returns (call, None) with the portal call proving the withdrawal, or (None, result) when the proof is missing.
+		"""
+		if not proof_data or 'storageProof' not in proof_data or not proof_data['storageProof']:
+			logger.error("Proof data retrieval failed.")
+			return None, {'status': 'failed', 'error': 'Proof data retrieval failed'}
+
+		return self._getContract('portal', 'sep').functions.proveWithdrawalTransaction(
+			self._withdrawalTransaction(event_data),
+			output_index,
+			(b'\x00' * 32, block['stateRoot'], proof_data['storageHash'], block['hash']),
+			proof_data['storageProof'][0]['proof']
+		), None
+
+	def _finalizeCall(self, event_data: dict):
+		return self._getContract('portal', 'sep').functions.finalizeWithdrawalTransaction(self._withdrawalTransaction(event_data))
+
+	def _indexWithdrawals(self, listed: list, head: int = None) -> int:
+		"""
+		Adds the withdrawals of a Gelato API list to the index. Returns how many were new.
+		"""
+		if listed is None:
+			return 0
+		added = self.withdrawals.add(self.address, [w['transactionHash'] for w in listed], head)
+		if added:
+			logger.info(f"Indexed {added} new withdrawal(s).")
+		return added
+
+	def _recordWithdrawal(self, tx_hash: str, result: dict, checked_block: int, next_state: str) -> None:
+		"""
+		Records that a withdrawal was checked at `checked_block`, moving it to `next_state` if its transaction succeeded.
+		"""
+		if result['status'] == 'success':
+			logger.info(f"Successfully processed withdrawal: {tx_hash}")
+			self.withdrawals.update(self.address, tx_hash, checked_block, next_state)
+		else:
+			self.withdrawals.update(self.address, tx_hash, checked_block)
+
+class SFI(WalletBase):
+	def __init__(self, private_key: str, context: ChainContext = None, confirmations: int = 1, approve_max: bool = False, withdrawals: WithdrawalIndex = None, simulate: bool = False, replacement: dict = None) -> None:
+		"""
+		Initializes the SFI wallet handle on top of the shared chain context.
+		A transaction counts as done once it has `confirmations` blocks on top of it (including its own).
+		With `approve_max`, approvals grant an unlimited allowance so later runs can skip them.
+		Withdrawals are tracked in `withdrawals`, or in memory for this handle only when it isn't given.
+		With `simulate`, every transaction is first run with eth_call and skipped if it would revert.
+		Transactions pending for longer than the `replacement` settings allow are replaced with higher fees.
+		"""
+		super().__init__(private_key, context or ChainContext.shared(), confirmations, approve_max, withdrawals, simulate, replacement)
+		self.nonces = nonce_manager
+		self.pipelined = False
+		self._pending = []
+
+	def _buildTransaction(self, call, network: str = "sfi", value: int = None) -> dict:
+		"""
+		Builds a transaction for a contract function call.
+		The nonce is assigned by _executeTransaction right before signing.
+		"""
+		return call.build_transaction(self._transactionParams(call, network, self.context.getChainId(network), self.context.getFees(network), value))
+
+	def _simulate(self, call, network: str = "sfi", value: int = None) -> dict:
+		"""
+		Runs the call with eth_call against the pending block.
+		Returns a 'skipped' result with the decoded revert reason if it would fail, otherwise None.
+		"""
+		try:
+			call.call(self._simulationParams(value), block_identifier="pending")
+			return None
+		except (ContractLogicError, Web3RPCError) as e:
+			return self._simulationFailed(e)
+
+	def _transact(self, call, network: str = "sfi", value: int = None, counted: bool = True) -> dict:
+		"""
+		Builds and executes a transaction for the call, after a pre-flight simulation when enabled.
+		"""
+		if self.simulate:
+			result = self._simulate(call, network, value)
+			if result is not None:
+				return result
+		return self._executeTransaction(self._buildTransaction(call, network, value), network, counted)
+
+	@contextmanager
+	def pipeline(self):
+		"""
+		Within this context, transactions are sent without waiting for their receipts.
+		Receipts are gathered afterwards with collectReceipts().
+		"""
+		self.pipelined = True
+		try:
+			yield self
+		finally:
+			self.pipelined = False
+
+	def _sendTransaction(self, transaction: dict, network: str = "sfi", counted: bool = True):
+		"""
+		Assigns a nonce to the transaction, signs and sends it. Returns the transaction hash.
+		Sent transactions are recorded in the wallet's journal, if any, until they are accounted for.
+		"""
+		method_name = getattr(self, f"{network}_web3", None)
+		if not method_name:
+			logger.error(f"Method {method_name} not found or not callable.")
+			raise
+		
+		transaction['nonce'] = self.nonces.allocate(method_name, self.address, network)
+		signed_tx = method_name.eth.account.sign_transaction(transaction, private_key=self.pk)
+
+		try:
+			tx_hash = method_name.eth.send_raw_transaction(signed_tx.raw_transaction)
+		except Exception as e:
+			if not alreadyKnown(e):
+				# The nonce was never consumed on-chain, so hand it back by resyncing.
+				if any(err in str(e).lower() for err in NONCE_ERRORS):
+					logger.warning(f"Nonce {transaction['nonce']} rejected: {str(e)}")
+				self.nonces.resync(method_name, self.address, network)
+				raise
+			tx_hash = Web3.keccak(signed_tx.raw_transaction)
+
+		if self.journal is not None:
+			self.journal.sent(tx_hash, network, counted)
+		return tx_hash
+
+	def _awaitReceipt(self, tx_hash, network: str = "sfi", transaction: dict = None, counted: bool = True) -> dict:
+		"""
+		Waits for a sent transaction to be mined and reports its status.
+		When the transaction is given, its gas usage feeds the shared gas profiles,
+		and it is replaced with higher fees if it stays pending (see _waitReplacing).
+		Successful counted transactions stay in the journal until their operation's progress is recorded.
+		"""
+		try:
+			method_name = getattr(self, f"{network}_web3")
+			watcher = self.context.getReceiptWatcher(network)
+			try:
+				if transaction is not None:
+					tx_hash, tx_receipt = self._waitReplacing(tx_hash, network, transaction, counted)
+				elif watcher:
+					tx_receipt = watcher.waitForReceipt(method_name, tx_hash)
+				else:
+					tx_receipt = method_name.eth.wait_for_transaction_receipt(tx_hash)
+			except TimeExhausted:
+				# The transaction may have been dropped from the mempool.
+				self.nonces.resync(method_name, self.address, network)
+				raise
+
+			self._settleReceipt(tx_hash, tx_receipt, network, transaction, counted)
+			if tx_receipt.status == 1:
+				self._waitForConfirmations(tx_receipt, network)
+			return self._receiptResult(tx_hash, tx_receipt)
+
+		except Exception as e:
+			logger.error(f"Transaction error: {str(e)}")
+			return failureResult(e)
+
+	def _replaceTransaction(self, transaction: dict, original: dict, network: str = "sfi", counted: bool = True) -> tuple:
+		"""
+		Re-signs the transaction's nonce with bumped fees and sends it.
+		Returns the replacement and its hash, or None when the fee cap is reached or the send fails.
+		"""
+		fees = replacementFees(transaction, self.context.getFees(network), original, self.fee_cap)
+		if fees is None:
+			logger.warning(f"Nonce {transaction['nonce']} is still pending, but replacing it would exceed the fee cap.")
+			return None
+
+		web3 = getattr(self, f"{network}_web3")
+		replacement = {**transaction, **fees}
+		signed_tx = web3.eth.account.sign_transaction(replacement, private_key=self.pk)
+		try:
+			tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+		except Exception as e:
+			# e.g. nonce too low: one of the earlier transactions was mined meanwhile.
+			if not alreadyKnown(e):
+				logger.warning(f"Replacement of nonce {transaction['nonce']} not sent: {str(e)}")
+				return None
+			tx_hash = Web3.keccak(signed_tx.raw_transaction)
+
+		if self.journal is not None:
+			self.journal.sent(tx_hash, network, counted)
+		logger.info(f"Replaced stuck transaction with nonce {transaction['nonce']}: {tx_hash.hex()} ({fees})")
+		return replacement, tx_hash
+
+	def _waitReplacing(self, tx_hash, network: str = "sfi", transaction: dict = None, counted: bool = True) -> tuple:
+		"""
+		Waits for the transaction to be mined. Every `replace_after` blocks it stays pending,
+		it is replaced by one with the same nonce and higher fees, up to the fee cap.
+		Without a receipt watcher, the pending transactions are looked up together once per new head.
+		Gives up RECEIPT_TIMEOUT seconds after the last one was sent.
+
+		Returns:
+			tuple: The hash and receipt of whichever of the transactions was mined.
+		"""
+		watcher = self.context.getReceiptWatcher(network)
+		hashes = [tx_hash]
+		watched = {tx_hash: watcher.watch(tx_hash)} if watcher else {}
+		# With a watcher, each hash is only looked up once in case it was mined before being watched.
+		lookup = [tx_hash]
+		original = transaction
+		head = sent_block = self.context.getBlockNumber(network)
+		deadline = time.monotonic() + RECEIPT_TIMEOUT
+		try:
+			while True:
+				mined = next(((sent, future.result()) for sent, future in watched.items() if future.done()), None)
+				if mined is None and lookup:
+					receipts = self.context.getReceipts(lookup, network)
+					mined = next(((sent, receipt) for sent, receipt in zip(lookup, receipts) if receipt is not None), None)
+
+				if mined is not None:
+					self._settleReplaced(hashes, mined[0])
+					return mined
+
+				if time.monotonic() >= deadline:
+					raise TimeExhausted(f"Transaction {hashes[-1].hex()} is not in the chain after {RECEIPT_TIMEOUT} seconds")
+
+				lookup = []
+				# Only a replacement that was actually sent starts the count over.
+				if self.replace_after and head - sent_block >= self.replace_after:
+					replaced = self._replaceTransaction(transaction, original, network, counted)
+					if replaced is not None:
+						transaction, sent = replaced
+						hashes.append(sent)
+						if watcher:
+							watched[sent] = watcher.watch(sent)
+							lookup.append(sent)
+						sent_block = head
+						deadline = time.monotonic() + RECEIPT_TIMEOUT
+
+				latest = head
+				while latest == head and time.monotonic() < deadline:
+					if watched:
+						waitFutures(list(watched.values()), timeout=RECEIPT_POLL, return_when=FIRST_COMPLETED)
+						if any(future.done() for future in watched.values()):
+							break
+					else:
+						time.sleep(RECEIPT_POLL)
+					latest = self.context.getBlockNumber(network)
+				head = latest
+				if not watcher:
+					lookup = list(hashes)
+		finally:
+			for sent in watched:
+				watcher.unwatch(sent)
+
+	def _waitForConfirmations(self, receipt, network: str = "sfi", poll_interval: float = 1.0) -> None:
+		"""
+		Returns as soon as the receipt's block is `self.confirmations` deep.
+		"""
+		if self.confirmations <= 1:
+			return
+
+		web3 = getattr(self, f"{network}_web3")
+		target = receipt['blockNumber'] + self.confirmations - 1
+		while web3.eth.block_number < target:
+			time.sleep(poll_interval)
+
+	def _executeTransaction(self, transaction: dict, network: str = "sfi", counted: bool = True) -> dict:
+		try:
+			tx_hash = self._sendTransaction(transaction, network, counted)
+
+			if self.pipelined:
+				logger.info(f"Transaction sent: {tx_hash.hex()}")
+				self._pending.append((tx_hash, network, transaction, counted))
+				return {'status': 'pending', 'tx': tx_hash.hex()}
+
+			return self._awaitReceipt(tx_hash, network, transaction, counted)
+
+		except Exception as e:
+			logger.error(f"Transaction error: {str(e)}")
+			return failureResult(e)
+
+	def collectReceipts(self) -> list:
+		"""
+		Waits for every transaction sent in pipelined mode.
+
+		Returns:
+			list: One result per pending transaction, in submission order.
+		"""
+		pending, self._pending = self._pending, []
+		return [self._awaitReceipt(tx_hash, network, transaction, counted) for tx_hash, network, transaction, counted in pending]
+		
+
+	def _batchCall(self, calls: list, network: str = "sfi") -> list:
+		"""
+		Executes several view calls in a single round trip. See ChainContext.batchCall.
+		"""
+		return self.context.batchCall(calls, network)
+
+	def _userInfo(self) -> list:
+		stakeContract = self._getContract("stake")
+		return stakeContract.functions.userInfo(self.address).call()
+
+	def _lockPeriod(self, inf: list = None) -> int:
+		inf = inf or self._userInfo()
+		return int(inf[2] - inf[1])
+
+	def _getL2OutputIndexAfter(self, _l2BlockNumber: int) -> int:
+		return self.context.getL2OutputIndexAfter(_l2BlockNumber)
+
+	def _getL2Output(self, _l2OutputIndex: int) -> int:
+		return self.context.getL2Output(_l2OutputIndex)
+
+	def _isWithdrawalProven(self, _withdrawalHash: str | bytes) -> bool:
+		contract = self._getContract('portal', 'sep')
+		return contract.functions.provenWithdrawals(_withdrawalHash).call() != [b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00', 0, 0]
+	
+	def _isWithdrawalFinalized(self, _withdrawalHash: str | bytes) -> bool:
+		contract = self._getContract('portal', 'sep')
+		try:
+			finalized = contract.functions.finalizedWithdrawals(_withdrawalHash).call()
+			return finalized
+		except:
+			return False 
+		
+	def _getPairAddress(self, pair: list) -> str:
+		return self.context.getPairAddress(pair)
+
+	def _getPairContract(self, pair: list):
+		return self.context.getContractAt(self._getPairAddress(pair), PAIR_ABI)
+
+	def _getPairBalance(self, pair: list) -> int:
+		return self._getPairContract(pair).functions.balanceOf(self.address).call()
+
+	def _getPairSupply(self, pair: list) -> int:
+		return self._getPairContract(pair).functions.totalSupply().call()
+
+	def _getPairReserves(self, pair: list) -> list:
+		return self._getPairContract(pair).functions.getReserves().call()
+
+	def _getEventData(self, tx_hash: str) -> dict:
+		return self._decodeMessagePassed(self.context.getReceipt(tx_hash))
+
+	def _getPathReserves(self, path: list) -> list:
+		return [self.context.getReserves(tokenIn, tokenOut) for tokenIn, tokenOut in zip(path, path[1:])]
+
+	def _getAmountsIn(self, _amountOut: int, path: list) -> list:
+		"""
+		Quotes the router's getAmountsIn locally from cached reserves.
+		"""
+		return getAmountsIn(_amountOut, self._getPathReserves(path), self.context.citea_fee_bps)
+	
+	def _getAmountsOut(self, _amountIn: int, path: list) -> list:
+		"""
+		Quotes the router's getAmountsOut locally from cached reserves.
+		"""
+		return getAmountsOut(_amountIn, self._getPathReserves(path), self.context.citea_fee_bps)
+
+	def approve(self, _token: str, _amount: int, _spender: str, network: str = "sfi", *args, allowance: int = None) -> dict:
+		"""
+		Approves spending a specific amount of tokens.
+		If _token is a contract address, use web3.eth.contract with a provided ABI or a default ERC-20 ABI.
+		The approval is skipped when the current allowance (fetched, or passed in from a batched read) already covers _amount.
+		"""
+		try:
+			web3 = getattr(self, f"{network}_web3", None)
+			if not web3:
+				logger.error(f"Web3 instance for network {network} not found.")
+				return {'status': 'failed', 'error': 'Web3 instance not available'}
+			
+			# Use provided ABI if available, otherwise default ERC-20 ABI
+			contract = self._getTokenContract(_token, network, args[0] if args else None)
+
+			if allowance is None:
+				allowance = self._allowanceCall(_token, _spender, network, args[0] if args else None).call()
+			call = self._approveCall(contract, _spender, _amount, allowance, network)
+			if call is None:
+				return {'status': 'success', 'skipped': True}
+
+			return self._transact(call, network, counted=False)
+		
+		except Exception as e:
+			logger.error(f"Error during approve: {str(e)}")
+			return failureResult(e)
+
+		
+	def stake(self, _amount: int) -> dict:
+		"""
+		Stakes a specified amount of tokens.
+		"""
+		try:
+			contract = self._getContract('stake')
+			userInfo, allowance = self._batchCall([
+				contract.functions.userInfo(self.address),
+				self._allowanceCall('wsfi', 'stake')
+			])
+
+			logger.info(f"Approving staking amount: {_amount}")
+			approval_result = self.approve('wsfi', _amount, 'stake', allowance=allowance)
+			if approval_result['status'] != 'success':
+				logger.error("Approval failed.")
+				return approval_result
+			
+			_lockPeriod = self._lockPeriodOf(userInfo)
+			logger.info(f"Staking amount: {_amount}, Lock period: {_lockPeriod}")
+
+			return self._transact(contract.functions.deposit(_amount, _lockPeriod))
+
+		except Exception as e:
+			logger.error(f"Error during stake: {str(e)}")
+			return failureResult(e)
+		
+	def unstake(self, _amount: int) -> dict:
+		"""
+		Unstakes (withdraws and claims) a specified amount.
+		"""
+		try:
+			contract = self._getContract('stake')
+
+			return self._transact(contract.functions.withdrawAndClaim(_amount))
+
+		except Exception as e:
+			logger.error(f"Error during unstake: {str(e)}")
+			return failureResult(e)
+		
+
+	def wrap(self, _amount: int) -> dict:
+		"""
+		Wraps SFI tokens into wSFI.
+		"""
+		try:
+			contract = self._getContract("wsfi")
+
+			return self._transact(contract.functions.deposit(), value=_amount)
+
+		except Exception as e:
+			logger.error(f"Error during wrap: {str(e)}")
+			return failureResult(e)
+
+	def unwrap(self, _amount: int) -> dict:
+		"""
+		Unwraps wSFI tokens into SFI.
+		"""
+		try:
+			contract = self._getContract("wsfi")
+
+			return self._transact(contract.functions.withdraw(_amount))
+
+		except Exception as e:
+			logger.error(f"Error during unwrap: {str(e)}")
+			return failureResult(e)
+
+	def claim(self) -> dict:
+		"""
+		Claim SFI from stake.
+		"""
+		try:
+			contract = self._getContract("stake")
+
+			return self._transact(contract.functions.claim())
+
+		except Exception as e:
+			logger.error(f"Error during claim: {str(e)}")
+			return failureResult(e)
+		
+	def swap(self, _amount: int, pairKey: list, slippage: int = 0.02) -> dict:
+		try:
+			pair = self._convertKeyPair(pairKey)
+			allowance, = self.context.batchCallWithReserves(pair, [self._allowanceCall(pairKey[0], 'citeaRouter')])
+			_amountsOut = self._getAmountsOut(_amount, pair)
+
+			logger.info(f"Approving swapping amount: {_amount}")
+			approval_result = self.approve(pairKey[0], _amount, 'citeaRouter', allowance=allowance)
+			if approval_result['status'] != 'success':
+				logger.error("Approval failed. Aborting swapping process.")
+				return approval_result
+
+			return self._transact(self._swapCall(_amount, _amountsOut, pair, pairKey, slippage))
+		except Exception as e:
+			logger.error(f"Error during swap: {str(e)}")
+			return failureResult(e)
+		
+	def addLiquidity(self, _amount: int, pairKey: list, slippage: int = 0.02) -> dict:
+		try:
+			pair = self._convertKeyPair(pairKey)
+			allowanceA, allowanceB = self.context.batchCallWithReserves(pair, [
+				self._allowanceCall(pairKey[0], 'citeaRouter'),
+				self._allowanceCall(pairKey[1], 'citeaRouter')
+			])
+			_amountA = _amount
+			_amountB = self._getAmountsOut(_amount, pair)[1]
+
+			for token, amount, allowance in ((pairKey[0], _amountA, allowanceA), (pairKey[1], _amountB, allowanceB)):
+				logger.info(f"Approving adding liquidity amount: {amount}")
+				approval_result = self.approve(token, amount, 'citeaRouter', allowance=allowance)
+				if approval_result['status'] != 'success':
+					logger.error("Approval failed.")
+					return approval_result
+
+			return self._transact(self._addLiquidityCall(_amountA, _amountB, pair, pairKey, slippage))
+		except Exception as e:
+			logger.error(f"Error during addLiquidity: {str(e)}")
+			return failureResult(e)
+
+	def removeLiquidity(self, _percentage: float, pairKey: list, slippage: int = 0.02) -> dict:
+		try:
+			contract = self._getContract('citeaRouter')
+
+			pair = self._convertKeyPair(pairKey)
+			pairContract = self._getPairContract(pair)
+			balance, supply, allowance = self.context.batchCallWithReserves(pair, [
+				pairContract.functions.balanceOf(self.address),
+				pairContract.functions.totalSupply(),
+				pairContract.functions.allowance(self.address, contract.address)
+			])
+			reserves = self.context.getReserves(pair[0], pair[1])
+			liquidity = int(balance * _percentage)
+
+			logger.info(f"Approving removing liquidity amount: {liquidity}")
+			approval_result = self.approve(pairContract.address, liquidity, 'citeaRouter', 'sfi', PAIR_ABI, allowance=allowance)
+			if approval_result['status'] != 'success':
+				logger.error("Approval failed.")
+				return approval_result
+
+			return self._transact(self._removeLiquidityCall(liquidity, supply, reserves, pair, slippage))
+
+		except Exception as e:
+			logger.error(f"Error during removeLiquidity: {str(e)}")
+			return failureResult(e)
+
+	def crymboTravelRules(self) -> dict:
+		"""
+		Handles Crymbo Travel Rules task.
+		"""
+		try:
+			req = httpRequest("GET", self.CRYMBO_API + "/api/sfi-api?address=" + self.address)
+			return self._crymboResult(req.json())
+
+		except Exception as e:
+			logger.error(f"Error during crymboTravelRules: {str(e)}")
+			return {"status": "failed", "error": str(e)}
+
+		
+
+	def initWithdrawalOnchain(self, amount: int) -> dict:
+		"""
+		Initiates an on-chain withdrawal.
+		"""
+		try:
+			contract = self._getContract('msgpasser')
+
+			return self._transact(contract.functions.initiateWithdrawal(
+				self.address,
+				amount,
+				"0x"
+			), value=amount)
+
+		except Exception as e:
+			logger.error(f"Error during initWithdrawalOnchain: {str(e)}")
+			return failureResult(e)
+
+	def initWithdrawal(self, amount: int) -> dict:
+		"""
+		Initiates a withdrawal and calls the Gelato API to finish bridging SFI.
+		"""
+		try:
+			onchain_result = self.initWithdrawalOnchain(amount)
+
+			if onchain_result['status'] == 'failed':
+				return {
+					"status": "failed",
+					"msg": "On-chain transaction failed."
+				}
+
+			tx_hash = onchain_result['tx']
+			self.withdrawals.add(self.address, [tx_hash])
+			raw_tx = f"0x{self.sfi_web3.eth.get_raw_transaction(tx_hash).hex()}"
+			raw_json = self._gelatoWithdrawal(amount, tx_hash, raw_tx)
+
+			logger.info("Calling Gelato API...")
+
+			response = httpRequest("POST", self.GELATO_API, json=raw_json)
+			resp_json = response.json()
+
+			logger.info(resp_json)
+
+			if response.status_code == 200:	
+				return {
+					"status": "success",
+					"msg": resp_json
+				}
+			else:
+				return {
+					"status": "failed",
+					"msg": f"Gelato API error: {response.text}"
+				}
+
+		except Exception as e:
+			logger.error(f"Error during initWithdrawal: {str(e)}")
+			return {
+				"status": "failed",
+				"msg": str(e)
+			}
+	
+	def _prepareProveWithdrawal(self, tx_hash: str) -> tuple:
+		"""
+		Gathers everything needed to prove a withdrawal, fetching independent L1 and L2 data concurrently.
+
+		Returns:
+			tuple: (call, None) with the portal call to send, or (None, result) when there is nothing to send.
+		"""
+		tx_receipt = self.context.getReceipt(tx_hash)
+
+		event_data = self._decodeMessagePassed(tx_receipt)
+		failed = self._checkWithdrawalEvent(event_data)
+		if failed is not None:
+			return None, failed
+
+		withdrawal_hash = event_data['withdrawalHash']
+		proven = self.context.submit(self._isWithdrawalProven, withdrawal_hash)
+		try:
+			output_index = self._getL2OutputIndexAfter(tx_receipt['blockNumber'])
+		except Exception as e: # aka. Output not finalized
+			logger.error(f"Failed to get output index. Try again later.")
+			return None, {'status': 'failed', 'error': 'Failed to retrieve output index. Try again later.'}
+
+		l2_output = self._getL2Output(output_index)
+
+		hashed = self.sep_web3.solidity_keccak(['bytes32', 'uint256'], [withdrawal_hash, 0])
+		block_number = l2_output[2]
+		block = self.context.submit(self.context.getBlock, block_number)
+		proof_data = self.context.submit(self.context.getProof, L2_TO_L1_MESSAGE_PASSER, [hashed], block_number)
+
+		if proven.result():
+			logger.info("Withdrawal is already proven.")
+			return None, {'status': 'success'}
+
+		return self._proveCall(event_data, output_index, block.result(), proof_data.result())
+
+	def _prepareFinalizeWithdrawal(self, tx_hash: str) -> tuple:
+		"""
+		Gathers everything needed to finalize a withdrawal. Returns the same as _prepareProveWithdrawal.
+		"""
+		event_data = self._getEventData(tx_hash)
+		failed = self._checkWithdrawalEvent(event_data)
+		if failed is not None:
+			return None, failed
+
+		if self._isWithdrawalFinalized(event_data['withdrawalHash']):
+			logger.info("Withdrawal already finalized.")
+			return None, {'status': 'success'}
+
+		return self._finalizeCall(event_data), None
+
+	def proveWithdrawal(self, tx_hash: str) -> dict:
+		"""
+		Proves a withdrawal by using the specified transaction hash.
+		"""
+		try:
+			call, result = self._prepareProveWithdrawal(tx_hash)
+			if call is None:
+				return result
+
+			return self._transact(call, "sep")
+
+		except Exception as e:
+			logger.error(f"Error during proveWithdrawal: {e}")
+			return failureResult(e)
+
+	def finalizeWithdrawal(self, tx_hash: str) -> dict:
+		"""
+		Finalize the withdrawal with the specified transaction hash.
+		"""
+		try:
+			call, result = self._prepareFinalizeWithdrawal(tx_hash)
+			if call is None:
+				return result
+
+			return self._transact(call, "sep")
+		except Exception as e:
+			logger.error(f"Error during finalizeWithdrawal: {str(e)}")
+			return failureResult(e)
+
+		
+	def getWithdrawalList(self) -> dict:
 		"""
-		Initializes the SFI class with Web3 instances and contract details.
+		Retrieves the address' withdrawals from the Gelato API. Returns None when the request fails.
 		"""
-		self.SFI_RPC_URL = "https://rpc-testnet.singularityfinance.ai"
-		self.SEPOLIA_RPC_URL = "https://ethereum-sepolia-rpc.publicnode.com"
-		self.GELATO_API = "https://api.gelato.digital/raas/public/bridge/transactions"
-		self.CRYMBO_API = "https://oracle-partners.crymbo.io/"
-
-		self.sfi_web3 = Web3(Web3.HTTPProvider(self.SFI_RPC_URL))
-		self.sep_web3 = Web3(Web3.HTTPProvider(self.SEPOLIA_RPC_URL))
+		try:
+			response = httpRequest("GET", f"{self.GELATO_API}?isWithdraw=true&slug=singularity-finance-testnet&fromAddress={self.address}")
+			resp_json = response.json()
 
-		if not (self.sfi_web3.is_connected() and self.sep_web3.is_connected()):
-			raise ConnectionError("Couldn't connect to Web3 RPC. Try again later.")
+			withdrawals = resp_json['data']
+			logger.info(f"Got {len(withdrawals)} withdrawal(s).")
+			return withdrawals
 		
-		self.pk = private_key
-		self.address = self.sep_web3.eth.account.from_key(self.pk).address
+		except Exception as e:
+			logger.error(f"Error during getWithdrawalList: {str(e)}")
+			return None
 
-		self.contracts = {
-			'sep': {
-				'portal': {
-					'ca': '0x776CF4e50c7285810e4E25A79de56aA4E7116876',
-					'abi': [{"inputs":[],"stateMutability":"nonpayable","type":"constructor"},{"inputs":[],"name":"BadTarget","type":"error"},{"inputs":[],"name":"CallPaused","type":"error"},{"inputs":[],"name":"ContentLengthMismatch","type":"error"},{"inputs":[],"name":"EmptyItem","type":"error"},{"inputs":[],"name":"GasEstimation","type":"error"},{"inputs":[],"name":"InvalidDataRemainder","type":"error"},{"inputs":[],"name":"InvalidHeader","type":"error"},{"inputs":[],"name":"LargeCalldata","type":"error"},{"inputs":[],"name":"NoValue","type":"error"},{"inputs":[],"name":"NonReentrant","type":"error"},{"inputs":[],"name":"OnlyCustomGasToken","type":"error"},{"inputs":[],"name":"OutOfGas","type":"error"},{"inputs":[],"name":"SmallGasLimit","type":"error"},{"inputs":[],"name":"TransferFailed","type":"error"},{"inputs":[],"name":"Unauthorized","type":"error"},{"inputs":[],"name":"UnexpectedList","type":"error"},{"inputs":[],"name":"UnexpectedString","type":"error"},{"anonymous":False,"inputs":[{"indexed":False,"internalType":"uint8","name":"version","type":"uint8"}],"name":"Initialized","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"from","type":"address"},{"indexed":True,"internalType":"address","name":"to","type":"address"},{"indexed":True,"internalType":"uint256","name":"version","type":"uint256"},{"indexed":False,"internalType":"bytes","name":"opaqueData","type":"bytes"}],"name":"TransactionDeposited","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"bytes32","name":"withdrawalHash","type":"bytes32"},{"indexed":False,"internalType":"bool","name":"success","type":"bool"}],"name":"WithdrawalFinalized","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"bytes32","name":"withdrawalHash","type":"bytes32"},{"indexed":True,"internalType":"address","name":"from","type":"address"},{"indexed":True,"internalType":"address","name":"to","type":"address"}],"name":"WithdrawalProven","type":"event"},{"inputs":[],"name":"balance","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"_to","type":"address"},{"internalType":"uint256","name":"_mint","type":"uint256"},{"internalType":"uint256","name":"_value","type":"uint256"},{"internalType":"uint64","name":"_gasLimit","type":"uint64"},{"internalType":"bool","name":"_isCreation","type":"bool"},{"internalType":"bytes","name":"_data","type":"bytes"}],"name":"depositERC20Transaction","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"_to","type":"address"},{"internalType":"uint256","name":"_value","type":"uint256"},{"internalType":"uint64","name":"_gasLimit","type":"uint64"},{"internalType":"bool","name":"_isCreation","type":"bool"},{"internalType":"bytes","name":"_data","type":"bytes"}],"name":"depositTransaction","outputs":[],"stateMutability":"payable","type":"function"},{"inputs":[],"name":"donateETH","outputs":[],"stateMutability":"payable","type":"function"},{"inputs":[{"components":[{"internalType":"uint256","name":"nonce","type":"uint256"},{"internalType":"address","name":"sender","type":"address"},{"internalType":"address","name":"target","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"},{"internalType":"uint256","name":"gasLimit","type":"uint256"},{"internalType":"bytes","name":"data","type":"bytes"}],"internalType":"struct Types.WithdrawalTransaction","name":"_tx","type":"tuple"}],"name":"finalizeWithdrawalTransaction","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"name":"finalizedWithdrawals","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"guardian","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"contract L2OutputOracle","name":"_l2Oracle","type":"address"},{"internalType":"contract SystemConfig","name":"_systemConfig","type":"address"},{"internalType":"contract SuperchainConfig","name":"_superchainConfig","type":"address"}],"name":"initialize","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"_l2OutputIndex","type":"uint256"}],"name":"isOutputFinalized","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"l2Oracle","outputs":[{"internalType":"contract L2OutputOracle","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"l2Sender","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint64","name":"_byteCount","type":"uint64"}],"name":"minimumGasLimit","outputs":[{"internalType":"uint64","name":"","type":"uint64"}],"stateMutability":"pure","type":"function"},{"inputs":[],"name":"params","outputs":[{"internalType":"uint128","name":"prevBaseFee","type":"uint128"},{"internalType":"uint64","name":"prevBoughtGas","type":"uint64"},{"internalType":"uint64","name":"prevBlockNum","type":"uint64"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"paused","outputs":[{"internalType":"bool","name":"paused_","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[{"components":[{"internalType":"uint256","name":"nonce","type":"uint256"},{"internalType":"address","name":"sender","type":"address"},{"internalType":"address","name":"target","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"},{"internalType":"uint256","name":"gasLimit","type":"uint256"},{"internalType":"bytes","name":"data","type":"bytes"}],"internalType":"struct Types.WithdrawalTransaction","name":"_tx","type":"tuple"},{"internalType":"uint256","name":"_l2OutputIndex","type":"uint256"},{"components":[{"internalType":"bytes32","name":"version","type":"bytes32"},{"internalType":"bytes32","name":"stateRoot","type":"bytes32"},{"internalType":"bytes32","name":"messagePasserStorageRoot","type":"bytes32"},{"internalType":"bytes32","name":"latestBlockhash","type":"bytes32"}],"internalType":"struct Types.OutputRootProof","name":"_outputRootProof","type":"tuple"},{"internalType":"bytes[]","name":"_withdrawalProof","type":"bytes[]"}],"name":"proveWithdrawalTransaction","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"name":"provenWithdrawals","outputs":[{"internalType":"bytes32","name":"outputRoot","type":"bytes32"},{"internalType":"uint128","name":"timestamp","type":"uint128"},{"internalType":"uint128","name":"l2OutputIndex","type":"uint128"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"_token","type":"address"},{"internalType":"uint8","name":"_decimals","type":"uint8"},{"internalType":"bytes32","name":"_name","type":"bytes32"},{"internalType":"bytes32","name":"_symbol","type":"bytes32"}],"name":"setGasPayingToken","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"superchainConfig","outputs":[{"internalType":"contract SuperchainConfig","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"systemConfig","outputs":[{"internalType":"contract SystemConfig","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"version","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"pure","type":"function"},{"stateMutability":"payable","type":"receive"}]
-				},
-				'oracle': {
-					'ca': '0x1c56f18D964CB77743c1f6E57AcA0D9e783aDcfc',
-					'abi': [{"inputs":[],"stateMutability":"nonpayable","type":"constructor"},{"anonymous":False,"inputs":[{"indexed":False,"internalType":"uint8","name":"version","type":"uint8"}],"name":"Initialized","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"bytes32","name":"outputRoot","type":"bytes32"},{"indexed":True,"internalType":"uint256","name":"l2OutputIndex","type":"uint256"},{"indexed":True,"internalType":"uint256","name":"l2BlockNumber","type":"uint256"},{"indexed":False,"internalType":"uint256","name":"l1Timestamp","type":"uint256"}],"name":"OutputProposed","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"uint256","name":"prevNextOutputIndex","type":"uint256"},{"indexed":True,"internalType":"uint256","name":"newNextOutputIndex","type":"uint256"}],"name":"OutputsDeleted","type":"event"},{"inputs":[],"name":"CHALLENGER","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"FINALIZATION_PERIOD_SECONDS","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"L2_BLOCK_TIME","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"PROPOSER","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"SUBMISSION_INTERVAL","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"challenger","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint256","name":"_l2BlockNumber","type":"uint256"}],"name":"computeL2Timestamp","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint256","name":"_l2OutputIndex","type":"uint256"}],"name":"deleteL2Outputs","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"finalizationPeriodSeconds","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint256","name":"_l2OutputIndex","type":"uint256"}],"name":"getL2Output","outputs":[{"components":[{"internalType":"bytes32","name":"outputRoot","type":"bytes32"},{"internalType":"uint128","name":"timestamp","type":"uint128"},{"internalType":"uint128","name":"l2BlockNumber","type":"uint128"}],"internalType":"struct Types.OutputProposal","name":"","type":"tuple"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint256","name":"_l2BlockNumber","type":"uint256"}],"name":"getL2OutputAfter","outputs":[{"components":[{"internalType":"bytes32","name":"outputRoot","type":"bytes32"},{"internalType":"uint128","name":"timestamp","type":"uint128"},{"internalType":"uint128","name":"l2BlockNumber","type":"uint128"}],"internalType":"struct Types.OutputProposal","name":"","type":"tuple"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint256","name":"_l2BlockNumber","type":"uint256"}],"name":"getL2OutputIndexAfter","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint256","name":"_submissionInterval","type":"uint256"},{"internalType":"uint256","name":"_l2BlockTime","type":"uint256"},{"internalType":"uint256","name":"_startingBlockNumber","type":"uint256"},{"internalType":"uint256","name":"_startingTimestamp","type":"uint256"},{"internalType":"address","name":"_proposer","type":"address"},{"internalType":"address","name":"_challenger","type":"address"},{"internalType":"uint256","name":"_finalizationPeriodSeconds","type":"uint256"}],"name":"initialize","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"l2BlockTime","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"latestBlockNumber","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"latestOutputIndex","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"nextBlockNumber","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"nextOutputIndex","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"bytes32","name":"_outputRoot","type":"bytes32"},{"internalType":"uint256","name":"_l2BlockNumber","type":"uint256"},{"internalType":"bytes32","name":"_l1BlockHash","type":"bytes32"},{"internalType":"uint256","name":"_l1BlockNumber","type":"uint256"}],"name":"proposeL2Output","outputs":[],"stateMutability":"payable","type":"function"},{"inputs":[],"name":"proposer","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"startingBlockNumber","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"startingTimestamp","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"submissionInterval","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"version","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"}]
-				}
-			},
-			'sfi': {
-				# Tokens
-				'wsfi': {
-					'ca': '0x6dC404EFd04B880B0Ab5a26eF461b63A12E3888D',
-					'abi': [{"inputs":[],"stateMutability":"nonpayable","type":"constructor"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"allowance","type":"uint256"},{"internalType":"uint256","name":"needed","type":"uint256"}],"name":"ERC20InsufficientAllowance","type":"error"},{"inputs":[{"internalType":"address","name":"sender","type":"address"},{"internalType":"uint256","name":"balance","type":"uint256"},{"internalType":"uint256","name":"needed","type":"uint256"}],"name":"ERC20InsufficientBalance","type":"error"},{"inputs":[{"internalType":"address","name":"approver","type":"address"}],"name":"ERC20InvalidApprover","type":"error"},{"inputs":[{"internalType":"address","name":"receiver","type":"address"}],"name":"ERC20InvalidReceiver","type":"error"},{"inputs":[{"internalType":"address","name":"sender","type":"address"}],"name":"ERC20InvalidSender","type":"error"},{"inputs":[{"internalType":"address","name":"spender","type":"address"}],"name":"ERC20InvalidSpender","type":"error"},{"inputs":[],"name":"WithdrawFailed","type":"error"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"owner","type":"address"},{"indexed":True,"internalType":"address","name":"spender","type":"address"},{"indexed":False,"internalType":"uint256","name":"value","type":"uint256"}],"name":"Approval","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"dst","type":"address"},{"indexed":False,"internalType":"uint256","name":"amount","type":"uint256"}],"name":"Deposit","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"from","type":"address"},{"indexed":True,"internalType":"address","name":"to","type":"address"},{"indexed":False,"internalType":"uint256","name":"value","type":"uint256"}],"name":"Transfer","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"src","type":"address"},{"indexed":False,"internalType":"uint256","name":"amount","type":"uint256"}],"name":"Withdrawal","type":"event"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"address","name":"spender","type":"address"}],"name":"allowance","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"}],"name":"approve","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"account","type":"address"}],"name":"balanceOf","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"decimals","outputs":[{"internalType":"uint8","name":"","type":"uint8"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"deposit","outputs":[],"stateMutability":"payable","type":"function"},{"inputs":[],"name":"name","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"symbol","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"totalSupply","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"}],"name":"transfer","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"from","type":"address"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"}],"name":"transferFrom","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"withdraw","outputs":[],"stateMutability":"nonpayable","type":"function"},{"stateMutability":"payable","type":"receive"}]
-				},
-				'aimm': {
-					'ca': '0xAa4aFA7C07405992e3f6799dCC260D389687077a',
-					'abi': [{"inputs":[],"stateMutability":"nonpayable","type":"constructor"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"allowance","type":"uint256"},{"internalType":"uint256","name":"needed","type":"uint256"}],"name":"ERC20InsufficientAllowance","type":"error"},{"inputs":[{"internalType":"address","name":"sender","type":"address"},{"internalType":"uint256","name":"balance","type":"uint256"},{"internalType":"uint256","name":"needed","type":"uint256"}],"name":"ERC20InsufficientBalance","type":"error"},{"inputs":[{"internalType":"address","name":"approver","type":"address"}],"name":"ERC20InvalidApprover","type":"error"},{"inputs":[{"internalType":"address","name":"receiver","type":"address"}],"name":"ERC20InvalidReceiver","type":"error"},{"inputs":[{"internalType":"address","name":"sender","type":"address"}],"name":"ERC20InvalidSender","type":"error"},{"inputs":[{"internalType":"address","name":"spender","type":"address"}],"name":"ERC20InvalidSpender","type":"error"},{"inputs":[],"name":"WithdrawFailed","type":"error"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"owner","type":"address"},{"indexed":True,"internalType":"address","name":"spender","type":"address"},{"indexed":False,"internalType":"uint256","name":"value","type":"uint256"}],"name":"Approval","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"dst","type":"address"},{"indexed":False,"internalType":"uint256","name":"amount","type":"uint256"}],"name":"Deposit","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"from","type":"address"},{"indexed":True,"internalType":"address","name":"to","type":"address"},{"indexed":False,"internalType":"uint256","name":"value","type":"uint256"}],"name":"Transfer","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"src","type":"address"},{"indexed":False,"internalType":"uint256","name":"amount","type":"uint256"}],"name":"Withdrawal","type":"event"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"address","name":"spender","type":"address"}],"name":"allowance","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"}],"name":"approve","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"account","type":"address"}],"name":"balanceOf","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"decimals","outputs":[{"internalType":"uint8","name":"","type":"uint8"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"deposit","outputs":[],"stateMutability":"payable","type":"function"},{"inputs":[],"name":"name","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"symbol","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"totalSupply","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"}],"name":"transfer","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"from","type":"address"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"}],"name":"transferFrom","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"withdraw","outputs":[],"stateMutability":"nonpayable","type":"function"},{"stateMutability":"payable","type":"receive"}] 
-				},
-				'usdc': {
-					'ca': '0xD2ED81BE83B33218737Ca188EB9AC28b79C6A0F3',
-					'abi': [{"inputs":[],"stateMutability":"nonpayable","type":"constructor"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"allowance","type":"uint256"},{"internalType":"uint256","name":"needed","type":"uint256"}],"name":"ERC20InsufficientAllowance","type":"error"},{"inputs":[{"internalType":"address","name":"sender","type":"address"},{"internalType":"uint256","name":"balance","type":"uint256"},{"internalType":"uint256","name":"needed","type":"uint256"}],"name":"ERC20InsufficientBalance","type":"error"},{"inputs":[{"internalType":"address","name":"approver","type":"address"}],"name":"ERC20InvalidApprover","type":"error"},{"inputs":[{"internalType":"address","name":"receiver","type":"address"}],"name":"ERC20InvalidReceiver","type":"error"},{"inputs":[{"internalType":"address","name":"sender","type":"address"}],"name":"ERC20InvalidSender","type":"error"},{"inputs":[{"internalType":"address","name":"spender","type":"address"}],"name":"ERC20InvalidSpender","type":"error"},{"inputs":[],"name":"WithdrawFailed","type":"error"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"owner","type":"address"},{"indexed":True,"internalType":"address","name":"spender","type":"address"},{"indexed":False,"internalType":"uint256","name":"value","type":"uint256"}],"name":"Approval","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"dst","type":"address"},{"indexed":False,"internalType":"uint256","name":"amount","type":"uint256"}],"name":"Deposit","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"from","type":"address"},{"indexed":True,"internalType":"address","name":"to","type":"address"},{"indexed":False,"internalType":"uint256","name":"value","type":"uint256"}],"name":"Transfer","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"src","type":"address"},{"indexed":False,"internalType":"uint256","name":"amount","type":"uint256"}],"name":"Withdrawal","type":"event"},{"inputs":[{"internalType":"address","name":"owner","type":"address"},{"internalType":"address","name":"spender","type":"address"}],"name":"allowance","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"}],"name":"approve","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"account","type":"address"}],"name":"balanceOf","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"decimals","outputs":[{"internalType":"uint8","name":"","type":"uint8"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"deposit","outputs":[],"stateMutability":"payable","type":"function"},{"inputs":[],"name":"name","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"symbol","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"totalSupply","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"}],"name":"transfer","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"from","type":"address"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"value","type":"uint256"}],"name":"transferFrom","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"withdraw","outputs":[],"stateMutability":"nonpayable","type":"function"},{"stateMutability":"payable","type":"receive"}] 
-				},
-				# Contracts
-				'stake': {
-					'ca': '0x22Dbdc9e8dd7C5E409B014BBcb53a3ef39736515',
-					'abi': [{"inputs":[{"internalType":"address","name":"target","type":"address"}],"name":"AddressEmptyCode","type":"error"},{"inputs":[{"internalType":"address","name":"account","type":"address"}],"name":"AddressInsufficientBalance","type":"error"},{"inputs":[],"name":"AlreadyInitialized","type":"error"},{"inputs":[],"name":"AlreadyInitializedOwner","type":"error"},{"inputs":[],"name":"CallerIsNotOwner","type":"error"},{"inputs":[],"name":"DepositTokenRecoveryNotAllowed","type":"error"},{"inputs":[],"name":"DepositsDisabled","type":"error"},{"inputs":[{"internalType":"uint256","name":"fee","type":"uint256"},{"internalType":"uint256","name":"maxFee","type":"uint256"}],"name":"ExceedsMaxEarlyUnlockFeePerDay","type":"error"},{"inputs":[{"internalType":"uint256","name":"period","type":"uint256"},{"internalType":"uint256","name":"maxPeriod","type":"uint256"}],"name":"ExceedsMaxLockingPeriod","type":"error"},{"inputs":[],"name":"FailedInnerCall","type":"error"},{"inputs":[],"name":"MissingAmount","type":"error"},{"inputs":[],"name":"MissingDepositToken","type":"error"},{"inputs":[],"name":"MissingOwner","type":"error"},{"inputs":[],"name":"MissingRewardsAPI","type":"error"},{"inputs":[],"name":"MissingToken","type":"error"},{"inputs":[],"name":"MissingZapperContract","type":"error"},{"inputs":[],"name":"ReentrancyGuardReentrantCall","type":"error"},{"inputs":[{"internalType":"uint256","name":"requestedUnlockDate","type":"uint256"},{"internalType":"uint256","name":"currentUnlockDate","type":"uint256"}],"name":"RequestedUnlockDateBeforeCurrent","type":"error"},{"inputs":[{"internalType":"address","name":"token","type":"address"}],"name":"SafeERC20FailedOperation","type":"error"},{"inputs":[{"internalType":"address","name":"sender","type":"address"},{"internalType":"address","name":"zapper","type":"address"}],"name":"SenderIsNotZapper","type":"error"},{"inputs":[{"internalType":"uint256","name":"requestedWithdrawal","type":"uint256"},{"internalType":"uint256","name":"currentBalance","type":"uint256"}],"name":"WithdrawalRequestExceedsDeposited","type":"error"},{"inputs":[],"name":"ZeroMaxEarlyUnlockFeePerDay","type":"error"},{"inputs":[],"name":"ZeroMaxLockingPeriodInDays","type":"error"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"user","type":"address"},{"indexed":False,"internalType":"uint256","name":"claimed","type":"uint256"}],"name":"Claimed","type":"event"},{"anonymous":False,"inputs":[{"indexed":False,"internalType":"address","name":"newInstance","type":"address"}],"name":"Cloned","type":"event"},{"anonymous":False,"inputs":[{"indexed":False,"internalType":"address","name":"admin","type":"address"},{"indexed":False,"internalType":"uint256","name":"fees","type":"uint256"}],"name":"CollectedFees","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"user","type":"address"},{"indexed":False,"internalType":"uint256","name":"amount","type":"uint256"},{"indexed":False,"internalType":"uint256","name":"lockingPeriod","type":"uint256"}],"name":"Deposit","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"previousOwner","type":"address"},{"indexed":True,"internalType":"address","name":"newOwner","type":"address"}],"name":"OwnershipTransferred","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"user","type":"address"},{"indexed":False,"internalType":"uint256","name":"fee","type":"uint256"},{"indexed":False,"internalType":"uint256","name":"secondsUntilUnlock","type":"uint256"}],"name":"PaidEarlyUnlockFee","type":"event"},{"anonymous":False,"inputs":[{"indexed":False,"internalType":"address","name":"admin","type":"address"},{"indexed":False,"internalType":"bool","name":"depositsEnabled","type":"bool"}],"name":"SetDepositsEnabled","type":"event"},{"anonymous":False,"inputs":[{"indexed":False,"internalType":"address","name":"admin","type":"address"},{"indexed":False,"internalType":"uint256","name":"earlyUnlockFeePerDay","type":"uint256"}],"name":"SetEarlyUnlockFeePerDay","type":"event"},{"anonymous":False,"inputs":[{"indexed":False,"internalType":"address","name":"admin","type":"address"},{"indexed":False,"internalType":"address","name":"zapperContract","type":"address"}],"name":"SetZapperContract","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"user","type":"address"},{"indexed":False,"internalType":"uint256","name":"amount","type":"uint256"}],"name":"Withdraw","type":"event"},{"inputs":[],"name":"MAX_EARLY_UNLOCK_FEE","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"MAX_EARLY_UNLOCK_FEE_PER_DAY","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"MAX_LOCKING_PERIOD","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"MAX_PERCENTAGE","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"claim","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"newOwner","type":"address"}],"name":"clone","outputs":[{"internalType":"address","name":"newInstance","type":"address"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"collectFees","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"_amount","type":"uint256"},{"internalType":"uint256","name":"_lockingPeriod","type":"uint256"}],"name":"deposit","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"_recipient","type":"address"},{"internalType":"uint256","name":"_amount","type":"uint256"},{"internalType":"uint256","name":"_lockingPeriod","type":"uint256"}],"name":"depositFor","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"depositToken","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"depositsEnabled","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"earlyUnlockFeePerDay","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"earlyUnlockFees","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"getClone","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"_depositToken","type":"address"},{"internalType":"address","name":"_rewardsAPI","type":"address"},{"internalType":"uint256","name":"maxLockingPeriodInDays","type":"uint256"},{"internalType":"uint256","name":"maxEarlyUnlockFeePerDay","type":"uint256"}],"name":"initialize","outputs":[],"stateMutability":"payable","type":"function"},{"inputs":[],"name":"owner","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"pending","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"_user","type":"address"}],"name":"pendingFor","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"_token","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"},{"internalType":"address","name":"to","type":"address"}],"name":"recoverUnsupportedTokens","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"rewardToken","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"rewardsAPI","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"bool","name":"_depositsEnabled","type":"bool"}],"name":"setDepositsEnabled","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"_earlyUnlockFeePerDay","type":"uint256"}],"name":"setEarlyUnlockFeePerDay","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"initialOwner","type":"address"}],"name":"setOwnerAfterClone","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"_zapperContract","type":"address"}],"name":"setZapperContract","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"totalScore","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"newOwner","type":"address"}],"name":"transferOwnership","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"","type":"address"}],"name":"userInfo","outputs":[{"internalType":"uint256","name":"amount","type":"uint256"},{"internalType":"uint256","name":"lockDate","type":"uint256"},{"internalType":"uint256","name":"unlockDate","type":"uint256"},{"internalType":"uint256","name":"score","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint256","name":"_amount","type":"uint256"}],"name":"withdraw","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"_amount","type":"uint256"}],"name":"withdrawAndClaim","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[],"name":"zapperContract","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"}]
-				},
-				'msgpasser': {
-					'ca': '0x4200000000000000000000000000000000000016',
-					'abi': [{"anonymous":False,"inputs":[{"indexed":True,"internalType":"uint256","name":"nonce","type":"uint256"},{"indexed":True,"internalType":"address","name":"sender","type":"address"},{"indexed":True,"internalType":"address","name":"target","type":"address"},{"indexed":False,"internalType":"uint256","name":"value","type":"uint256"},{"indexed":False,"internalType":"uint256","name":"gasLimit","type":"uint256"},{"indexed":False,"internalType":"bytes","name":"data","type":"bytes"},{"indexed":False,"internalType":"bytes32","name":"withdrawalHash","type":"bytes32"}],"name":"MessagePassed","type":"event"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"uint256","name":"amount","type":"uint256"}],"name":"WithdrawerBalanceBurnt","type":"event"},{"inputs":[],"name":"MESSAGE_VERSION","outputs":[{"internalType":"uint16","name":"","type":"uint16"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"burn","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"_target","type":"address"},{"internalType":"uint256","name":"_gasLimit","type":"uint256"},{"internalType":"bytes","name":"_data","type":"bytes"}],"name":"initiateWithdrawal","outputs":[],"stateMutability":"payable","type":"function"},{"inputs":[],"name":"messageNonce","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"name":"sentMessages","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"view","type":"function"},{"inputs":[],"name":"version","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},{"stateMutability":"payable","type":"receive"}]
-				},
-				'citeaRouter': {
-					'ca': '0xFEccff0ecf1cAa1669A71C5E00b51B48E4CBc6A1',
-					'abi': [{"inputs":[{"internalType":"address","name":"_factory","type":"address"},{"internalType":"address","name":"_WETH","type":"address"}],"stateMutability":"nonpayable","type":"constructor"},{"inputs":[],"name":"WETH","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"tokenA","type":"address"},{"internalType":"address","name":"tokenB","type":"address"},{"internalType":"uint256","name":"amountADesired","type":"uint256"},{"internalType":"uint256","name":"amountBDesired","type":"uint256"},{"internalType":"uint256","name":"amountAMin","type":"uint256"},{"internalType":"uint256","name":"amountBMin","type":"uint256"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"addLiquidity","outputs":[{"internalType":"uint256","name":"amountA","type":"uint256"},{"internalType":"uint256","name":"amountB","type":"uint256"},{"internalType":"uint256","name":"liquidity","type":"uint256"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"token","type":"address"},{"internalType":"uint256","name":"amountTokenDesired","type":"uint256"},{"internalType":"uint256","name":"amountTokenMin","type":"uint256"},{"internalType":"uint256","name":"amountETHMin","type":"uint256"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"addLiquidityETH","outputs":[{"internalType":"uint256","name":"amountToken","type":"uint256"},{"internalType":"uint256","name":"amountETH","type":"uint256"},{"internalType":"uint256","name":"liquidity","type":"uint256"}],"stateMutability":"payable","type":"function"},{"inputs":[],"name":"factory","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountOut","type":"uint256"},{"internalType":"uint256","name":"reserveIn","type":"uint256"},{"internalType":"uint256","name":"reserveOut","type":"uint256"}],"name":"getAmountIn","outputs":[{"internalType":"uint256","name":"amountIn","type":"uint256"}],"stateMutability":"pure","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"uint256","name":"reserveIn","type":"uint256"},{"internalType":"uint256","name":"reserveOut","type":"uint256"}],"name":"getAmountOut","outputs":[{"internalType":"uint256","name":"amountOut","type":"uint256"}],"stateMutability":"pure","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountOut","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"}],"name":"getAmountsIn","outputs":[{"internalType":"uint256[]","name":"amounts","type":"uint256[]"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"}],"name":"getAmountsOut","outputs":[{"internalType":"uint256[]","name":"amounts","type":"uint256[]"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountA","type":"uint256"},{"internalType":"uint256","name":"reserveA","type":"uint256"},{"internalType":"uint256","name":"reserveB","type":"uint256"}],"name":"quote","outputs":[{"internalType":"uint256","name":"amountB","type":"uint256"}],"stateMutability":"pure","type":"function"},{"inputs":[{"internalType":"address","name":"tokenA","type":"address"},{"internalType":"address","name":"tokenB","type":"address"},{"internalType":"uint256","name":"liquidity","type":"uint256"},{"internalType":"uint256","name":"amountAMin","type":"uint256"},{"internalType":"uint256","name":"amountBMin","type":"uint256"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"removeLiquidity","outputs":[{"internalType":"uint256","name":"amountA","type":"uint256"},{"internalType":"uint256","name":"amountB","type":"uint256"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"token","type":"address"},{"internalType":"uint256","name":"liquidity","type":"uint256"},{"internalType":"uint256","name":"amountTokenMin","type":"uint256"},{"internalType":"uint256","name":"amountETHMin","type":"uint256"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"removeLiquidityETH","outputs":[{"internalType":"uint256","name":"amountToken","type":"uint256"},{"internalType":"uint256","name":"amountETH","type":"uint256"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"token","type":"address"},{"internalType":"uint256","name":"liquidity","type":"uint256"},{"internalType":"uint256","name":"amountTokenMin","type":"uint256"},{"internalType":"uint256","name":"amountETHMin","type":"uint256"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"removeLiquidityETHSupportingFeeOnTransferTokens","outputs":[{"internalType":"uint256","name":"amountETH","type":"uint256"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"token","type":"address"},{"internalType":"uint256","name":"liquidity","type":"uint256"},{"internalType":"uint256","name":"amountTokenMin","type":"uint256"},{"internalType":"uint256","name":"amountETHMin","type":"uint256"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"},{"internalType":"bool","name":"approveMax","type":"bool"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"removeLiquidityETHWithPermit","outputs":[{"internalType":"uint256","name":"amountToken","type":"uint256"},{"internalType":"uint256","name":"amountETH","type":"uint256"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"token","type":"address"},{"internalType":"uint256","name":"liquidity","type":"uint256"},{"internalType":"uint256","name":"amountTokenMin","type":"uint256"},{"internalType":"uint256","name":"amountETHMin","type":"uint256"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"},{"internalType":"bool","name":"approveMax","type":"bool"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"removeLiquidityETHWithPermitSupportingFeeOnTransferTokens","outputs":[{"internalType":"uint256","name":"amountETH","type":"uint256"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"tokenA","type":"address"},{"internalType":"address","name":"tokenB","type":"address"},{"internalType":"uint256","name":"liquidity","type":"uint256"},{"internalType":"uint256","name":"amountAMin","type":"uint256"},{"internalType":"uint256","name":"amountBMin","type":"uint256"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"},{"internalType":"bool","name":"approveMax","type":"bool"},{"internalType":"uint8","name":"v","type":"uint8"},{"internalType":"bytes32","name":"r","type":"bytes32"},{"internalType":"bytes32","name":"s","type":"bytes32"}],"name":"removeLiquidityWithPermit","outputs":[{"internalType":"uint256","name":"amountA","type":"uint256"},{"internalType":"uint256","name":"amountB","type":"uint256"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountOut","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"swapETHForExactTokens","outputs":[{"internalType":"uint256[]","name":"amounts","type":"uint256[]"}],"stateMutability":"payable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountOutMin","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"swapExactETHForTokens","outputs":[{"internalType":"uint256[]","name":"amounts","type":"uint256[]"}],"stateMutability":"payable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountOutMin","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"swapExactETHForTokensSupportingFeeOnTransferTokens","outputs":[],"stateMutability":"payable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"uint256","name":"amountOutMin","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"swapExactTokensForETH","outputs":[{"internalType":"uint256[]","name":"amounts","type":"uint256[]"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"uint256","name":"amountOutMin","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"swapExactTokensForETHSupportingFeeOnTransferTokens","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"uint256","name":"amountOutMin","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"swapExactTokensForTokens","outputs":[{"internalType":"uint256[]","name":"amounts","type":"uint256[]"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"uint256","name":"amountOutMin","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"swapExactTokensForTokensSupportingFeeOnTransferTokens","outputs":[],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountOut","type":"uint256"},{"internalType":"uint256","name":"amountInMax","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"swapTokensForExactETH","outputs":[{"internalType":"uint256[]","name":"amounts","type":"uint256[]"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountOut","type":"uint256"},{"internalType":"uint256","name":"amountInMax","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"swapTokensForExactTokens","outputs":[{"internalType":"uint256[]","name":"amounts","type":"uint256[]"}],"stateMutability":"nonpayable","type":"function"},{"stateMutability":"payable","type":"receive"}]
-				},
-				'citeaFactory': {
-					'ca': '0xd8388EECE67C003eF952D32c4E3943113C5f5608',
-					'abi': [{"inputs":[{"internalType":"address","name":"_feeToSetter","type":"address"}],"payable":False,"stateMutability":"nonpayable","type":"constructor"},{"anonymous":False,"inputs":[{"indexed":True,"internalType":"address","name":"token0","type":"address"},{"indexed":True,"internalType":"address","name":"token1","type":"address"},{"indexed":False,"internalType":"address","name":"pair","type":"address"},{"indexed":False,"internalType":"uint256","name":"","type":"uint256"}],"name":"PairCreated","type":"event"},{"constant":True,"inputs":[],"name":"INIT_CODE_PAIR_HASH","outputs":[{"internalType":"bytes32","name":"","type":"bytes32"}],"payable":False,"stateMutability":"view","type":"function"},{"constant":True,"inputs":[{"internalType":"uint256","name":"","type":"uint256"}],"name":"allPairs","outputs":[{"internalType":"address","name":"","type":"address"}],"payable":False,"stateMutability":"view","type":"function"},{"constant":True,"inputs":[],"name":"allPairsLength","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"payable":False,"stateMutability":"view","type":"function"},{"constant":False,"inputs":[{"internalType":"address","name":"tokenA","type":"address"},{"internalType":"address","name":"tokenB","type":"address"}],"name":"createPair","outputs":[{"internalType":"address","name":"pair","type":"address"}],"payable":False,"stateMutability":"nonpayable","type":"function"},{"constant":True,"inputs":[],"name":"feeTo","outputs":[{"internalType":"address","name":"","type":"address"}],"payable":False,"stateMutability":"view","type":"function"},{"constant":True,"inputs":[],"name":"feeToSetter","outputs":[{"internalType":"address","name":"","type":"address"}],"payable":False,"stateMutability":"view","type":"function"},{"constant":True,"inputs":[{"internalType":"address","name":"","type":"address"},{"internalType":"address","name":"","type":"address"}],"name":"getPair","outputs":[{"internalType":"address","name":"","type":"address"}],"payable":False,"stateMutability":"view","type":"function"},{"constant":False,"inputs":[{"internalType":"address","name":"_feeTo","type":"address"}],"name":"setFeeTo","outputs":[],"payable":False,"stateMutability":"nonpayable","type":"function"},{"constant":False,"inputs":[{"internalType":"address","name":"_feeToSetter","type":"address"}],"name":"setFeeToSetter","outputs":[],"payable":False,"stateMutability":"nonpayable","type":"function"}]
-				}
-			}
-		}
-	
-	def _getContractAddress(self, key: str, network: str = "sfi") -> str:
+	def syncWithdrawals(self, head: int = None) -> int:
 		"""
-		Retrieves a contract address.
+		Adds withdrawals listed by the Gelato API that aren't in the local index yet.
+		The API is asked at most every WITHDRAWAL_SYNC_INTERVAL seconds per address;
+		`head` is the L1 block the sync is recorded at.
 		"""
-		try:
-			return self.contracts[network][key]['ca']
-		except:
-			logger.error(f"Contract not defined.")
-			raise
-	
-	def _getContract(self, key: str, network: str = "sfi"):
+		if self.withdrawals.synced(self.address):
+			return 0
+		return self._indexWithdrawals(self.getWithdrawalList(), head)
+
+	def proveWithdrawals(self) -> list:
 		"""
-		Retrieves a contract instance.
+		Handles the prove withdrawal process.
+		"""
+		return self._processWithdrawals(self._prepareProveWithdrawal, "proveWithdrawals", ("initiated",), "proven")
+
+	def finalizeWithdrawals(self) -> list:
+		"""
+		Handles the finalize withdrawal process.
+		"""
+		return self._processWithdrawals(self._prepareFinalizeWithdrawal, "finalizeWithdrawals", ("proven",), "finalized")
+
+	def _processWithdrawals(self, prepare, name: str, states: tuple, next_state: str) -> dict:
+		"""
+		Prepares every indexed withdrawal in one of `states` concurrently, then sends the L1
+		transactions from this thread in order so their nonces are consecutive, and waits for
+		all receipts at once. Withdrawals that succeed move to `next_state` in the index.
 		"""
 		try:
-			contract_info = self.contracts[network][key]
-			method_name = getattr(self, f"{network}_web3", None)
-			if not method_name:
-				logger.error(f"Method {method_name} not found or not callable.")
-				raise
+			head = self.context.getBlockNumber("sep")
+			self.syncWithdrawals(head)
+			withdrawals = self.withdrawals.pending(self.address, states, head)
+			if not withdrawals:
+				logger.info("No pending withdrawals found.")
+				return {'status': 'success', 'msg': 'No withdrawals found.'}
+
+			with ThreadPoolExecutor(max_workers=min(len(withdrawals), IO_WORKERS)) as pool:
+				prepared = [pool.submit(contextvars.copy_context().run, prepare, tx_hash) for tx_hash in withdrawals]
+
+				results = []
+				with self.pipeline():
+					for tx_hash, future in zip(withdrawals, prepared):
+						logger.info(f"Processing withdrawal: {tx_hash}")
+						try:
+							call, result = future.result()
+							if call is not None:
+								result = self._transact(call, "sep")
+						except Exception as e:
+							logger.error(f"Error during {name} of {tx_hash}: {str(e)}")
+							result = failureResult(e)
+						results.append((tx_hash, result))
+
+			receipts = iter(self.collectReceipts())
+			checked_block = self.context.getBlockNumber("sep")
+			for tx_hash, result in results:
+				if result['status'] == 'pending':
+					result = next(receipts)
+				self._recordWithdrawal(tx_hash, result, checked_block, next_state)
+
+			return {'status': 'success', 'msg': 'Processed all withdrawals.'}
+
+		except Exception as e:
+			logger.error(f"Error during {name}: {str(e)}")
+			return failureResult(e)
+
+
+class AsyncChainContext:
+	"""
+	Asynchronous counterpart of ChainContext, built on AsyncWeb3.
+
+	Create it with `await AsyncChainContext.create()` from inside the running event
+	loop and share it between every AsyncSFI handle driven by that loop.
+	"""
+	def __init__(self, rpc_urls: Dict[str, Iterable[str]] = None, contracts: dict = None, ws_urls: Dict[str, str] = None, citea_fee_bps: int = CITEA_FEE_BPS) -> None:
+		self.rpc_urls = _endpointLists(rpc_urls)
+		self.ws_urls = MappingProxyType(dict(ws_urls or {}))
+		self.contracts = contracts or CONTRACTS
+		self.citea_fee_bps = citea_fee_bps
+		self.web3 = LazyNetworks(self.rpc_urls, self._connect)
+
+		self._contract_cache = {}
+		self._chain_ids = {}
+		self._pairs = {}
+		self._multicall = {}
+		self._watchers = {}
+		self._fees = {}
+		self._fee_locks = {network: asyncio.Lock() for network in self.rpc_urls}
+		self._heads = {}
+		self._receipts = {}
+		self._blocks = {}
+		self._proofs = {}
+		self._l2_outputs = {}
+		self.gas_profiles = GasProfiles()
+		# The msgpasser ABI is only loaded once a withdrawal receipt is decoded, see withdrawalEvents.
+		self.events = EventRegistry([PAIR_ABI])
+		self._withdrawal_events = False
+		self.errors = ErrorRegistry(self.contracts)
+		self.reserves = ReserveCache(self.events)
+		self._session = None
+		self._health_tasks = []
+
+	@classmethod
+	async def create(cls, rpc_urls: Dict[str, Iterable[str]] = None, contracts: dict = None, ws_urls: Dict[str, str] = None, citea_fee_bps: int = CITEA_FEE_BPS) -> "AsyncChainContext":
+		return cls(rpc_urls, contracts, ws_urls, citea_fee_bps)
+
+	def _connect(self, network: str) -> AsyncWeb3:
+		"""
+		Opens the network's endpoint pool. Its endpoints are checked in the background,
+		and requests fail over until the first check has run.
+		"""
+		provider = AsyncPooledHTTPProvider(EndpointPool(network, self.rpc_urls[network]))
+		web3 = AsyncWeb3(provider)
+		web3.middleware_onion.add(rpcMetricsMiddleware(network), "metrics")
+		self._health_tasks.append(asyncio.get_running_loop().create_task(self._checkEndpoints(provider)))
+		return web3
+
+	@staticmethod
+	async def _checkEndpoints(provider: AsyncPooledHTTPProvider) -> None:
+		while True:
+			try:
+				await provider.check()
+			except Exception as e:
+				logger.error(f"Health check of {provider} failed: {str(e)}")
+			if len(provider.pool.endpoints) == 1:
+				return
+			await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+
+	async def close(self) -> None:
+		for task in self._health_tasks:
+			task.cancel()
+		for watcher in self._watchers.values():
+			await asyncio.to_thread(watcher.close)
+		if self._session is not None:
+			await self._session.close()
+		for web3 in self.web3.connected().values():
+			await web3.provider.disconnect()
+
+	def withdrawalEvents(self) -> EventRegistry:
+		if not self._withdrawal_events:
+			self.events.register(self.contracts['sfi']['msgpasser']['abi'])
+			self._withdrawal_events = True
+		return self.events
+
+	def getReceiptWatcher(self, network: str = "sfi") -> ReceiptWatcher:
+		if network not in self.ws_urls:
+			return None
+		if network not in self._watchers:
+			self._watchers[network] = ReceiptWatcher(self.ws_urls[network], network, lambda head: self._onHead(network, head))
+		return self._watchers[network]
+
+	def _onHead(self, network: str, head) -> None:
+		self._heads[network] = (time.monotonic() + HEAD_TTL, head['number'])
+
+		cached = self._fees.get(network)
+		if cached and head.get('baseFeePerGas') is not None and 'maxPriorityFeePerGas' in cached[1]:
+			self._fees[network] = (time.monotonic(), feesFromBlock(head, cached[1]['maxPriorityFeePerGas']))
+
+	async def getFees(self, network: str = "sfi") -> dict:
+		async with self._fee_locks[network]:
+			cached = self._fees.get(network)
+			if cached and time.monotonic() - cached[0] < FEE_TTL:
+				return cached[1]
+
+			web3 = self.web3[network]
+			block = await web3.eth.get_block('latest')
+			if block.get('baseFeePerGas') is not None:
+				fees = feesFromBlock(block, await web3.eth.max_priority_fee)
 			else:
-				return method_name.eth.contract(address=contract_info['ca'], abi=contract_info['abi'])
+				fees = {'gasPrice': await web3.eth.gas_price}
 
-		except:
-			logger.error(f"Contract not defined.")
+			self._fees[network] = (time.monotonic(), fees)
+			return fees
+
+	async def waitForReceipt(self, tx_hash, network: str = "sfi", timeout: float = RECEIPT_TIMEOUT):
+		"""
+		Waits for a receipt through the network's watcher, or by polling when there is none.
+		"""
+		web3 = self.web3[network]
+		watcher = self.getReceiptWatcher(network)
+		if not watcher:
+			return await web3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+
+		future = asyncio.wrap_future(watcher.watch(tx_hash))
+		try:
+			try:
+				return await web3.eth.get_transaction_receipt(tx_hash)
+			except TransactionNotFound:
+				pass
+			return await asyncio.wait_for(future, timeout)
+		except asyncio.TimeoutError:
+			raise TimeExhausted(f"Transaction {tx_hash.hex()} is not in the chain after {timeout} seconds")
+		finally:
+			watcher.unwatch(tx_hash)
+
+	def httpSession(self) -> aiohttp.ClientSession:
+		"""
+		Returns the HTTP session shared by every wallet for the Gelato and Crymbo APIs.
+		"""
+		if self._session is None:
+			self._session = aiohttp.ClientSession(trace_configs=[httpTraceConfig()])
+		return self._session
+
+	def getContract(self, key: str, network: str = "sfi"):
+		key = (network, key)
+		if key not in self._contract_cache:
+			contract_info = self.contracts[network][key[1]]
+			self._contract_cache[key] = self.web3[network].eth.contract(address=contract_info['ca'], abi=contract_info['abi'])
+		return self._contract_cache[key]
+
+	def getContractAt(self, address: str, abi: list, network: str = "sfi"):
+		address = AsyncWeb3.to_checksum_address(address)
+		key = (network, address, tuple(item.get('name') for item in abi))
+		if key not in self._contract_cache:
+			self._contract_cache[key] = self.web3[network].eth.contract(address=address, abi=abi)
+		return self._contract_cache[key]
+
+	async def _coalesced(self, cache: dict, key, fetch):
+		"""
+		Concurrent lookups of a missing key await a single fetch. Failed fetches aren't cached.
+		"""
+		if key not in cache:
+			cache[key] = asyncio.ensure_future(fetch())
+		try:
+			return await asyncio.shield(cache[key])
+		except Exception:
+			if cache.get(key) is not None and cache[key].done():
+				cache.pop(key, None)
 			raise
 
+	async def getReceipt(self, tx_hash, network: str = "sfi"):
+		return await self._coalesced(self._receipts, (network, HexBytes(tx_hash)), lambda: self.web3[network].eth.get_transaction_receipt(tx_hash))
+
+	async def getReceipts(self, tx_hashes: list, network: str = "sfi") -> list:
+		"""
+		Looks up the receipts of several transactions concurrently. None for the ones not mined yet.
+		"""
+		async def _receipt(tx_hash):
+			try:
+				return await self.web3[network].eth.get_transaction_receipt(tx_hash)
+			except TransactionNotFound:
+				return None
+		return list(await asyncio.gather(*(_receipt(tx_hash) for tx_hash in tx_hashes)))
+
+	async def getBlock(self, block_number: int, network: str = "sfi"):
+		return await self._coalesced(self._blocks, (network, block_number), lambda: self.web3[network].eth.get_block(block_number))
+
+	async def getProof(self, address: str, slots: list, block_number: int, network: str = "sfi"):
+		key = (network, address, tuple(HexBytes(slot) for slot in slots), block_number)
+		return await self._coalesced(self._proofs, key, lambda: self.web3[network].eth.get_proof(address, slots, block_number))
+
+	async def getL2OutputIndexAfter(self, l2_block_number: int) -> int:
+		return await self._coalesced(self._l2_outputs, ('index', l2_block_number), lambda: self.getContract('oracle', 'sep').functions.getL2OutputIndexAfter(l2_block_number).call())
+
+	async def getL2Output(self, l2_output_index: int) -> list:
+		return await self._coalesced(self._l2_outputs, ('output', l2_output_index), lambda: self.getContract('oracle', 'sep').functions.getL2Output(l2_output_index).call())
+
+	async def getChainId(self, network: str = "sfi") -> int:
+		if network not in self._chain_ids:
+			self._chain_ids[network] = await self.web3[network].eth.chain_id
+		return self._chain_ids[network]
 
-	def _executeTransaction(self, transaction: dict, network: str = "sfi") -> dict:
+	async def hasMulticall(self, network: str = "sfi") -> bool:
+		if network not in self._multicall:
+			self._multicall[network] = len(await self.web3[network].eth.get_code(MULTICALL3_ADDRESS)) > 0
+		return self._multicall[network]
+
+	async def batchCall(self, calls: list, network: str = "sfi") -> list:
+		"""
+		Executes several view calls at once, through Multicall3 when it is deployed
+		on the network and as concurrent requests otherwise.
+		"""
+		if not calls:
+			return []
+
+		web3 = self.web3[network]
+
+		if await self.hasMulticall(network):
+			multicall = self.getContractAt(MULTICALL3_ADDRESS, MULTICALL3_ABI, network)
+			results = await multicall.functions.aggregate3([
+				(call.address, False, bytes.fromhex(call.selector[2:]) + web3.codec.encode(list(call.argument_types), list(call.args)))
+				for call in calls
+			]).call()
+
+			decoded = []
+			for call, (_, return_data) in zip(calls, results):
+				values = web3.codec.decode([collapse_if_tuple(output) for output in call.abi['outputs']], return_data)
+				decoded.append(values[0] if len(values) == 1 else list(values))
+			return decoded
+
+		return list(await asyncio.gather(*(call.call() for call in calls)))
+
+	async def getPairAddress(self, pair: list) -> str:
+		key = frozenset(pair)
+		if key in self._pairs:
+			return self._pairs[key]
+
+		address = await self.getContract('citeaFactory').functions.getPair(pair[0], pair[1]).call()
+		# Don't cache pairs that don't exist (yet).
+		if int(address, 16) != 0:
+			self._pairs[key] = address
+		return address
+
+	async def getBlockNumber(self, network: str = "sfi") -> int:
+		cached = self._heads.get(network)
+		if cached and time.monotonic() < cached[0]:
+			return cached[1]
+
+		block_number = await self.web3[network].eth.block_number
+		self._heads[network] = (time.monotonic() + BLOCK_NUMBER_TTL, block_number)
+		return block_number
+
+	async def getReserves(self, tokenA: str, tokenB: str) -> tuple:
+		pair_address = await self.getPairAddress([tokenA, tokenB])
+		block_number = await self.getBlockNumber()
+
+		reserves = self.reserves.get(pair_address, block_number)
+		if reserves is None:
+			reserve0, reserve1, _ = await self.getContractAt(pair_address, PAIR_ABI).functions.getReserves().call(block_identifier=block_number)
+			reserves = (reserve0, reserve1)
+			self.reserves.put(pair_address, block_number, reserves)
+
+		return reserves if sortTokens(tokenA, tokenB)[0] == tokenA else reserves[::-1]
+
+	async def batchCallWithReserves(self, path: list, calls: list) -> list:
+		block_number = await self.getBlockNumber()
+		missing = []
+		for tokenA, tokenB in zip(path, path[1:]):
+			pair_address = await self.getPairAddress([tokenA, tokenB])
+			if self.reserves.get(pair_address, block_number) is None and pair_address not in missing:
+				missing.append(pair_address)
+
+		results = await self.batchCall(list(calls) + [self.getContractAt(pair_address, PAIR_ABI).functions.getReserves() for pair_address in missing])
+		for pair_address, (reserve0, reserve1, _) in zip(missing, results[len(calls):]):
+			self.reserves.put(pair_address, block_number, (reserve0, reserve1))
+		return results[:len(calls)]
+
+class AsyncNonceManager:
+	"""
+	Asynchronous counterpart of NonceManager for wallets driven by one event loop.
+	"""
+	def __init__(self) -> None:
+		self._key_locks = {}
+		self._nonces = {}
+
+	async def allocate(self, web3: AsyncWeb3, address: str, network: str) -> int:
+		key = (address, network)
+		async with self._key_locks.setdefault(key, asyncio.Lock()):
+			if key not in self._nonces:
+				self._nonces[key] = await web3.eth.get_transaction_count(address, 'pending')
+			nonce = self._nonces[key]
+			self._nonces[key] += 1
+			return nonce
+
+	async def resync(self, web3: AsyncWeb3, address: str, network: str) -> int:
+		key = (address, network)
+		async with self._key_locks.setdefault(key, asyncio.Lock()):
+			self._nonces[key] = await web3.eth.get_transaction_count(address, 'pending')
+			logger.info(f"Resynced {network} nonce to {self._nonces[key]}.")
+			return self._nonces[key]
+
+async_nonce_manager = AsyncNonceManager()
+
+class AsyncSFI(WalletBase):
+	"""
+	Asynchronous counterpart of SFI, built on AsyncWeb3.
+
+	Every operation is a coroutine taking the same arguments and returning the
+	same result dicts as its SFI equivalent, so one event loop can drive many wallets.
+	"""
+	def __init__(self, private_key: str, context: AsyncChainContext, confirmations: int = 1, approve_max: bool = False, withdrawals: WithdrawalIndex = None, simulate: bool = False, replacement: dict = None) -> None:
+		super().__init__(private_key, context, confirmations, approve_max, withdrawals, simulate, replacement)
+		self.nonces = async_nonce_manager
+
+	async def _buildTransaction(self, call, network: str = "sfi", value: int = None) -> dict:
+		return await call.build_transaction(self._transactionParams(call, network, await self.context.getChainId(network), await self.context.getFees(network), value))
+
+	async def _simulate(self, call, network: str = "sfi", value: int = None) -> dict:
 		try:
-			method_name = getattr(self, f"{network}_web3", None)
-			if not method_name:
-				logger.error(f"Method {method_name} not found or not callable.")
+			await call.call(self._simulationParams(value), block_identifier="pending")
+			return None
+		except (ContractLogicError, Web3RPCError) as e:
+			return self._simulationFailed(e)
+
+	async def _transact(self, call, network: str = "sfi", value: int = None, counted: bool = True) -> dict:
+		if self.simulate:
+			result = await self._simulate(call, network, value)
+			if result is not None:
+				return result
+		return await self._executeTransaction(await self._buildTransaction(call, network, value), network, counted)
+
+	async def _sendTransaction(self, transaction: dict, network: str = "sfi", counted: bool = True):
+		web3 = self.context.web3[network]
+		transaction['nonce'] = await self.nonces.allocate(web3, self.address, network)
+		signed_tx = Account.sign_transaction(transaction, self.pk)
+
+		try:
+			tx_hash = await web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+		except Exception as e:
+			if not alreadyKnown(e):
+				if any(err in str(e).lower() for err in NONCE_ERRORS):
+					logger.warning(f"Nonce {transaction['nonce']} rejected: {str(e)}")
+				await self.nonces.resync(web3, self.address, network)
 				raise
-			else:
-				signed_tx = method_name.eth.account.sign_transaction(transaction, private_key=self.pk)
-				tx_hash = method_name.eth.send_raw_transaction(signed_tx.raw_transaction)
-				tx_receipt = method_name.eth.wait_for_transaction_receipt(tx_hash)
+			tx_hash = Web3.keccak(signed_tx.raw_transaction)
 
-				if tx_receipt.status == 1:
-					logger.info(f"Transaction successful: {tx_hash.hex()}")
-					return {'status': 'success', 'tx': tx_hash.hex()}
+		if self.journal is not None:
+			self.journal.sent(tx_hash, network, counted)
+		return tx_hash
+
+	async def _awaitReceipt(self, tx_hash, network: str = "sfi", transaction: dict = None, counted: bool = True) -> dict:
+		try:
+			web3 = self.context.web3[network]
+			try:
+				if transaction is not None:
+					tx_hash, tx_receipt = await self._waitReplacing(tx_hash, network, transaction, counted)
 				else:
-					logger.error("Transaction failed.")
-					return {'status': 'failed'}
+					tx_receipt = await self.context.waitForReceipt(tx_hash, network)
+			except TimeExhausted:
+				await self.nonces.resync(web3, self.address, network)
+				raise
+
+			self._settleReceipt(tx_hash, tx_receipt, network, transaction, counted)
+			if tx_receipt.status == 1 and self.confirmations > 1:
+				target = tx_receipt['blockNumber'] + self.confirmations - 1
+				while await web3.eth.block_number < target:
+					await asyncio.sleep(1)
+			return self._receiptResult(tx_hash, tx_receipt)
 
 		except Exception as e:
 			logger.error(f"Transaction error: {str(e)}")
-			return {'status': 'failed', 'error': str(e)}
-		
-
-	def _userInfo(self) -> list:
-		stakeContract = self._getContract("stake")
-		return stakeContract.functions.userInfo(self.address).call()
+			return failureResult(e)
 
-	def _lockPeriod(self) -> int:
-		inf = self._userInfo()
-		return int(inf[2] - inf[1])
+	async def _replaceTransaction(self, transaction: dict, original: dict, network: str = "sfi", counted: bool = True) -> tuple:
+		fees = replacementFees(transaction, await self.context.getFees(network), original, self.fee_cap)
+		if fees is None:
+			logger.warning(f"Nonce {transaction['nonce']} is still pending, but replacing it would exceed the fee cap.")
+			return None
 
-	def _getL2OutputIndexAfter(self, _l2BlockNumber: int) -> int:
-		contract = self._getContract('oracle', 'sep')
-		return contract.functions.getL2OutputIndexAfter(_l2BlockNumber).call()
+		replacement = {**transaction, **fees}
+		signed_tx = Account.sign_transaction(replacement, self.pk)
+		try:
+			tx_hash = await self.context.web3[network].eth.send_raw_transaction(signed_tx.raw_transaction)
+		except Exception as e:
+			if not alreadyKnown(e):
+				logger.warning(f"Replacement of nonce {transaction['nonce']} not sent: {str(e)}")
+				return None
+			tx_hash = Web3.keccak(signed_tx.raw_transaction)
 
-	def _getL2Output(self, _l2OutputIndex: int) -> int:
-		contract = self._getContract('oracle', 'sep')
-		return contract.functions.getL2Output(_l2OutputIndex).call()
+		if self.journal is not None:
+			self.journal.sent(tx_hash, network, counted)
+		logger.info(f"Replaced stuck transaction with nonce {transaction['nonce']}: {tx_hash.hex()} ({fees})")
+		return replacement, tx_hash
 
-	def _isWithdrawalProven(self, _withdrawalHash: str | bytes) -> bool:
-		contract = self._getContract('portal', 'sep')
-		return contract.functions.provenWithdrawals(_withdrawalHash).call() != [b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00', 0, 0]
-	
-	def _isWithdrawalFinalized(self, _withdrawalHash: str | bytes) -> bool:
-		contract = self._getContract('portal', 'sep')
+	async def _waitReplacing(self, tx_hash, network: str = "sfi", transaction: dict = None, counted: bool = True) -> tuple:
+		"""
+		Asynchronous counterpart of SFI._waitReplacing.
+		"""
+		watcher = self.context.getReceiptWatcher(network)
+		hashes = [tx_hash]
+		watched = {tx_hash: asyncio.wrap_future(watcher.watch(tx_hash))} if watcher else {}
+		lookup = [tx_hash]
+		original = transaction
+		head = sent_block = await self.context.getBlockNumber(network)
+		deadline = time.monotonic() + RECEIPT_TIMEOUT
 		try:
-			finalized = contract.functions.finalizedWithdrawals(_withdrawalHash).call()
-			return finalized
-		except:
-			return False 
-		
-	def _getPairAddress(self, pair: list) -> str:
-		contract = self._getContract('citeaFactory')
-		return contract.functions.getPair(pair[0], pair[1]).call()
+			while True:
+				mined = next(((sent, future.result()) for sent, future in watched.items() if future.done()), None)
+				if mined is None and lookup:
+					receipts = await self.context.getReceipts(lookup, network)
+					mined = next(((sent, receipt) for sent, receipt in zip(lookup, receipts) if receipt is not None), None)
+
+				if mined is not None:
+					self._settleReplaced(hashes, mined[0])
+					return mined
+
+				if time.monotonic() >= deadline:
+					raise TimeExhausted(f"Transaction {hashes[-1].hex()} is not in the chain after {RECEIPT_TIMEOUT} seconds")
+
+				lookup = []
+				if self.replace_after and head - sent_block >= self.replace_after:
+					replaced = await self._replaceTransaction(transaction, original, network, counted)
+					if replaced is not None:
+						transaction, sent = replaced
+						hashes.append(sent)
+						if watcher:
+							watched[sent] = asyncio.wrap_future(watcher.watch(sent))
+							lookup.append(sent)
+						sent_block = head
+						deadline = time.monotonic() + RECEIPT_TIMEOUT
+
+				latest = head
+				while latest == head and time.monotonic() < deadline:
+					if watched:
+						done, _ = await asyncio.wait(watched.values(), timeout=RECEIPT_POLL, return_when=asyncio.FIRST_COMPLETED)
+						if done:
+							break
+					else:
+						await asyncio.sleep(RECEIPT_POLL)
+					latest = await self.context.getBlockNumber(network)
+				head = latest
+				if not watcher:
+					lookup = list(hashes)
+		finally:
+			for sent in watched:
+				watcher.unwatch(sent)
+
+	async def _executeTransaction(self, transaction: dict, network: str = "sfi", counted: bool = True) -> dict:
+		try:
+			tx_hash = await self._sendTransaction(transaction, network, counted)
+		except Exception as e:
+			logger.error(f"Transaction error: {str(e)}")
+			return failureResult(e)
 
-	def _getPairBalance(self, pair: list) -> int:
-		address = self._getPairAddress(pair)
-		contract = self.sfi_web3.eth.contract(address=address, abi=[{"constant":True,"inputs":[{"name":"account","type":"address"}],"name":"balanceOf","outputs":[{"name":"","type":"uint256"}],"payable":False,"stateMutability":"view","type":"function"}])
-		return contract.functions.balanceOf(self.address).call()
+		return await self._awaitReceipt(tx_hash, network, transaction, counted)
 
-	def _getPairSupply(self, pair: list) -> int:
-		address = self._getPairAddress(pair)
-		contract = self.sfi_web3.eth.contract(address=address, abi=[{"constant":True,"inputs":[],"name":"totalSupply","outputs":[{"name":"","type":"uint256"}],"payable":False,"stateMutability":"view","type":"function"}])
-		return contract.functions.totalSupply().call()
+	async def _batchCall(self, calls: list, network: str = "sfi") -> list:
+		return await self.context.batchCall(calls, network)
 
-	def _getPairReserves(self, pair: list) -> list:
-		address = self._getPairAddress(pair)
-		contract = self.sfi_web3.eth.contract(address=address, abi=[{"constant":True,"inputs":[],"name":"getReserves","outputs":[{"name":"_reserve0","type":"uint112"},{"name":"_reserve1","type":"uint112"},{"name":"_blockTimestampLast","type":"uint32"}],"payable":False,"stateMutability":"view","type":"function"}])
-		return contract.functions.getReserves().call()
+	async def _getPairContract(self, pair: list):
+		return self.context.getContractAt(await self.context.getPairAddress(pair), PAIR_ABI)
 
-	def _getEventData(self, tx_hash: str) -> dict:
-		receipt = self.sfi_web3.eth.get_transaction_receipt(tx_hash)
-		event_abi = next((item for item in self.contracts["sfi"]["msgpasser"]['abi'] if item.get("type") == "event" and item.get("name") == "MessagePassed"), None)
-		event_signature = self.sfi_web3.keccak(text="MessagePassed(uint256,address,address,uint256,uint256,bytes,bytes32)").hex()
-
-		if event_abi:
-			for log in receipt['logs']:
-				if log["topics"][0].hex() == event_signature:
-					indexed_inputs = [i for i in event_abi["inputs"] if i["indexed"]]
-					decoded_topics = {}
-					for i, topic in enumerate(log["topics"][1:], start=0):
-						param = indexed_inputs[i]
-						decoded_topics[param["name"]] = self.sfi_web3.codec.decode([param["type"]], bytes.fromhex(topic.hex()))[0]
-
-					non_indexed_inputs = [i for i in event_abi["inputs"] if not i["indexed"]]
-					non_indexed_types = [i["type"] for i in non_indexed_inputs]
-					non_indexed_values = self.sfi_web3.codec.decode(
-						non_indexed_types, bytes.fromhex(log["data"].hex())
-					)
-					decoded_data = {param["name"]: value for param, value in zip(non_indexed_inputs, non_indexed_values)}
-	
-					decoded_event = {**decoded_topics, **decoded_data}
-					return decoded_event
-		else:
-			return {}
-		
-	def _getAmountsIn(self, _amountOut: int, path: list) -> list:
-		contract = self._getContract('citeaRouter')
-		return contract.functions.getAmountsIn(_amountOut, path).call()
-	
-	def _getAmountsOut(self, _amountIn: int, path: list) -> list:
-		contract = self._getContract('citeaRouter')
-		return contract.functions.getAmountsOut(_amountIn, path).call()
+	async def _getAmountsOut(self, _amountIn: int, path: list) -> list:
+		reserves = [await self.context.getReserves(tokenIn, tokenOut) for tokenIn, tokenOut in zip(path, path[1:])]
+		return getAmountsOut(_amountIn, reserves, self.context.citea_fee_bps)
 
-	def _convertKeyPair(self, pair: list) -> list:
-		try:
-			return [self._getContractAddress(token) for token in pair]
-		except KeyError as e:
-			print(f"Error: Token '{e.args[0]}' not found in self.tokens.")
-			return []
-		
-	def approve(self, _token: str, _amount: int, _spender: str, network: str = "sfi", *args) -> dict:
-		"""
-		Approves spending a specific amount of tokens.
-		If _token is a contract address, use web3.eth.contract with a provided ABI or a default ERC-20 ABI.
-		"""
+	async def _getEventData(self, tx_hash: str) -> dict:
+		return self._decodeMessagePassed(await self.context.getReceipt(tx_hash))
+
+	async def approve(self, _token: str, _amount: int, _spender: str, network: str = "sfi", *args, allowance: int = None) -> dict:
 		try:
-			web3 = getattr(self, f"{network}_web3", None)
-			if not web3:
-				logger.error(f"Web3 instance for network {network} not found.")
-				return {'status': 'failed', 'error': 'Web3 instance not available'}
-			
-			# Check if _token is a known key or a contract address
-			if _token in self.contracts[network]:
-				contract = self._getContract(_token, network)
-			else:
-				# Use provided ABI if available, otherwise default ERC-20 ABI
-				abi = args[0] if args else [
-					{
-						"constant": False,
-						"inputs": [
-							{"name": "spender", "type": "address"},
-							{"name": "value", "type": "uint256"}
-						],
-						"name": "approve",
-						"outputs": [{"name": "", "type": "bool"}],
-						"payable": False,
-						"stateMutability": "nonpayable",
-						"type": "function"
-					}
-				]
-				contract = web3.eth.contract(address=web3.to_checksum_address(_token), abi=abi)
-			
-			nonce = web3.eth.get_transaction_count(self.address)
-			tx = contract.functions.approve(
-				self.contracts[network][_spender]['ca'], _amount
-			).build_transaction({
-				'chainId': web3.eth.chain_id,
-				'from': self.address,
-				'nonce': nonce
-			})
-			
-			return self._executeTransaction(tx)
-		
+			contract = self._getTokenContract(_token, network, args[0] if args else None)
+
+			if allowance is None:
+				allowance = await self._allowanceCall(_token, _spender, network, args[0] if args else None).call()
+			call = self._approveCall(contract, _spender, _amount, allowance, network)
+			if call is None:
+				return {'status': 'success', 'skipped': True}
+
+			return await self._transact(call, network, counted=False)
+
 		except Exception as e:
 			logger.error(f"Error during approve: {str(e)}")
-			return {'status': 'failed', 'error': str(e)}
-
+			return failureResult(e)
 
-		
-	def stake(self, _amount: int) -> dict:
-		"""
-		Stakes a specified amount of tokens.
-		"""
+	async def stake(self, _amount: int) -> dict:
 		try:
+			contract = self._getContract('stake')
+			userInfo, allowance = await self._batchCall([
+				contract.functions.userInfo(self.address),
+				self._allowanceCall('wsfi', 'stake')
+			])
+
 			logger.info(f"Approving staking amount: {_amount}")
-			approval_result = self.approve('wsfi', _amount, 'stake')
+			approval_result = await self.approve('wsfi', _amount, 'stake', allowance=allowance)
 			if approval_result['status'] != 'success':
 				logger.error("Approval failed.")
-				return {'status': 'failed', 'error': 'Approval failed'}
-			time.sleep(5)
-
-			contract = self._getContract('stake')
-			nonce = self.sfi_web3.eth.get_transaction_count(self.address)
-			
-			_lockPeriod = self._lockPeriod()
-
-			if _lockPeriod <= 0:
-				logger.warning("Invalid lock period detected, setting to default (100 days).")
-				_lockPeriod = 8640000 # 100 Days
+				return approval_result
 
+			_lockPeriod = self._lockPeriodOf(userInfo)
 			logger.info(f"Staking amount: {_amount}, Lock period: {_lockPeriod}")
-
-			tx = contract.functions.deposit(_amount, _lockPeriod).build_transaction({
-					"chainId": self.sfi_web3.eth.chain_id, 
-					"from": self.address, 
-					"nonce": nonce
-				})
-
-			return self._executeTransaction(tx)
+			return await self._transact(contract.functions.deposit(_amount, _lockPeriod))
 
 		except Exception as e:
 			logger.error(f"Error during stake: {str(e)}")
-			return {'status': 'failed', 'error': str(e)}
-		
-	def unstake(self, _amount: int) -> dict:
-		"""
-		Unstakes (withdraws and claims) a specified amount.
-		"""
+			return failureResult(e)
+
+	async def unstake(self, _amount: int) -> dict:
 		try:
 			contract = self._getContract('stake')
-			nonce = self.sfi_web3.eth.get_transaction_count(self.address)
-
-			tx = contract.functions.withdrawAndClaim(_amount).build_transaction({
-					"chainId": self.sfi_web3.eth.chain_id, 
-					"from": self.address, 
-					"nonce": nonce
-				})
-
-			return self._executeTransaction(tx)
+			return await self._transact(contract.functions.withdrawAndClaim(_amount))
 
 		except Exception as e:
 			logger.error(f"Error during unstake: {str(e)}")
-			return {'status': 'failed', 'error': str(e)}
-		
+			return failureResult(e)
 
-	def wrap(self, _amount: int) -> dict:
-		"""
-		Wraps SFI tokens into wSFI.
-		"""
+	async def wrap(self, _amount: int) -> dict:
 		try:
 			contract = self._getContract("wsfi")
-			nonce = self.sfi_web3.eth.get_transaction_count(self.address)
-
-			tx = contract.functions.deposit().build_transaction({
-				"chainId": self.sfi_web3.eth.chain_id,
-				"from": self.address,
-				"nonce": nonce,
-				"value": _amount
-			})
-
-			return self._executeTransaction(tx)
+			return await self._transact(contract.functions.deposit(), value=_amount)
 
 		except Exception as e:
 			logger.error(f"Error during wrap: {str(e)}")
-			return {'status': 'failed', 'error': str(e)}
+			return failureResult(e)
 
-	def unwrap(self, _amount: int) -> dict:
-		"""
-		Unwraps wSFI tokens into SFI.
-		"""
+	async def unwrap(self, _amount: int) -> dict:
 		try:
 			contract = self._getContract("wsfi")
-			nonce = self.sfi_web3.eth.get_transaction_count(self.address)
-
-			tx = contract.functions.withdraw(_amount).build_transaction({
-				"chainId": self.sfi_web3.eth.chain_id,
-				"from": self.address,
-				"nonce": nonce
-			})
-
-			return self._executeTransaction(tx)
+			return await self._transact(contract.functions.withdraw(_amount))
 
 		except Exception as e:
 			logger.error(f"Error during unwrap: {str(e)}")
-			return {'status': 'failed', 'error': str(e)}
+			return failureResult(e)
 
-	def claim(self) -> dict:
-		"""
-		Claim SFI from stake.
-		"""
+	async def claim(self) -> dict:
 		try:
 			contract = self._getContract("stake")
-			nonce = self.sfi_web3.eth.get_transaction_count(self.address)
-
-			tx = contract.functions.claim().build_transaction({
-				"chainId": self.sfi_web3.eth.chain_id,
-				"from": self.address,
-				"nonce": nonce
-			})
-
-			return self._executeTransaction(tx)
+			return await self._transact(contract.functions.claim())
 
 		except Exception as e:
 			logger.error(f"Error during claim: {str(e)}")
-			return {'status': 'failed', 'error': str(e)}
-		
-	def swap(self, _amount: int, pairKey: list, slippage: int = 0.02) -> dict:
+			return failureResult(e)
+
+	async def swap(self, _amount: int, pairKey: list, slippage: int = 0.02) -> dict:
 		try:
-			contract = self._getContract('citeaRouter')
+			pair = self._convertKeyPair(pairKey)
+			allowance, = await self.context.batchCallWithReserves(pair, [self._allowanceCall(pairKey[0], 'citeaRouter')])
+			_amountsOut = await self._getAmountsOut(_amount, pair)
 
 			logger.info(f"Approving swapping amount: {_amount}")
-			approval_result = self.approve(pairKey[0], _amount, 'citeaRouter')
+			approval_result = await self.approve(pairKey[0], _amount, 'citeaRouter', allowance=allowance)
 			if approval_result['status'] != 'success':
 				logger.error("Approval failed. Aborting swapping process.")
-				return {'status': 'failed', 'error': 'Approval failed'}
-			time.sleep(5)
-
-			pair = self._convertKeyPair(pairKey)
-			_amountsOut = self._getAmountsOut(_amount, pair)
-			_amountOutMin = int(_amountsOut[1]*(1 - slippage))
-			
-			logger.info(f"Setting slippage to {slippage*100}%")
-			logger.info(f"Swapping {_amount} {pairKey[0]} for {_amountOutMin} {pairKey[1]} ...")
-			
-			nonce = self.sfi_web3.eth.get_transaction_count(self.address)
+				return approval_result
 
-			tx = contract.functions.swapExactTokensForTokensSupportingFeeOnTransferTokens(_amount, _amountOutMin, pair, self.address, 2**256-1).build_transaction({
-				'chainId': self.sfi_web3.eth.chain_id,
-				'from': self.address,
-				'nonce': nonce
-			})
-
-			return self._executeTransaction(tx)
+			return await self._transact(self._swapCall(_amount, _amountsOut, pair, pairKey, slippage))
 		except Exception as e:
 			logger.error(f"Error during swap: {str(e)}")
-			return {'status': 'failed', 'error': str(e)}
-		
-	def addLiquidity(self, _amount: int, pairKey: list, slippage: int = 0.02) -> dict:
-		try:
-			contract = self._getContract('citeaRouter')
+			return failureResult(e)
 
+	async def addLiquidity(self, _amount: int, pairKey: list, slippage: int = 0.02) -> dict:
+		try:
 			pair = self._convertKeyPair(pairKey)
-			_amountsOut = self._getAmountsOut(_amount, pair)
-
+			allowanceA, allowanceB = await self.context.batchCallWithReserves(pair, [
+				self._allowanceCall(pairKey[0], 'citeaRouter'),
+				self._allowanceCall(pairKey[1], 'citeaRouter')
+			])
 			_amountA = _amount
-			_amountB = _amountsOut[1]
-
-			_amountAMin = int(_amountA * (1 - slippage))
-			_amountBMin = int(_amountB * (1 - slippage))
-
-			logger.info(f"Approving adding liquidity amount: {_amountA}")
-			approval_result = self.approve(pairKey[0], _amountA, 'citeaRouter')
-			if approval_result['status'] != 'success':
-				logger.error("Approval failed.")
-				return {'status': 'failed', 'error': 'Approval failed'}
-			time.sleep(5)
+			_amountB = (await self._getAmountsOut(_amount, pair))[1]
 
-			logger.info(f"Approving adding liquidity amount: {_amountB}")
-			approval_result = self.approve(pairKey[1], _amountB, 'citeaRouter')
-			if approval_result['status'] != 'success':
-				logger.error("Approval failed.")
-				return {'status': 'failed', 'error': 'Approval failed'}
-			time.sleep(5)
-
-			logger.info(f"Setting slippage to {slippage*100}%")
-			logger.info(f"Adding {_amount} {pairKey[0]} and {_amountsOut[1]} {pairKey[1]} to liquidity pool ...")
-			
-			nonce = self.sfi_web3.eth.get_transaction_count(self.address)
-
-			tx = contract.functions.addLiquidity(
-				pair[0],
-				pair[1],
-				_amountA,
-				_amountB,
-				_amountAMin,
-				_amountBMin,
-				self.address,
-				2**256-1
-			).build_transaction({
-				'chainId': self.sfi_web3.eth.chain_id,
-				'from': self.address,
-				'nonce': nonce
-			})
+			for token, amount, allowance in ((pairKey[0], _amountA, allowanceA), (pairKey[1], _amountB, allowanceB)):
+				logger.info(f"Approving adding liquidity amount: {amount}")
+				approval_result = await self.approve(token, amount, 'citeaRouter', allowance=allowance)
+				if approval_result['status'] != 'success':
+					logger.error("Approval failed.")
+					return approval_result
 
-			return self._executeTransaction(tx)
+			return await self._transact(self._addLiquidityCall(_amountA, _amountB, pair, pairKey, slippage))
 		except Exception as e:
-			logger.error(f"Error during swap: {str(e)}")
-			return {'status': 'failed', 'error': str(e)}
+			logger.error(f"Error during addLiquidity: {str(e)}")
+			return failureResult(e)
 
-	def removeLiquidity(self, _percentage: float, pairKey: list, slippage: int = 0.02) -> dict:
+	async def removeLiquidity(self, _percentage: float, pairKey: list, slippage: int = 0.02) -> dict:
 		try:
 			contract = self._getContract('citeaRouter')
 
 			pair = self._convertKeyPair(pairKey)
-			liquidity = int(self._getPairBalance(pair) * _percentage)
+			pairContract = await self._getPairContract(pair)
+			balance, supply, allowance = await self.context.batchCallWithReserves(pair, [
+				pairContract.functions.balanceOf(self.address),
+				pairContract.functions.totalSupply(),
+				pairContract.functions.allowance(self.address, contract.address)
+			])
+			reserves = await self.context.getReserves(pair[0], pair[1])
+			liquidity = int(balance * _percentage)
 
 			logger.info(f"Approving removing liquidity amount: {liquidity}")
-			approval_result = self.approve(self._getPairAddress(pair), liquidity, 'citeaRouter', 'sfi', [{"constant":False,"inputs":[{"name":"guy","type":"address"},{"name":"wad","type":"uint256"}],"name":"approve","outputs":[{"name":"","type":"bool"}],"payable":False,"stateMutability":"nonpayable","type":"function"}])
+			approval_result = await self.approve(pairContract.address, liquidity, 'citeaRouter', 'sfi', PAIR_ABI, allowance=allowance)
 			if approval_result['status'] != 'success':
 				logger.error("Approval failed.")
-				return {'status': 'failed', 'error': 'Approval failed'}
-			time.sleep(5)
-
-			supply = self._getPairSupply(pair)
-			reserves = self._getPairReserves(pair)
+				return approval_result
 
-			_amountAMin = int(reserves[0] * (liquidity / supply) * (1 - slippage))
-			_amountBMin = int(reserves[1] * (liquidity / supply) * (1 - slippage))
-
-			logger.info(f"Setting slippage to {slippage*100}%")
-			logger.info(f"Removing {liquidity} liquidity from pool ...")
-
-			nonce = self.sfi_web3.eth.get_transaction_count(self.address)
-
-			tx = contract.functions.removeLiquidity(
-				pair[0],
-				pair[1],
-				liquidity,
-				_amountAMin,
-				_amountBMin,
-				self.address,
-				2**256-1
-			).build_transaction({
-				'chainId': self.sfi_web3.eth.chain_id,
-				'from': self.address,
-				'nonce': nonce
-			})
-
-			return self._executeTransaction(tx)
+			return await self._transact(self._removeLiquidityCall(liquidity, supply, reserves, pair, slippage))
 
 		except Exception as e:
 			logger.error(f"Error during removeLiquidity: {str(e)}")
-			return {'status': 'failed', 'error': str(e)}
+			return failureResult(e)
 
-	def crymboTravelRules(self) -> dict:
-		"""
-		Handles Crymbo Travel Rules task.
-		"""
+	async def crymboTravelRules(self) -> dict:
 		try:
-			req = requests.get(self.CRYMBO_API + "/api/sfi-api?address=" + self.address)
-			res = req.json()
-			logger.info(res)
-
-			if res['msg'] == "Points added":
-				return {"status": "success", "msg": "Points added"}
+			async with self.context.httpSession().get(self.CRYMBO_API + "/api/sfi-api?address=" + self.address) as req:
+				res = await req.json(content_type=None)
+			return self._crymboResult(res)
 
 		except Exception as e:
 			logger.error(f"Error during crymboTravelRules: {str(e)}")
 			return {"status": "failed", "error": str(e)}
 
-		
-
-	def initWithdrawalOnchain(self, amount: int) -> dict:
-		"""
-		Initiates an on-chain withdrawal.
-		"""
+	async def initWithdrawalOnchain(self, amount: int) -> dict:
 		try:
 			contract = self._getContract('msgpasser')
-			nonce = self.sfi_web3.eth.get_transaction_count(self.address)
-
-			tx = contract.functions.initiateWithdrawal(
+			return await self._transact(contract.functions.initiateWithdrawal(
 				self.address,
 				amount,
 				"0x"
-			).build_transaction({
-				"chainId": self.sfi_web3.eth.chain_id,
-				"from": self.address,
-				"nonce": nonce,
-				"value": amount
-			})
-
-			return self._executeTransaction(tx)
+			), value=amount)
 
 		except Exception as e:
-			logger.error(f"Error during initWithdrawalOnchain: {str(e)}")
-			return {'status': 'failed', 'error': str(e)}
-
-	def initWithdrawal(self, amount: int) -> dict:
-		"""
-		Initiates a withdrawal and calls the Gelato API to finish bridging SFI.
-		"""
+			logger.error(f"Error during initWithdrawalOnchain: {str(e)}")
+			return failureResult(e)
+
+	async def initWithdrawal(self, amount: int) -> dict:
 		try:
-			onchain_result = self.initWithdrawalOnchain(amount)
+			onchain_result = await self.initWithdrawalOnchain(amount)
 
 			if onchain_result['status'] == 'failed':
 				return {
@@ -563,303 +3752,1058 @@ class SFI:
 				}
 
 			tx_hash = onchain_result['tx']
-			raw_tx = f"0x{self.sfi_web3.eth.get_raw_transaction(tx_hash).hex()}"
-			ts = int(time.time() * 1000.0)
-
-			raw_json = {
-				"direction": 1,
-				"from": self.address,
-				"to": self.address,
-				"l1Token": "0x9a3f60032941C91cdeF5dBB58f2cE80e47e3ddCA",
-				"l2Token": "0x9a3f60032941C91cdeF5dBB58f2cE80e47e3ddCA",
-				"amount": str(amount),
-				"data": "0x",
-				"logIndex": 0,
-				"blockNumber": 0,
-				"transactionHash": f"0x{tx_hash}",
-				"timestamp": ts,
-				"messageStatus": 2,
-				"button": True,
-				"slug": "singularity-finance-testnet",
-				"isWithdraw": True,
-				"rawTx": raw_tx
-			}
+			self.withdrawals.add(self.address, [tx_hash])
+			raw_tx = f"0x{(await self.sfi_web3.eth.get_raw_transaction(tx_hash)).hex()}"
+			raw_json = self._gelatoWithdrawal(amount, tx_hash, raw_tx)
 
 			logger.info("Calling Gelato API...")
+			async with self.context.httpSession().post(self.GELATO_API, json=raw_json) as response:
+				resp_json = await response.json(content_type=None)
+				logger.info(resp_json)
 
-			response = requests.post(self.GELATO_API, json=raw_json)
-			resp_json = response.json()
-
-			logger.info(resp_json)
-
-			if response.status_code == 200:	
-				return {
-					"status": "success",
-					"msg": resp_json
-				}
-			else:
-				return {
-					"status": "failed",
-					"msg": f"Gelato API error: {response.text}"
-				}
+				if response.status == 200:
+					return {"status": "success", "msg": resp_json}
+				else:
+					return {"status": "failed", "msg": f"Gelato API error: {resp_json}"}
 
 		except Exception as e:
 			logger.error(f"Error during initWithdrawal: {str(e)}")
-			return {
-				"status": "failed",
-				"msg": str(e)
-			}
-	
-	def proveWithdrawal(self, tx_hash: str) -> dict:
-		"""
-		Proves a withdrawal by using the specified transaction hash.
-		"""
-		try:
-			contract = self._getContract('portal', 'sep')
-			nonce = self.sep_web3.eth.get_transaction_count(self.address)
-			tx_receipt = self.sfi_web3.eth.get_transaction_receipt(tx_hash)
-			tx_block_number = tx_receipt['blockNumber']	
-
-			event_data = self._getEventData(tx_hash)
-			if not event_data:
-				logger.error("Failed to fetch event data for the transaction.")
-				return {'status': 'failed', 'error': 'Event data not found'}
-			
-			try:
-				output_index = self._getL2OutputIndexAfter(tx_block_number)
-			except Exception as e: # aka. Output not finalized
-				logger.error(f"Failed to get output index. Try again later.")
-				return {'status': 'failed', 'error': 'Failed to retrieve output index. Try again later.'}
+			return {"status": "failed", "msg": str(e)}
 
-			l2_output = self._getL2Output(output_index)
-			
-			withdrawal_hash = event_data.get('withdrawalHash')
-			if self._isWithdrawalProven(withdrawal_hash):
-				logger.info("Withdrawal is already proven.")
-				return {'status': 'success'}
+	async def _prepareProveWithdrawal(self, tx_hash: str) -> tuple:
+		contract = self._getContract('portal', 'sep')
 
-			tx_nonce = event_data.get('nonce')
-			value = event_data.get('value')
+		tx_receipt = await self.context.getReceipt(tx_hash)
+		event_data = self._decodeMessagePassed(tx_receipt)
+		failed = self._checkWithdrawalEvent(event_data)
+		if failed is not None:
+			return None, failed
 
-			if not (withdrawal_hash and tx_nonce and value):
-				logger.error("Incomplete event data.")
-				return {'status': 'failed', 'error': 'Incomplete event data'}
+		withdrawal_hash = event_data['withdrawalHash']
+		proven = asyncio.ensure_future(contract.functions.provenWithdrawals(withdrawal_hash).call())
+		try:
+			output_index = await self.context.getL2OutputIndexAfter(tx_receipt['blockNumber'])
+		except Exception as e: # aka. Output not finalized
+			proven.cancel()
+			logger.error(f"Failed to get output index. Try again later.")
+			return None, {'status': 'failed', 'error': 'Failed to retrieve output index. Try again later.'}
+
+		l2_output = await self.context.getL2Output(output_index)
+
+		hashed = AsyncWeb3.solidity_keccak(['bytes32', 'uint256'], [withdrawal_hash, 0])
+		block_number = l2_output[2]
+		proven, block, proof_data = await asyncio.gather(
+			proven,
+			self.context.getBlock(block_number),
+			self.context.getProof(L2_TO_L1_MESSAGE_PASSER, [hashed], block_number)
+		)
+		if proven != [b'\x00' * 32, 0, 0]:
+			logger.info("Withdrawal is already proven.")
+			return None, {'status': 'success'}
+
+		return self._proveCall(event_data, output_index, block, proof_data)
+
+	async def _prepareFinalizeWithdrawal(self, tx_hash: str) -> tuple:
+		contract = self._getContract('portal', 'sep')
 
-			hashed = self.sep_web3.solidity_keccak(['bytes32', 'uint256'], [withdrawal_hash, 0])
+		event_data = await self._getEventData(tx_hash)
+		failed = self._checkWithdrawalEvent(event_data)
+		if failed is not None:
+			return None, failed
 
-			block_number = l2_output[2]
-			block = self.sfi_web3.eth.get_block(block_number)
+		try:
+			finalized = await contract.functions.finalizedWithdrawals(event_data['withdrawalHash']).call()
+		except:
+			finalized = False
+		if finalized:
+			logger.info("Withdrawal already finalized.")
+			return None, {'status': 'success'}
 
-			proof_data = self.sfi_web3.eth.get_proof(
-				"0x4200000000000000000000000000000000000016",
-				[hashed],
-				block_number
-			)
-			if not proof_data or 'storageProof' not in proof_data or not proof_data['storageProof']:
-				logger.error("Proof data retrieval failed.")
-				return {'status': 'failed', 'error': 'Proof data retrieval failed'}
+		return self._finalizeCall(event_data), None
 
-			proof = proof_data['storageProof'][0]['proof']
-			storage_hash = proof_data['storageHash']
-			
-			tx = contract.functions.proveWithdrawalTransaction(
-				(tx_nonce, self.address, self.address, value, event_data['gasLimit'], "0x"),
-				output_index,
-				(b'\x00' * 32, block['stateRoot'], storage_hash, block['hash']),
-				proof
-			).build_transaction({
-				"chainId": self.sep_web3.eth.chain_id,
-				"from": self.address,
-				"nonce": nonce
-			})
+	async def proveWithdrawal(self, tx_hash: str) -> dict:
+		try:
+			call, result = await self._prepareProveWithdrawal(tx_hash)
+			if call is None:
+				return result
 
-			return self._executeTransaction(tx, "sep")
+			return await self._transact(call, "sep")
 
 		except Exception as e:
 			logger.error(f"Error during proveWithdrawal: {e}")
-			return {'status': 'failed', 'error': str(e)}
+			return failureResult(e)
 
-	def finalizeWithdrawal(self, tx_hash: str) -> dict:
-		"""
-		Finalize the withdrawal with the specified transaction hash.
-		"""
+	async def finalizeWithdrawal(self, tx_hash: str) -> dict:
 		try:
-			contract = self._getContract('portal', 'sep')
-			nonce = self.sep_web3.eth.get_transaction_count(self.address)
-
-			event_data = self._getEventData(tx_hash)
-			if not event_data:
-				logger.error("Failed to fetch event data for the transaction.")
-				return {'status': 'failed', 'error': 'Event data not found'}
-
-			withdrawal_hash = event_data.get('withdrawalHash')
-			if self._isWithdrawalFinalized(withdrawal_hash):
-				logger.info("Withdrawal already finalized.")
-				return {'status': 'success'}
+			call, result = await self._prepareFinalizeWithdrawal(tx_hash)
+			if call is None:
+				return result
 
-			tx_nonce = event_data.get('nonce')
-			value = event_data.get('value')
-
-			if not (withdrawal_hash and tx_nonce and value):
-				logger.error("Incomplete event data.")
-				return {'status': 'failed', 'error': 'Incomplete event data'}
-
-			tx = contract.functions.finalizeWithdrawalTransaction(
-				(tx_nonce, self.address, self.address, value, event_data['gasLimit'], "0x"),
-			).build_transaction({
-				"chainId": self.sep_web3.eth.chain_id,
-				"from": self.address,
-				"nonce": nonce
-			})
-
-			return self._executeTransaction(tx, "sep")
+			return await self._transact(call, "sep")
 		except Exception as e:
 			logger.error(f"Error during finalizeWithdrawal: {str(e)}")
-			return {'status': 'failed', 'error': str(e)}
+			return failureResult(e)
 
-		
-	def getWithdrawalList(self) -> dict:
-		"""
-		Retrieves a list of withdrawals needs to be proven.
-		"""
+	async def getWithdrawalList(self) -> list:
 		try:
-			response = requests.get(f"{self.GELATO_API}?isWithdraw=true&slug=singularity-finance-testnet&fromAddress={self.address}")
-			resp_json = response.json()
+			async with self.context.httpSession().get(f"{self.GELATO_API}?isWithdraw=true&slug=singularity-finance-testnet&fromAddress={self.address}") as response:
+				resp_json = await response.json(content_type=None)
 
-			# Get the latest 5 withdrawals
-			withdrawals = resp_json['data'][-5:]
+			withdrawals = resp_json['data']
 			logger.info(f"Got {len(withdrawals)} withdrawal(s).")
 			return withdrawals
-		
+
 		except Exception as e:
 			logger.error(f"Error during getWithdrawalList: {str(e)}")
-			return []
-
-	def proveWithdrawals(self) -> list:
-		"""
-		Handles the prove withdrawal process.
-		"""
-		try:
-			withdrawals = self.getWithdrawalList()
-			if not withdrawals:
-				logger.info("No withdrawals found.")
-				return {'status': 'success', 'msg': 'No withdrawals found.'}
+			return None
 
-			for w in withdrawals:
-				logger.info(f"{'-'*100}")
-				tx_hash = w['transactionHash']
-				logger.info(f"Processing withdrawal: {tx_hash}")
-				
-				# Prove the withdrawal
-				prove_res = self.proveWithdrawal(tx_hash)
-				if prove_res.get('status') != 'success':
-					continue 
+	async def syncWithdrawals(self, head: int = None) -> int:
+		if self.withdrawals.synced(self.address):
+			return 0
+		return self._indexWithdrawals(await self.getWithdrawalList(), head)
 
-				logger.info("Successfully processed withdrawal.")
-			
-			return {'status': 'success', 'msg': 'Processed all withdrawals.'}
+	async def proveWithdrawals(self) -> dict:
+		return await self._processWithdrawals(self._prepareProveWithdrawal, "proveWithdrawals", ("initiated",), "proven")
 
-		except Exception as e:
-			logger.error(f"Error during proveWithdraws: {str(e)}")
-			return {'status': 'failed', 'error': str(e)}
+	async def finalizeWithdrawals(self) -> dict:
+		return await self._processWithdrawals(self._prepareFinalizeWithdrawal, "finalizeWithdrawals", ("proven",), "finalized")
 
-	def finalizeWithdrawals(self) -> list:
+	async def _processWithdrawals(self, prepare, name: str, states: tuple, next_state: str) -> dict:
 		"""
-		Handles the finalize withdrawal process.
+		Prepares every indexed withdrawal in one of `states` concurrently, sends the L1
+		transactions one by one in order as they become ready, and waits for their receipts
+		together. Withdrawals that succeed move to `next_state` in the index.
 		"""
 		try:
-			withdrawals = self.getWithdrawalList()
+			head = await self.context.getBlockNumber("sep")
+			await self.syncWithdrawals(head)
+			withdrawals = self.withdrawals.pending(self.address, states, head)
 			if not withdrawals:
-				logger.info("No withdrawals found.")
+				logger.info("No pending withdrawals found.")
 				return {'status': 'success', 'msg': 'No withdrawals found.'}
 
-			for w in withdrawals:
-				logger.info(f"{'-'*100}")
-				tx_hash = w['transactionHash']
+			prepared = [asyncio.ensure_future(prepare(tx_hash)) for tx_hash in withdrawals]
+
+			results = []
+			for tx_hash, task in zip(withdrawals, prepared):
 				logger.info(f"Processing withdrawal: {tx_hash}")
-				
-				# Finalize the withdrawal
-				final_res = self.finalizeWithdrawal(tx_hash)
-				if final_res.get('status') != 'success':
-					continue 
+				try:
+					call, result = await task
+					if call is not None and self.simulate:
+						result = await self._simulate(call, "sep")
+					if call is not None and result is None:
+						transaction = await self._buildTransaction(call, "sep")
+						sent = await self._sendTransaction(transaction, "sep")
+						logger.info(f"Transaction sent: {sent.hex()}")
+						result = asyncio.ensure_future(self._awaitReceipt(sent, "sep", transaction))
+				except Exception as e:
+					logger.error(f"Error during {name} of {tx_hash}: {str(e)}")
+					result = failureResult(e)
+				results.append((tx_hash, result))
+
+			checked_block = await self.context.getBlockNumber("sep")
+			for tx_hash, result in results:
+				if isinstance(result, asyncio.Future):
+					result = await result
+				self._recordWithdrawal(tx_hash, result, checked_block, next_state)
 
-				logger.info("Successfully processed withdrawal.")
-			
 			return {'status': 'success', 'msg': 'Processed all withdrawals.'}
 
 		except Exception as e:
-			logger.error(f"Error during proveWithdraws: {str(e)}")
-			return {'status': 'failed', 'error': str(e)}
+			logger.error(f"Error during {name}: {str(e)}")
+			return failureResult(e)
 
 
-def executeOperation(operation, amount: int, times: int, *args) -> None:
+def executeOperation(operation, amount: int, times: int, *args, journal: WalletJournal = None, policy: RetryPolicy = None) -> int:
 	"""
-	Executes a given operation a specified number of successful times.
+	Executes a given operation a specified number of successful times,
+	retrying failed attempts within the limits of the retry policy.
 
 	Args:
 		operation (callable): The operation to execute.
 		amount (int): The amount to process.
 		times (int): The number of successful executions required.
 		*args: Additional arguments required for the operation.
+		journal (WalletJournal): Where successes are recorded and resumed from, if given.
+		policy (RetryPolicy): The wallet's retry policy; a default one when not given.
+
+	Returns:
+		int: The number of successful executions.
 	"""
-	successful_runs = 0
+	name = operation.__name__
+	successful_runs = journal.successes().get(name, 0) if journal is not None else 0
 
-	while successful_runs < times:
-		logger.info(f"Attempt {successful_runs + 1}/{times}: Executing operation.")
-		try:
-			result = operation(amount, *args) if amount is not None else operation(*args)
+	if successful_runs:
+		logger.info(f"Resuming {name} at {min(successful_runs, times)}/{times} from the journal.")
+
+	token = current_operation.set(name)
+	try:
+		policy = policy or RetryPolicy()
+		policy.begin(name)
+		while successful_runs < times and not policy.expired():
+			logger.info(f"Attempt {successful_runs + 1}/{times}: Executing operation.")
+			started = time.monotonic()
+			try:
+				if journal is not None:
+					journal.operation = name
+				result = operation(amount, *args) if amount is not None else operation(*args)
+				if result['status'] == 'success':
+					successful_runs += 1
+					policy.succeeded(name)
+					if journal is not None:
+						journal.record(name, successful_runs)
+					logger.info(f"Attempt {successful_runs}/{times}: Operation successful.")
+					continue
+				elif result['status'] == 'skipped':
+					logger.warning(f"Attempt {successful_runs + 1}/{times}: Would revert ({result['error']}), giving up on {name}.")
+					break
+				else:
+					logger.warning(f"Attempt {successful_runs + 1}/{times}: Operation failed.")
+			except Exception as e:
+				logger.error(f"Attempt {successful_runs + 1}/{times}: Error occurred during operation: {str(e)}")
+				result = failureResult(e)
+
+			delay = policy.failed(name, result, time.monotonic() - started)
+			if delay is None:
+				break
+			time.sleep(delay)
+
+	finally:
+		current_operation.reset(token)
+	return successful_runs
+	
+
+# Single-transaction operations that don't need a prior approval and can share a pipeline
+PIPELINED_OPERATIONS = ("wrap", "unwrap", "unstake", "claim")
+# Pipelined operations that later ones depend on (unwrap spends the wSFI wrap mints), so their batch
+# is mined before the next one is built
+PIPELINE_BARRIERS = ("wrap",)
+
+def executePipelined(sfi: SFI, operations: list, policy: RetryPolicy = None) -> dict:
+	"""
+	Executes a group of operations by sending all their transactions back-to-back
+	with consecutive nonces, then counting successes from the collected receipts.
+	Attempts that failed are sent again in the next round, within the limits of
+	the retry policy; operations whose simulation reverted are not.
+
+	Args:
+		sfi (SFI): The wallet the operations belong to.
+		operations (list): (operation, amount, times, *args) tuples, as in run().
+		policy (RetryPolicy): The wallet's retry policy; a default one when not given.
+
+	Returns:
+		dict: The number of successful executions per operation name.
+	"""
+	journal = sfi.journal
+	recorded = journal.successes() if journal is not None else {}
+	successful_runs = {operation.__name__: recorded.get(operation.__name__, 0) for operation, *_ in operations}
+	given_up = set()
+	policy = policy or RetryPolicy(sfi)
+	for operation, *_ in operations:
+		policy.begin(operation.__name__)
+
+	def unfinished() -> list:
+		return [operation.__name__ for operation, _, times, *_ in operations if successful_runs[operation.__name__] < times and operation.__name__ not in given_up]
+
+	while unfinished() and not policy.expired():
+		submitted = []
+		failed = {}
+		started = time.monotonic()
+
+		with sfi.pipeline():
+			for operation, amount, times, *args in operations:
+				name = operation.__name__
+				if name in given_up:
+					continue
+				if journal is not None:
+					journal.operation = name
+				token = current_operation.set(name)
+				for _ in range(times - successful_runs[name]):
+					try:
+						result = operation(amount, *args) if amount is not None else operation(*args)
+					except Exception as e:
+						result = failureResult(e)
+
+					if result['status'] == 'pending':
+						submitted.append(name)
+					elif result['status'] == 'success':
+						successful_runs[name] += 1
+					elif result['status'] == 'skipped':
+						logger.warning(f"{name}: Would revert ({result['error']}), giving up.")
+						given_up.add(name)
+						break
+					else:
+						logger.warning(f"{name}: Could not submit transaction, retrying next round.")
+						failed[name] = result
+						break
+				current_operation.reset(token)
+
+		logger.info(f"Submitted {len(submitted)} transaction(s), waiting for receipts...")
+		for name, result in zip(submitted, sfi.collectReceipts()):
 			if result['status'] == 'success':
-				successful_runs += 1
-				logger.info(f"Attempt {successful_runs}/{times}: Operation successful.")
+				successful_runs[name] += 1
 			else:
-				logger.warning(f"Attempt {successful_runs + 1}/{times}: Operation failed, trying again...")
-		except Exception as e:
-			logger.error(f"Attempt {successful_runs + 1}/{times}: Error occurred during operation: {str(e)}")
-		
-		time.sleep(5) 
-	
-	
-def run(pk: str, config: Dict[str, int], opr_type: int = 0) -> None:
+				failed.setdefault(name, result)
+
+		if journal is not None:
+			for name in set(submitted):
+				journal.record(name, successful_runs[name])
+
+		for operation, _, times, *_ in operations:
+			logger.info(f"{operation.__name__}: {successful_runs[operation.__name__]}/{times} successful.")
+
+		seconds = time.monotonic() - started
+		delays = []
+		for name in unfinished():
+			if name not in failed:
+				policy.succeeded(name)
+				continue
+			delay = policy.failed(name, failed[name], seconds)
+			if delay is None:
+				given_up.add(name)
+			else:
+				delays.append(delay)
+
+		if unfinished() and delays:
+			time.sleep(max(delays))
+
+	return successful_runs
+
+
+def _shortAddress(address: str) -> str:
+	return f"{address[:6]}...{address[-4:]}"
+
+
+def reconcileJournal(sfi: SFI, journal: WalletJournal) -> None:
 	"""
-	Executes the main workflow based on the given configuration
+	Accounts for transactions that an earlier process sent but never saw confirmed.
+	Each one is looked up by hash instead of being sent again, and the successful
+	ones are credited to the operation that sent them.
 	"""
-	if not config:
-		logger.error("Invalid configuration provided.")
+	inflight = journal.inflight()
+	if not inflight:
 		return
 
-	sfi = SFI(private_key=pk)
-	logger.info(f"--- Address: {sfi.address} ---")
+	logger.info(f"Reconciling {len(inflight)} in-flight transaction(s) from the journal...")
+	credited = {}
+	for tx_hash, network, operation, counted in inflight:
+		web3 = getattr(sfi, f"{network}_web3")
+		try:
+			web3.eth.get_transaction(tx_hash)
+		except TransactionNotFound:
+			logger.info(f"Transaction {tx_hash} was dropped.")
+			journal.settled(tx_hash)
+			continue
+
+		result = sfi._awaitReceipt(HexBytes(tx_hash), network, counted=counted)
+		if result['status'] == 'success' and counted and operation:
+			credited[operation] = credited.get(operation, 0) + 1
+		else:
+			journal.settled(tx_hash)
+
+	successes = journal.successes()
+	for operation, count in credited.items():
+		journal.record(operation, successes.get(operation, 0) + count)
+
 
+def walletOperations(sfi: WalletBase, config: dict, opr_type: int = 0) -> list:
+	"""
+	The operations a run performs for the wallet, as (operation, amount, times, *args) tuples.
+	"""
 	if opr_type == 1:
-		operations = [
+		return [
 			(sfi.proveWithdrawals, None, 1),
 		]
 	elif opr_type == 2:
-		operations = [
+		return [
 			(sfi.finalizeWithdrawals, None, 1),
 		]
-	else:
-		operations = [
-			(sfi.wrap, config.get("wrapAmount"), 2),
-			(sfi.unwrap, config.get("unwrapAmount"), 2),
-			(sfi.stake, config.get("stakeAmount"), 2),
-			(sfi.unstake, config.get("unstakeAmount"), 1),
-			(sfi.claim, None, 2),
-			(sfi.swap, config.get("citeaConfig")['swapAmount'], 3, config.get("citeaConfig")["pair"], config.get("citeaConfig")["slippage"]),
-			(sfi.addLiquidity, config.get("citeaConfig")['addLiquidityAmount'], 1, config.get("citeaConfig")["pair"], config.get("citeaConfig")["slippage"]),
-			(sfi.removeLiquidity, config.get("citeaConfig")['removeLiquidityPerc'], 1, config.get("citeaConfig")["pair"], config.get("citeaConfig")["slippage"]),
-			(sfi.crymboTravelRules, None, 3)
-			# (sfi.initWithdrawal, config.get("bridgeAmount"), 5) | Disabled
-		]
 
-	for operation, amount, max_attempts, *extra_args in operations:  
-		logger.info(f"Starting operation: {operation.__name__}")
-		if amount is not None:
-			executeOperation(operation, amount, max_attempts, *extra_args)
+	citea = config.get("citeaConfig")
+	return [
+		(sfi.wrap, config.get("wrapAmount"), 2),
+		(sfi.unwrap, config.get("unwrapAmount"), 2),
+		(sfi.stake, config.get("stakeAmount"), 2),
+		(sfi.unstake, config.get("unstakeAmount"), 1),
+		(sfi.claim, None, 2),
+		(sfi.swap, citea['swapAmount'], 3, citea["pair"], citea["slippage"]),
+		(sfi.addLiquidity, citea['addLiquidityAmount'], 1, citea["pair"], citea["slippage"]),
+		(sfi.removeLiquidity, citea['removeLiquidityPerc'], 1, citea["pair"], citea["slippage"]),
+		(sfi.crymboTravelRules, None, 3)
+		# (sfi.initWithdrawal, config.get("bridgeAmount"), 5) | Disabled
+	]
+
+
+def _walletOptions(config: dict) -> dict:
+	return {
+		"confirmations": config.get("confirmations", 1),
+		"approve_max": config.get("approveMax", False),
+		"withdrawals": WithdrawalIndex.shared(config.get("withdrawalDb", WITHDRAWAL_DB)),
+		"simulate": config.get("simulate", False),
+		"replacement": config.get("replacement"),
+	}
+
+
+def _resumed(summary: dict, sfi: WalletBase) -> bool:
+	"""
+	Fills in the summary of a wallet the journal has as completed. Returns whether it was.
+	"""
+	if not sfi.journal.isComplete():
+		return False
+	logger.info("Already completed in this run, skipping.")
+	summary['status'] = 'success'
+	summary['resumed'] = True
+	summary['operations'] = sfi.journal.successes()
+	return True
+
+
+def _finishSummary(summary: dict, sfi: WalletBase, policy: RetryPolicy, completed: bool) -> None:
+	if completed and sfi.journal is not None:
+		sfi.journal.complete()
+	summary['status'] = 'success' if completed else 'failed'
+	summary['approvalsSaved'] = sfi.approvals_saved
+	if sfi.skipped:
+		summary['skipped'] = sfi.skipped
+	summary['retries'] = policy.report()
+	if policy.abandoned:
+		summary['error'] = policy.abandoned
+	logger.info(f"--- Workflow completed, {sfi.approvals_saved} approval(s) saved ---")
+
+
+def run(pk: str, config: Dict[str, int], opr_type: int = 0, pipeline: bool = False, journal: RunJournal = None, run_id: str = None) -> dict:
+	"""
+	Executes the main workflow based on the given configuration.
+	With `pipeline`, consecutive operations from PIPELINED_OPERATIONS are submitted
+	together and their receipts awaited as one batch.
+	With a `journal`, progress is recorded under `run_id` and a rerun resumes from it.
+
+	Returns:
+		dict: The wallet summary, with the number of successful runs per operation.
+	"""
+	summary = {'address': None, 'status': 'failed', 'operations': {}}
+
+	if not config:
+		logger.error("Invalid configuration provided.")
+		summary['error'] = "Invalid configuration"
+		return summary
+
+	token = None
+	try:
+		sfi = SFI(private_key=pk, **_walletOptions(config))
+		summary['address'] = sfi.address
+		token = wallet_label.set(_shortAddress(sfi.address))
+		logger.info(f"--- Address: {sfi.address} ---")
+
+		if journal is not None:
+			sfi.journal = journal.wallet(run_id or RunJournal.runId(opr_type), sfi.address)
+			if _resumed(summary, sfi):
+				return summary
+			reconcileJournal(sfi, sfi.journal)
+
+		operations = walletOperations(sfi, config, opr_type)
+		policy = RetryPolicy(sfi, config.get("retryPolicy"))
+		completed = True
+		batch = []
+		for index, (operation, amount, max_attempts, *extra_args) in enumerate(operations):
+			if policy.abandoned:
+				completed = False
+				break
+			if pipeline and operation.__name__ in PIPELINED_OPERATIONS:
+				batch.append((operation, amount, max_attempts, *extra_args))
+				if index + 1 < len(operations) and operations[index + 1][0].__name__ in PIPELINED_OPERATIONS and operation.__name__ not in PIPELINE_BARRIERS:
+					continue
+
+				logger.info(f"Starting pipelined operations: {', '.join(op.__name__ for op, *_ in batch)}")
+				for name, successful_runs in executePipelined(sfi, batch, policy).items():
+					summary['operations'][name] = successful_runs
+				completed = completed and all(summary['operations'][op.__name__] >= times for op, _, times, *_ in batch)
+				batch = []
+				continue
+
+			logger.info(f"Starting operation: {operation.__name__}")
+			if amount is not None:
+				successful_runs = executeOperation(operation, amount, max_attempts, *extra_args, journal=sfi.journal, policy=policy)
+			else:
+				successful_runs = executeOperation(operation, None, max_attempts, *extra_args, journal=sfi.journal, policy=policy)
+
+			summary['operations'][operation.__name__] = successful_runs
+			completed = completed and successful_runs >= max_attempts
+
+		_finishSummary(summary, sfi, policy, completed)
+
+	except Exception as e:
+		logger.error(f"Error during run: {str(e)}")
+		summary['error'] = str(e)
+
+	finally:
+		if token is not None:
+			wallet_label.reset(token)
+
+	return summary
+
+
+# Wallets in flight at once with --async when -w isn't given
+ASYNC_CONCURRENCY = 100
+
+class RunReport:
+	"""
+	Running totals of a multi-wallet run, fed one wallet summary at a time as the wallets finish.
+
+	Only the summaries of failed wallets are held for the final report, unless `keep` is set.
+	With a `path`, every summary is streamed to that results file as it arrives.
+	"""
+	def __init__(self, path: str = None, shard: tuple = None, run_id: str = None, keep: bool = False) -> None:
+		self.path = path
+		self.keep = keep
+		self.summaries = []
+		self.failed = []
+		self.wallets = 0
+		self.succeeded = 0
+		self.resumed = 0
+		self.approvals_saved = 0
+		self.retry_attempts = 0
+		self.retry_seconds = 0.0
+		self._file = None
+		if path:
+			self._file = open(path, "w")
+			self._file.write(f'{{\n\t"shard": {json.dumps(list(shard) if shard else None)},\n\t"runId": {json.dumps(run_id)},\n\t"summaries": [')
+
+	def add(self, summary: dict) -> None:
+		if self._file is not None:
+			self._file.write(("," if self.wallets else "") + "\n\t\t" + json.dumps(summary))
+		if self.keep:
+			self.summaries.append(summary)
+		self.wallets += 1
+		if summary['status'] == 'success':
+			self.succeeded += 1
+		else:
+			self.failed.append(summary)
+		if summary.get('resumed'):
+			self.resumed += 1
+		self.approvals_saved += summary.get('approvalsSaved', 0)
+		self.retry_attempts += summary.get('retries', {}).get('attempts', 0)
+		self.retry_seconds += summary.get('retries', {}).get('seconds', 0)
+
+	def close(self) -> None:
+		"""
+		Finishes the results file, if any, and logs the aggregated success/failure summary.
+		"""
+		if self._file is not None:
+			self._file.write(f'\n\t],\n\t"finishedAt": {int(time.time())}\n}}\n')
+			self._file.close()
+			self._file = None
+			logger.info(f"Results of {self.wallets} wallet(s) written to {self.path}")
+
+		logger.info(f"{'='*100}")
+		logger.info(f"Summary: {self.succeeded}/{self.wallets} wallet(s) completed, {len(self.failed)} failed.")
+		if self.resumed:
+			logger.warning(f"{self.resumed} of them were skipped, having completed earlier in the resumed run.")
+		logger.info(f"Approvals saved: {self.approvals_saved}")
+		logger.info(f"Retries: {self.retry_attempts} failed attempt(s), {self.retry_seconds:.1f}s spent retrying")
+		for s in self.failed:
+			logger.warning(f"Failed wallet {s['address'] or 'unknown'}: {s.get('error', 'incomplete operations')} {s['operations']}")
+			for name, error in s.get('skipped', {}).items():
+				logger.warning(f"  {name} skipped, would revert: {error}")
+
+
+def runMany(private_keys: Iterable[str], config: Dict[str, int], opr_type: int = 0, workers: int = 1, pipeline: bool = False, journal: RunJournal = None, run_id: str = None, report: RunReport = None) -> list:
+	"""
+	Runs the workflow for every private key, using up to `workers` wallets concurrently.
+
+	At most `workers * 2` wallets are queued at any time, so large key files are
+	consumed as the pool drains instead of being scheduled all at once. Each summary
+	goes to `report` as soon as its wallet finishes.
+
+	Returns:
+		list: The wallet summaries in the order the wallets finished, when the report keeps them
+		(it does when no `report` is given).
+	"""
+	report = report or RunReport(keep=True)
+
+	def _runWallet(index: int, pk: str) -> dict:
+		token = wallet_label.set(f"#{index}")
+		try:
+			return run(pk, config, opr_type, pipeline, journal, run_id)
+		except Exception as e:
+			return {'address': None, 'status': 'failed', 'operations': {}, 'error': str(e)}
+		finally:
+			wallet_label.reset(token)
+
+	try:
+		if workers <= 1:
+			for index, pk in enumerate(private_keys, start=1):
+				report.add(_runWallet(index, pk))
+		else:
+			with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wallet") as executor:
+				running = set()
+				for index, pk in enumerate(private_keys, start=1):
+					if len(running) >= workers * 2:
+						done, running = waitFutures(running, return_when=FIRST_COMPLETED)
+						for future in done:
+							report.add(future.result())
+					running.add(executor.submit(_runWallet, index, pk))
+
+				for future in as_completed(running):
+					report.add(future.result())
+	finally:
+		report.close()
+	return report.summaries
+
+
+async def executeOperationAsync(operation, amount: int, times: int, *args, journal: WalletJournal = None, policy: RetryPolicy = None) -> int:
+	"""
+	Asynchronous counterpart of executeOperation for AsyncSFI operations.
+	"""
+	name = operation.__name__
+	successful_runs = journal.successes().get(name, 0) if journal is not None else 0
+
+	if successful_runs:
+		logger.info(f"Resuming {name} at {min(successful_runs, times)}/{times} from the journal.")
+
+	token = current_operation.set(name)
+	try:
+		policy = policy or RetryPolicy()
+		policy.begin(name)
+		while successful_runs < times and not policy.expired():
+			logger.info(f"Attempt {successful_runs + 1}/{times}: Executing operation.")
+			started = time.monotonic()
+			try:
+				if journal is not None:
+					journal.operation = name
+				result = await (operation(amount, *args) if amount is not None else operation(*args))
+				if result['status'] == 'success':
+					successful_runs += 1
+					policy.succeeded(name)
+					if journal is not None:
+						journal.record(name, successful_runs)
+					logger.info(f"Attempt {successful_runs}/{times}: Operation successful.")
+					continue
+				elif result['status'] == 'skipped':
+					logger.warning(f"Attempt {successful_runs + 1}/{times}: Would revert ({result['error']}), giving up on {name}.")
+					break
+				else:
+					logger.warning(f"Attempt {successful_runs + 1}/{times}: Operation failed.")
+			except Exception as e:
+				logger.error(f"Attempt {successful_runs + 1}/{times}: Error occurred during operation: {str(e)}")
+				result = failureResult(e)
+
+			delay = policy.failed(name, result, time.monotonic() - started)
+			if delay is None:
+				break
+			await asyncio.sleep(delay)
+
+	finally:
+		current_operation.reset(token)
+	return successful_runs
+
+
+async def reconcileJournalAsync(sfi: AsyncSFI, journal: WalletJournal) -> None:
+	"""
+	Asynchronous counterpart of reconcileJournal.
+	"""
+	inflight = journal.inflight()
+	if not inflight:
+		return
+
+	logger.info(f"Reconciling {len(inflight)} in-flight transaction(s) from the journal...")
+	credited = {}
+	for tx_hash, network, operation, counted in inflight:
+		try:
+			await sfi.context.web3[network].eth.get_transaction(tx_hash)
+		except TransactionNotFound:
+			logger.info(f"Transaction {tx_hash} was dropped.")
+			journal.settled(tx_hash)
+			continue
+
+		result = await sfi._awaitReceipt(HexBytes(tx_hash), network, counted=counted)
+		if result['status'] == 'success' and counted and operation:
+			credited[operation] = credited.get(operation, 0) + 1
+		else:
+			journal.settled(tx_hash)
+
+	successes = journal.successes()
+	for operation, count in credited.items():
+		journal.record(operation, successes.get(operation, 0) + count)
+
+
+async def runAsync(pk: str, config: Dict[str, int], context: AsyncChainContext, opr_type: int = 0, journal: RunJournal = None, run_id: str = None) -> dict:
+	"""
+	Asynchronous counterpart of run(), driving one wallet with AsyncSFI.
+	"""
+	summary = {'address': None, 'status': 'failed', 'operations': {}}
+
+	if not config:
+		logger.error("Invalid configuration provided.")
+		summary['error'] = "Invalid configuration"
+		return summary
+
+	token = None
+	try:
+		sfi = AsyncSFI(private_key=pk, context=context, **_walletOptions(config))
+		summary['address'] = sfi.address
+		token = wallet_label.set(_shortAddress(sfi.address))
+		logger.info(f"--- Address: {sfi.address} ---")
+
+		if journal is not None:
+			sfi.journal = journal.wallet(run_id or RunJournal.runId(opr_type), sfi.address)
+			if _resumed(summary, sfi):
+				return summary
+			await reconcileJournalAsync(sfi, sfi.journal)
+
+		operations = walletOperations(sfi, config, opr_type)
+		policy = RetryPolicy(sfi, config.get("retryPolicy"))
+		completed = True
+		for operation, amount, max_attempts, *extra_args in operations:
+			if policy.abandoned:
+				completed = False
+				break
+			logger.info(f"Starting operation: {operation.__name__}")
+			successful_runs = await executeOperationAsync(operation, amount, max_attempts, *extra_args, journal=sfi.journal, policy=policy)
+			summary['operations'][operation.__name__] = successful_runs
+			completed = completed and successful_runs >= max_attempts
+
+		_finishSummary(summary, sfi, policy, completed)
+
+	except Exception as e:
+		logger.error(f"Error during run: {str(e)}")
+		summary['error'] = str(e)
+
+	finally:
+		if token is not None:
+			wallet_label.reset(token)
+
+	return summary
+
+
+async def runManyAsync(private_keys: Iterable[str], config: Dict[str, int], opr_type: int = 0, concurrency: int = ASYNC_CONCURRENCY, journal: RunJournal = None, run_id: str = None, report: RunReport = None) -> list:
+	"""
+	Runs the workflow for every private key on one event loop, with up to
+	`concurrency` wallets in flight at once. Each summary goes to `report` as soon
+	as its wallet finishes.
+
+	Returns:
+		list: The wallet summaries in the order the wallets finished, when the report keeps them
+		(it does when no `report` is given).
+	"""
+	report = report or RunReport(keep=True)
+	context = await AsyncChainContext.create(rpc_urls=config.get("rpcEndpoints"), ws_urls=config.get("wsEndpoints"), citea_fee_bps=config.get("citeaConfig", {}).get("feeBps", CITEA_FEE_BPS))
+
+	async def _runWallet(index: int, pk: str) -> dict:
+		wallet_label.set(f"#{index}")
+		try:
+			return await runAsync(pk, config, context, opr_type, journal, run_id)
+		except Exception as e:
+			return {'address': None, 'status': 'failed', 'operations': {}, 'error': str(e)}
+
+	running = set()
+	try:
+		for index, pk in enumerate(private_keys, start=1):
+			if len(running) >= concurrency:
+				done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+				for task in done:
+					report.add(task.result())
+			running.add(asyncio.create_task(_runWallet(index, pk)))
+
+		for task in asyncio.as_completed(running):
+			report.add(await task)
+	finally:
+		for task in running:
+			task.cancel()
+		await context.close()
+		report.close()
+	return report.summaries
+
+
+# Results file each shard writes when --results isn't given
+RESULTS_FILE = "results-{index}-of-{count}.json"
+
+def parseShard(text: str) -> tuple:
+	"""
+	Parses --shard "i/N" into (i, N), shards being numbered from 0.
+	"""
+	try:
+		index, count = (int(part) for part in text.split("/"))
+	except ValueError:
+		raise argparse.ArgumentTypeError(f"Invalid shard '{text}', expected i/N (e.g. 0/4).")
+	if not 0 <= index < count:
+		raise argparse.ArgumentTypeError(f"Invalid shard '{text}', i must be between 0 and N-1.")
+	return index, count
+
+def shardOf(private_key: str, count: int) -> int:
+	"""
+	Returns the shard of a key out of `count`, from a stable hash of its address, so every
+	machine splits a key file the same way without coordinating.
+	"""
+	try:
+		address = Account.from_key(private_key).address
+	except Exception:
+		# Invalid keys all land in shard 0, which reports them
+		return 0
+	return int.from_bytes(hashlib.sha256(bytes.fromhex(address[2:])).digest()[:8], "big") % count
+
+def shardKeys(private_keys: Iterable[str], index: int, count: int) -> Iterable[str]:
+	"""
+	Yields the keys of shard `index` out of `count`, reading `private_keys` lazily.
+	"""
+	return (pk for pk in private_keys if shardOf(pk, count) == index)
+
+def mergeResults(paths: Iterable[str], output: str = None) -> list:
+	"""
+	Merges the results files of several shards, warning about missing or repeated shards.
+	A wallet that appears more than once keeps its most recent summary.
+
+	Returns:
+		list: The merged wallet summaries.
+	"""
+	shards = {}
+	counts = set()
+	by_address = {}
+	unknown = []
+
+	for path in paths:
+		with open(path, "r") as f:
+			results = json.load(f)
+
+		if results.get('shard'):
+			index, count = results['shard']
+			counts.add(count)
+			if index in shards:
+				logger.warning(f"Shard {index}/{count} appears in both {shards[index]} and {path}.")
+			shards[index] = path
+
+		for summary in results['summaries']:
+			if summary.get('address'):
+				by_address[summary['address']] = summary
+			else:
+				unknown.append(summary)
+
+	if len(counts) > 1:
+		logger.warning(f"Results come from different shard counts: {sorted(counts)}.")
+	elif counts:
+		missing = sorted(set(range(counts.pop())) - set(shards))
+		if missing:
+			logger.warning(f"Missing results for shard(s): {', '.join(map(str, missing))}.")
+
+	summaries = [by_address[address] for address in sorted(by_address)] + unknown
+	report = RunReport(output)
+	for summary in summaries:
+		report.add(summary)
+	report.close()
+	return summaries
+
+
+# How often the daemon checks for due wallets and config.json changes, in seconds
+DAEMON_TICK = 5
+# Delay before the daemon retries a wallet whose daily run failed, in seconds
+DAEMON_RETRY = 3600
+# Local port of the daemon's status endpoint
+DAEMON_STATUS_PORT = 8421
+def _networkSettings(config: dict) -> str:
+	"""
+	The settings of config.json that need a new chain context when they change.
+	"""
+	return json.dumps([config.get("rpcEndpoints"), config.get("wsEndpoints"), config.get("citeaConfig", {}).get("feeBps")], sort_keys=True)
+
+class Daemon:
+	"""
+	Keeps one process running for a key file, so that daily runs start on a warm chain context.
+
+	Each wallet's daily workflow is scheduled at a stable time of day derived from its
+	address, spreading the load over `scheduleWindow` (UTC hours, default the whole day).
+	config.json is reloaded when it changes, and the status is served as JSON on a
+	local HTTP endpoint, next to the Prometheus metrics.
+	"""
+	def __init__(self, private_keys: Iterable[str], config_path: str = "config.json", workers: int = 1, pipeline: bool = False, journal: RunJournal = None) -> None:
+		self.config_path = config_path
+		self.workers = max(workers, 1)
+		self.pipeline = pipeline
+		self.journal = journal or RunJournal.shared()
+		self.started = time.time()
+
+		self.wallets = {}
+		for pk in private_keys:
+			try:
+				self.wallets[Account.from_key(pk).address] = pk
+			except Exception as e:
+				logger.error(f"Skipping invalid private key: {str(e)}")
+
+		self._lock = threading.Lock()
+		self._wake = threading.Event()
+		self._stopped = threading.Event()
+		self._schedule = []
+		self._running = {}
+		self._futures = set()
+		self._recent = collections.deque(maxlen=100)
+		self._config_mtime = -1
+		self.config = None
+		self.config_loaded = None
+		self._reloadConfig()
+
+	def _reloadConfig(self) -> None:
+		"""
+		Loads config.json if it changed since the last load. An invalid file keeps the previous configuration.
+		"""
+		try:
+			mtime = os.stat(self.config_path).st_mtime
+		except OSError:
+			mtime = None
+		if mtime == self._config_mtime:
+			return
+		self._config_mtime = mtime
+
+		try:
+			with open(self.config_path, "r") as f:
+				config = json.load(f)
+		except (OSError, json.JSONDecodeError) as e:
+			if self.config is None:
+				raise
+			logger.error(f"Couldn't reload {self.config_path}, keeping the previous configuration: {str(e)}")
+			return
+
+		reconnect = self.config is not None and _networkSettings(config) != _networkSettings(self.config)
+		configureContext(config)
+		if reconnect:
+			with self._lock:
+				pending = list(self._futures)
+			ChainContext.reset(pending)
+		self.config = config
+		self.config_loaded = time.time()
+		logger.info(f"Loaded {self.config_path}" + (", network settings changed" if reconnect else ""))
+
+	def slot(self, address: str) -> int:
+		"""
+		Seconds after UTC midnight at which the wallet's daily run is due.
+		"""
+		start, end = self.config.get("scheduleWindow", [0, 24])
+		window = max(int((end - start) * 3600), 1)
+		return int(start * 3600) + int.from_bytes(hashlib.sha256(bytes.fromhex(address[2:])).digest()[:8], "big") % window
+
+	def _nextRun(self, address: str, now: float) -> float:
+		"""
+		When the wallet runs next: today's slot, right away if that passed without a completed run, or tomorrow's.
+		"""
+		midnight = now - now % 86400
+		due = midnight + self.slot(address)
+		if due > now:
+			return due
+		if not self.journal.wallet(RunJournal.runId(0, now), address).isComplete():
+			return now
+		return due + 86400
+
+	def _push(self, due: float, address: str) -> None:
+		with self._lock:
+			heapq.heappush(self._schedule, (due, address))
+		self._wake.set()
+
+	def _runWallet(self, address: str) -> None:
+		token = wallet_label.set(_shortAddress(address))
+		started = time.time()
+		try:
+			summary = run(self.wallets[address], self.config, 0, self.pipeline, self.journal, RunJournal.runId(0, started))
+		except Exception as e:
+			summary = {'address': address, 'status': 'failed', 'operations': {}, 'error': str(e)}
+		finally:
+			wallet_label.reset(token)
+
+		finished = time.time()
+		with self._lock:
+			self._running.pop(address, None)
+			self._recent.append({**summary, 'startedAt': int(started), 'finishedAt': int(finished)})
+
+		if summary['status'] == 'success':
+			self._push(self._nextRun(address, finished), address)
 		else:
-			executeOperation(operation, None, max_attempts, *extra_args)
+			logger.warning(f"Daily run of {address} failed, retrying in {DAEMON_RETRY // 60} minutes.")
+			self._push(finished + DAEMON_RETRY, address)
+
+	def status(self) -> dict:
+		now = time.time()
+		run_id = RunJournal.runId(0, now)
+		with self._lock:
+			running = [{'address': address, 'startedAt': int(started)} for address, started in self._running.items()]
+			upcoming = [{'address': address, 'at': int(due)} for due, address in heapq.nsmallest(10, self._schedule)]
+			recent = list(self._recent)[-20:]
+		return {
+			'startedAt': int(self.started),
+			'configLoadedAt': int(self.config_loaded),
+			'runId': run_id,
+			'wallets': len(self.wallets),
+			'workers': self.workers,
+			'completedToday': self.journal.completed(run_id),
+			'running': running,
+			'upcoming': upcoming,
+			'recent': recent
+		}
 
-	logger.info("--- Workflow completed ---")
+	def serve(self, port: int = DAEMON_STATUS_PORT, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+		"""
+		Serves the status as JSON on http://host:port/ and the metrics on /metrics, from a daemon thread.
+		"""
+		daemon = self
+
+		class _Handler(BaseHTTPRequestHandler):
+			def do_GET(self) -> None:
+				path = self.path.split("?")[0]
+				if path == "/metrics":
+					body, content_type = metrics.prometheus().encode(), "text/plain; version=0.0.4"
+				elif path in ("/", "/status"):
+					body, content_type = json.dumps(daemon.status(), indent=4).encode(), "application/json"
+				else:
+					self.send_error(404)
+					return
+				self.send_response(200)
+				self.send_header("Content-Type", content_type)
+				self.send_header("Content-Length", str(len(body)))
+				self.end_headers()
+				self.wfile.write(body)
+
+			def log_message(self, *args) -> None:
+				pass
+
+		server = ThreadingHTTPServer((host, port), _Handler)
+		threading.Thread(target=server.serve_forever, name="sfis-status", daemon=True).start()
+		logger.info(f"Serving daemon status on http://{host}:{server.server_address[1]}/")
+		return server
+
+	def _forget(self, future: Future) -> None:
+		with self._lock:
+			self._futures.discard(future)
+
+	def stop(self) -> None:
+		self._stopped.set()
+		self._wake.set()
+
+	def runForever(self) -> None:
+		"""
+		Schedules the wallets and runs them as they come due, until stop() is called.
+		Wallets already running finish before it returns.
+		"""
+		now = time.time()
+		for address in self.wallets:
+			self._push(self._nextRun(address, now), address)
+		logger.info(f"Daemon started with {len(self.wallets)} wallet(s) and {self.workers} worker(s).")
+
+		with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="wallet") as executor:
+			while not self._stopped.is_set():
+				self._wake.clear()
+				self._reloadConfig()
+
+				now = time.time()
+				submitted = []
+				with self._lock:
+					while self._schedule and self._schedule[0][0] <= now and len(self._running) < self.workers:
+						_, address = heapq.heappop(self._schedule)
+						self._running[address] = now
+						future = executor.submit(contextvars.copy_context().run, self._runWallet, address)
+						self._futures.add(future)
+						submitted.append(future)
+					wait = min(DAEMON_TICK, self._schedule[0][0] - now) if self._schedule and len(self._running) < self.workers else DAEMON_TICK
+				for future in submitted:
+					future.add_done_callback(self._forget)
+
+				self._wake.wait(max(wait, 0))
+
+			logger.info(f"Stopping, waiting for {len(self._running)} running wallet(s)...")
 
 
 def setup(auto: bool) -> None:
@@ -933,6 +4877,8 @@ def setup(auto: bool) -> None:
 				"stakeAmount": int(stakeAmount * 10**18),
 				"unstakeAmount": int(unstakeAmount * 10**18),
 				"bridgeAmount": int(bridgeAmount * 10**18),
+				"confirmations": 1,
+				"approveMax": False,
 				"citeaConfig": {
 					"pair": [first_token, second_token],
 					"swapAmount": int(swapAmount * 10**18),
@@ -962,22 +4908,69 @@ def setup(auto: bool) -> None:
 		print(f"An unexpected error occurred: {e}")
 
 
+def configureContext(config: dict) -> None:
+	"""
+	Applies the network settings from config.json to the process-wide chain context and rate limits.
+	"""
+	rate_limits.configure(config.get("rateLimits"))
+	ChainContext.configure(rpc_urls=config.get("rpcEndpoints"), ws_urls=config.get("wsEndpoints"), citea_fee_bps=config.get("citeaConfig", {}).get("feeBps", CITEA_FEE_BPS))
+
+
+def openJournal(config: dict, opr_type: int, args) -> tuple:
+	"""
+	Opens the run journal from config.json and works out which run to record to.
+	Only --resume or --run-id continue a run; otherwise the day's run is started over.
+	Prove and finalize passes aren't journaled; the withdrawal index already tracks their progress.
+	"""
+	if opr_type != 0:
+		return None, None
+
+	journal = RunJournal.shared(config.get("journalDb", JOURNAL_DB))
+	run_id = args.run_id or RunJournal.runId(opr_type)
+	if args.fresh or not (args.resume or args.run_id):
+		journal.clear(run_id)
+		logger.info(f"Journal run: {run_id} (pass --resume to continue it if this run is interrupted)")
+	else:
+		logger.warning(f"Resuming journal run {run_id}: {journal.completed(run_id)} wallet(s) that already completed it will be skipped.")
+	return journal, run_id
+
+
 def main():
 	parser = argparse.ArgumentParser(description='SingularityFinance Script v1', add_help=True)
 	parser.add_argument("-i", "--init", action="store_true", help="setup the script")
 	parser.add_argument("-a", "--auto", action="store_true", help="setup the script, using the pre-defined values")
 	parser.add_argument("-pk", type=str, help="run with a specified private key")
 	parser.add_argument("-f", "--file", type=str, help="read private keys from a file and run with each")
-	parser.add_argument("-P", "--prove", action="store_true", help="prove 5 most recently withdrawals")
-	parser.add_argument("-F", "--finalize", action="store_true", help="finalize 5 most recently withdrawals")
+	parser.add_argument("-P", "--prove", action="store_true", help="prove every indexed withdrawal that isn't proven yet")
+	parser.add_argument("-F", "--finalize", action="store_true", help="finalize every indexed withdrawal that isn't finalized yet")
+	parser.add_argument("-w", "--workers", type=int, help=f"number of wallets to run concurrently with -f (default: 1, or {ASYNC_CONCURRENCY} with --async)")
+	parser.add_argument("--pipeline", action="store_true", help="send independent transactions back-to-back and await their receipts together")
+	parser.add_argument("--async", dest="use_async", action="store_true", help="run wallets on the asyncio engine, with --workers wallets in flight")
+	parser.add_argument("--resume", action="store_true", help="resume today's journal run instead of starting it over, skipping wallets that completed it")
+	parser.add_argument("--run-id", type=str, help="journal run to resume (implies --resume)")
+	parser.add_argument("--fresh", action="store_true", help="with --run-id, discard the journal of the run and start it over")
+	parser.add_argument("--metrics", type=str, help="write a JSON summary of RPC and HTTP calls per method, operation and wallet to this file at exit")
+	parser.add_argument("--metrics-port", type=int, help="serve call metrics in the Prometheus text format on this port while running")
+	parser.add_argument("--shard", type=parseShard, help="with -f, only run the wallets of shard i out of N, e.g. 0/4 (numbered from 0)")
+	parser.add_argument("--results", type=str, help="write the wallet summaries to this file (default with --shard: results-i-of-N.json)")
+	parser.add_argument("--merge", type=str, nargs="+", metavar="FILE", help="merge the results files of several shards, into --results if given")
+	parser.add_argument("--daemon", action="store_true", help="with -f, keep running and run each wallet's daily tasks at its own time of day")
+	parser.add_argument("--status-port", type=int, default=DAEMON_STATUS_PORT, help=f"local port of the daemon's status endpoint (default: {DAEMON_STATUS_PORT})")
 
 	args = parser.parse_args()
 
+	if args.metrics:
+		atexit.register(metrics.dump, args.metrics)
+	if args.metrics_port:
+		metrics.serve(args.metrics_port)
+
 	config = None
 	opr_type = 0
 
 	if args.init:
 		setup(auto=args.auto)
+	elif args.merge:
+		mergeResults(args.merge, args.results)
 	elif args.pk:
 		try:
 			with open("config.json", "r") as f:
@@ -992,7 +4985,13 @@ def main():
 		if args.prove: opr_type = 1
 		elif args.finalize: opr_type = 2
 
-		run(args.pk, config, opr_type)
+		configureContext(config)
+		journal, run_id = openJournal(config, opr_type, args)
+
+		if args.use_async:
+			asyncio.run(runManyAsync([args.pk], config, opr_type, journal=journal, run_id=run_id))
+		else:
+			run(args.pk, config, opr_type, args.pipeline, journal, run_id)
 	elif args.file:
 		try:
 			with open("config.json", "r") as f:
@@ -1007,12 +5006,37 @@ def main():
 		if args.prove: opr_type = 1
 		elif args.finalize: opr_type = 2
 
+		if args.daemon and opr_type != 0:
+			print("--daemon only runs the daily tasks, not -P or -F.")
+			return
+
+		configureContext(config)
+		journal, run_id = openJournal(config, opr_type, args)
+
+		results = args.results or (RESULTS_FILE.format(index=args.shard[0], count=args.shard[1]) if args.shard else None)
+
 		# Read private keys from file
 		with open(args.file, "r") as f:
-			private_keys = f.readlines()
+			private_keys = (line.strip() for line in f if line.strip())
+			if args.shard:
+				logger.info(f"Running shard {args.shard[0]}/{args.shard[1]}")
+				private_keys = shardKeys(private_keys, *args.shard)
+
+			if args.daemon:
+				daemon = Daemon(private_keys, "config.json", args.workers or 1, args.pipeline, journal)
+			elif args.use_async:
+				asyncio.run(runManyAsync(private_keys, config, opr_type, args.workers or ASYNC_CONCURRENCY, journal, run_id, RunReport(results, args.shard, run_id)))
+			else:
+				runMany(private_keys, config, opr_type, args.workers or 1, args.pipeline, journal, run_id, RunReport(results, args.shard, run_id))
 
-		for pk in private_keys:
-			run(pk.strip(), config, opr_type)
+		if args.daemon:
+			signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+			daemon.serve(args.status_port)
+			try:
+				daemon.runForever()
+			except KeyboardInterrupt:
+				daemon.stop()
+			return
 	else:
 		print("Invalid arguments. Use -h or --help for usage information.")
 
@@ -0,0 +1,140 @@
+import time
+
+import pytest
+import requests
+
+from sfis import EndpointPool, PooledHTTPProvider, rate_limits, wallet_label
+
+URLS = ["https://a.example", "https://b.example", "https://c.example"]
+
+
+class FakeEndpoint:
+	"""
+	Stands in for an HTTPProvider: answers with `result` (a whole response when it is a dict), or raises `error`.
+	"""
+	def __init__(self, result=None, error: Exception = None) -> None:
+		self.result = result
+		self.error = error
+		self.calls = 0
+
+	def make_request(self, method, params):
+		self.calls += 1
+		if self.error is not None:
+			raise self.error
+		if isinstance(self.result, dict):
+			return self.result
+		return {'jsonrpc': "2.0", 'id': 1, 'result': self.result}
+
+
+@pytest.fixture(autouse=True)
+def unlimited():
+	rate_limits.configure({"default": {"rps": 0}})
+	yield
+	rate_limits.configure()
+
+
+def pooled(*endpoints: FakeEndpoint) -> PooledHTTPProvider:
+	provider = PooledHTTPProvider(EndpointPool("sfi", URLS[:len(endpoints)]))
+	provider._providers = dict(zip(URLS, endpoints))
+	return provider
+
+
+def test_fails_over_to_the_next_endpoint():
+	down, up = FakeEndpoint(error=requests.ConnectionError("refused")), FakeEndpoint("0x10")
+	provider = pooled(down, up)
+	provider.pool.succeeded(provider.pool.endpoints[0], 0.001)
+	provider.pool.succeeded(provider.pool.endpoints[1], 10)
+
+	assert provider.make_request("eth_blockNumber", [])['result'] == "0x10"
+	assert not provider.pool.endpoints[0].healthy(time.monotonic())
+
+	# The failed endpoint is only tried last until its cooldown ends.
+	assert provider.pool.candidates("eth_blockNumber")[-1] is provider.pool.endpoints[0]
+	provider.make_request("eth_blockNumber", [])
+	assert (down.calls, up.calls) == (1, 2)
+
+
+def test_rate_limited_responses_fail_over():
+	limited = FakeEndpoint({'jsonrpc': "2.0", 'id': 1, 'error': {'code': -32005, 'message': "limit exceeded"}})
+	up = FakeEndpoint("0x10")
+	provider = pooled(limited, up)
+	provider.pool.endpoints[1].down_until = time.monotonic() + 60
+
+	assert provider.make_request("eth_blockNumber", [])['result'] == "0x10"
+	assert provider.pool.endpoints[0].failures == 1
+
+
+def test_server_errors_fail_over():
+	response = requests.Response()
+	response.status_code = 503
+	provider = pooled(FakeEndpoint(error=requests.HTTPError("503", response=response)), FakeEndpoint("0x10"))
+	provider.pool.endpoints[1].down_until = time.monotonic() + 60
+
+	assert provider.make_request("eth_blockNumber", [])['result'] == "0x10"
+
+
+def test_request_errors_are_not_retried_elsewhere():
+	first, second = FakeEndpoint(error=ValueError("bad params")), FakeEndpoint("0x10")
+	provider = pooled(first, second)
+	provider.pool.endpoints[1].down_until = time.monotonic() + 60
+
+	with pytest.raises(ValueError):
+		provider.make_request("eth_call", [])
+	assert second.calls == 0
+	assert provider.pool.endpoints[0].failures == 0
+
+
+def test_raises_when_every_endpoint_fails():
+	provider = pooled(FakeEndpoint(error=requests.Timeout("a")), FakeEndpoint(error=requests.Timeout("b")))
+
+	with pytest.raises(requests.Timeout):
+		provider.make_request("eth_blockNumber", [])
+	assert all(endpoint.failures == 1 for endpoint in provider.pool.endpoints)
+
+
+def test_recovered_endpoints_are_healthy_again():
+	pool = EndpointPool("sfi", URLS)
+	endpoint = pool.endpoints[0]
+	pool.failed(endpoint, "timed out")
+	pool.failed(endpoint, "timed out")
+	assert endpoint.failures == 2
+
+	pool.succeeded(endpoint, 0.05)
+	assert endpoint.failures == 0
+	assert endpoint.healthy(time.monotonic())
+
+
+def test_writes_stick_to_one_endpoint_per_wallet():
+	pool = EndpointPool("sfi", URLS)
+	wallet_label.set("#1")
+	first = pool.candidates("eth_sendRawTransaction")[0]
+
+	assert all(pool.candidates("eth_getTransactionCount")[0] is first for _ in range(20))
+
+	pool.failed(first, "refused")
+	moved = pool.candidates("eth_sendRawTransaction")[0]
+	assert moved is not first
+	assert pool.candidates("eth_sendRawTransaction")[0] is moved
+
+
+def test_faster_endpoints_are_preferred():
+	pool = EndpointPool("sfi", URLS[:2])
+	fast, slow = pool.endpoints
+	pool.succeeded(fast, 0.01)
+	pool.succeeded(slow, 1.0)
+
+	firsts = [pool.candidates("eth_call")[0] for _ in range(200)]
+	assert firsts.count(fast) > 150
+
+
+def test_health_checks_mark_lagging_and_dead_endpoints():
+	pool = EndpointPool("sfi", URLS)
+	ahead, behind, dead = pool.endpoints
+
+	pool.checked([(ahead, 0.02, 1000), (behind, 0.01, 980), (dead, None, None)])
+
+	now = time.monotonic()
+	assert ahead.healthy(now) and ahead.latency == 0.02
+	assert not behind.healthy(now)
+	assert not dead.healthy(now)
+	assert pool.candidates("eth_call")[0] is ahead
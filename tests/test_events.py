@@ -0,0 +1,99 @@
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+
+from sfis import PAIR_ABI, EventDecoder, EventRegistry, loadABI
+
+MSGPASSER_ABI = loadABI("msgpasser")
+MESSAGE_PASSED = next(item for item in MSGPASSER_ABI if item.get('name') == "MessagePassed")
+SENDER = "0x00000000000000000000000000000000000000Aa"
+TARGET = "0x00000000000000000000000000000000000000bB"
+PAIR = "0x0000000000000000000000000000000000000C0c"
+
+
+def topic(signature: str) -> HexBytes:
+	return HexBytes(Web3.keccak(text=signature))
+
+
+def messagePassedLog(log_index: int = 0) -> dict:
+	return {
+		'address': "0x4200000000000000000000000000000000000016",
+		'logIndex': log_index,
+		'topics': [
+			topic("MessagePassed(uint256,address,address,uint256,uint256,bytes,bytes32)"),
+			HexBytes(encode(['uint256'], [42])),
+			HexBytes(encode(['address'], [SENDER])),
+			HexBytes(encode(['address'], [TARGET])),
+		],
+		'data': HexBytes(encode(['uint256', 'uint256', 'bytes', 'bytes32'], [10**18, 100000, b"\x01\x02", b"\x33" * 32])),
+	}
+
+
+def syncLog(reserve0: int, reserve1: int, log_index: int = 1) -> dict:
+	return {
+		'address': PAIR,
+		'logIndex': log_index,
+		'topics': [topic("Sync(uint112,uint112)")],
+		'data': HexBytes(encode(['uint112', 'uint112'], [reserve0, reserve1])),
+	}
+
+
+def test_decoder_matches_web3():
+	log = {**messagePassedLog(), 'blockHash': HexBytes(b"\x00" * 32), 'blockNumber': 1, 'transactionHash': HexBytes(b"\x00" * 32), 'transactionIndex': 0}
+	expected = Web3().eth.contract(abi=MSGPASSER_ABI).events.MessagePassed().process_log(log)['args']
+
+	decoded = EventDecoder(MESSAGE_PASSED).decode(log)
+
+	assert decoded['nonce'] == expected['nonce'] == 42
+	assert decoded['sender'].lower() == expected['sender'].lower()
+	assert decoded['target'].lower() == expected['target'].lower()
+	assert decoded['value'] == expected['value'] == 10**18
+	assert decoded['gasLimit'] == expected['gasLimit']
+	assert decoded['data'] == expected['data'] == b"\x01\x02"
+	assert decoded['withdrawalHash'] == expected['withdrawalHash']
+
+
+def test_indexed_dynamic_values_decode_as_their_hash():
+	decoder = EventDecoder({'name': "Named", 'type': "event", 'inputs': [{'name': "label", 'type': "string", 'indexed': True}]})
+	hashed = Web3.keccak(text="hello")
+	log = {'topics': [topic("Named(string)"), hashed], 'data': b""}
+
+	assert decoder.decode(log) == {'label': bytes(hashed)}
+
+
+def test_registry_decodes_known_logs_in_one_pass():
+	registry = EventRegistry([PAIR_ABI, MSGPASSER_ABI])
+	unknown = {'address': PAIR, 'logIndex': 2, 'topics': [topic("Unknown()")], 'data': b""}
+	receipt = {'logs': [messagePassedLog(0), syncLog(5, 7), unknown, {'address': PAIR, 'topics': [], 'data': b""}]}
+
+	events = registry.decodeReceipt(receipt)
+
+	assert [event['event'] for event in events] == ["MessagePassed", "Sync"]
+	assert events[1] == {'event': "Sync", 'address': PAIR, 'logIndex': 1, 'args': {'reserve0': 5, 'reserve1': 7}}
+
+
+def test_registry_filters_by_event():
+	registry = EventRegistry([PAIR_ABI, MSGPASSER_ABI])
+	receipt = {'logs': [syncLog(1, 2), messagePassedLog(3)]}
+
+	events = registry.decodeReceipt(receipt, "MessagePassed")
+
+	assert len(events) == 1
+	assert events[0]['args']['nonce'] == 42
+
+
+def test_unregistered_events_are_skipped():
+	registry = EventRegistry([PAIR_ABI])
+
+	assert registry.decodeReceipt({'logs': [messagePassedLog()]}) == []
+
+
+def test_decode_receipts_is_lazy():
+	registry = EventRegistry([PAIR_ABI])
+	receipts = iter([{'logs': [syncLog(1, 2)]}, {'logs': []}])
+
+	decoded = registry.decodeReceipts(receipts)
+	receipt, events = next(decoded)
+
+	assert events[0]['args'] == {'reserve0': 1, 'reserve1': 2}
+	assert next(receipts) == {'logs': []}
@@ -0,0 +1,109 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from hexbytes import HexBytes
+from web3.exceptions import TransactionNotFound
+
+from sfis import RunJournal, reconcileJournal, reconcileJournalAsync
+
+ADDRESS = "0x00000000000000000000000000000000000000Aa"
+MINED, FAILED, DROPPED, APPROVAL = ("0x" + digit * 64 for digit in "1234")
+
+
+class FakeWallet:
+	"""
+	Stands in for SFI: knows which transactions the node has and how they ended.
+	"""
+	def __init__(self, statuses: dict) -> None:
+		self.statuses = statuses
+		self.sfi_web3 = SimpleNamespace(eth=SimpleNamespace(get_transaction=self._getTransaction))
+
+	def _getTransaction(self, tx_hash):
+		if tx_hash not in self.statuses:
+			raise TransactionNotFound(tx_hash)
+		return {'hash': tx_hash}
+
+	def _awaitReceipt(self, tx_hash, network, counted=True):
+		return {'status': self.statuses[HexBytes(tx_hash).to_0x_hex()]}
+
+
+class FakeAsyncWallet(FakeWallet):
+	def __init__(self, statuses: dict) -> None:
+		super().__init__(statuses)
+		self.context = SimpleNamespace(web3={'sfi': SimpleNamespace(eth=SimpleNamespace(get_transaction=self._getTransactionAsync))})
+
+	async def _getTransactionAsync(self, tx_hash):
+		return self._getTransaction(tx_hash)
+
+	async def _awaitReceipt(self, tx_hash, network, counted=True):
+		return super()._awaitReceipt(tx_hash, network, counted)
+
+
+@pytest.fixture
+def journal():
+	wallet = RunJournal(":memory:").wallet("2026-01-01/0", ADDRESS)
+	wallet.operation = "wrap"
+	wallet.record("wrap", 1)
+	wallet.sent(MINED, "sfi")
+	wallet.sent(FAILED, "sfi")
+	wallet.sent(DROPPED, "sfi")
+	wallet.operation = "stake"
+	wallet.sent(APPROVAL, "sfi", counted=False)
+	return wallet
+
+
+STATUSES = {MINED: 'success', FAILED: 'failed', APPROVAL: 'success'}
+
+
+def test_record_drops_counted_transactions():
+	wallet = RunJournal(":memory:").wallet("run", ADDRESS)
+	wallet.operation = "wrap"
+	wallet.sent(MINED, "sfi")
+	wallet.sent(APPROVAL, "sfi", counted=False)
+
+	wallet.record("wrap", 1)
+
+	assert wallet.successes() == {'wrap': 1}
+	assert wallet.inflight() == [(APPROVAL, "sfi", "wrap", False)]
+
+
+def test_reconcile_credits_mined_transactions(journal):
+	reconcileJournal(FakeWallet(STATUSES), journal)
+
+	assert journal.successes() == {'wrap': 2}
+	assert journal.inflight() == []
+
+
+def test_reconcile_async(journal):
+	asyncio.run(reconcileJournalAsync(FakeAsyncWallet(STATUSES), journal))
+
+	assert journal.successes() == {'wrap': 2}
+	assert journal.inflight() == []
+
+
+def test_reconcile_without_inflight_does_nothing():
+	wallet = RunJournal(":memory:").wallet("run", ADDRESS)
+
+	reconcileJournal(FakeWallet({}), wallet)
+
+	assert wallet.successes() == {}
+
+
+def test_runs_are_separate_and_can_be_cleared():
+	journal = RunJournal(":memory:")
+	journal.wallet("a", ADDRESS).complete()
+	journal.wallet("b", ADDRESS).record("wrap", 2)
+
+	assert journal.wallet("a", ADDRESS).isComplete()
+	assert not journal.wallet("b", ADDRESS).isComplete()
+	assert journal.completed("a") == 1
+
+	journal.clear("a")
+	assert journal.completed("a") == 0
+	assert journal.wallet("b", ADDRESS).successes() == {'wrap': 2}
+
+
+def test_run_id_is_per_day_and_mode():
+	assert RunJournal.runId(0, at=0) == "1970-01-01/0"
+	assert RunJournal.runId(1, at=86400 * 2 - 1) == "1970-01-02/1"
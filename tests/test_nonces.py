@@ -0,0 +1,72 @@
+import threading
+from types import SimpleNamespace
+
+from sfis import NonceManager
+
+
+class FakeEth:
+	def __init__(self, count: int) -> None:
+		self.count = count
+		self.calls = 0
+
+	def get_transaction_count(self, address, block_identifier):
+		assert block_identifier == 'pending'
+		self.calls += 1
+		return self.count
+
+
+def fakeWeb3(count: int = 0):
+	return SimpleNamespace(eth=FakeEth(count))
+
+
+def test_allocate_seeds_once_then_increments():
+	nonces = NonceManager()
+	web3 = fakeWeb3(7)
+
+	assert [nonces.allocate(web3, "0xa", "sfi") for _ in range(3)] == [7, 8, 9]
+	assert web3.eth.calls == 1
+
+
+def test_accounts_and_networks_are_separate():
+	nonces = NonceManager()
+	sfi, sep = fakeWeb3(3), fakeWeb3(40)
+
+	assert nonces.allocate(sfi, "0xa", "sfi") == 3
+	assert nonces.allocate(sep, "0xa", "sep") == 40
+	assert nonces.allocate(sfi, "0xb", "sfi") == 3
+	assert nonces.allocate(sfi, "0xa", "sfi") == 4
+
+
+def test_resync_reseeds_from_chain():
+	nonces = NonceManager()
+	web3 = fakeWeb3(5)
+	nonces.allocate(web3, "0xa", "sfi")
+	nonces.allocate(web3, "0xa", "sfi")
+
+	# e.g. the second transaction was dropped
+	web3.eth.count = 6
+	assert nonces.resync(web3, "0xa", "sfi") == 6
+	assert nonces.allocate(web3, "0xa", "sfi") == 6
+	assert web3.eth.calls == 2
+
+
+def test_concurrent_allocations_are_unique():
+	nonces = NonceManager()
+	web3 = fakeWeb3(0)
+	allocated = []
+	lock = threading.Lock()
+
+	def _allocate():
+		for _ in range(50):
+			nonce = nonces.allocate(web3, "0xa", "sfi")
+			with lock:
+				allocated.append(nonce)
+
+	threads = [threading.Thread(target=_allocate) for _ in range(8)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	assert sorted(allocated) == list(range(400))
+	assert web3.eth.calls == 1
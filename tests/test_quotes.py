@@ -0,0 +1,53 @@
+import pytest
+
+from sfis import getAmountsIn, getAmountsOut, getBurnAmounts, sortTokens
+
+
+def test_amounts_out_single_hop():
+	# 1000 in against 1M/1M reserves with the 0.3% fee
+	assert getAmountsOut(1000, [(10**6, 10**6)]) == [1000, 996]
+
+
+def test_amounts_out_without_fee():
+	assert getAmountsOut(100, [(1000, 1000)], fee_bps=0) == [100, 90]
+
+
+def test_amounts_out_multi_hop():
+	assert getAmountsOut(1000, [(10**6, 10**6), (10**6, 2 * 10**6)]) == [1000, 996, 1984]
+
+
+def test_amounts_in_single_hop():
+	assert getAmountsIn(996, [(10**6, 10**6)]) == [1000, 996]
+
+
+def test_amounts_in_multi_hop():
+	reserves = [(10**6, 10**6), (10**6, 2 * 10**6)]
+	amounts = getAmountsIn(1984, reserves)
+
+	assert amounts[-1] == 1984
+	assert getAmountsOut(amounts[0], reserves)[-1] >= 1984
+
+
+@pytest.mark.parametrize("amount_out", [1, 17, 996, 12345, 400000])
+@pytest.mark.parametrize("reserves", [[(10**6, 10**6)], [(5 * 10**18, 3 * 10**6)], [(10**6, 10**6), (7 * 10**5, 9 * 10**5)]])
+def test_amounts_in_buys_at_least_amount_out(amount_out, reserves):
+	amount_in = getAmountsIn(amount_out, reserves)[0]
+
+	assert getAmountsOut(amount_in, reserves)[-1] >= amount_out
+	# The router rounds the input up by at most one wei, so two less is too little.
+	assert getAmountsOut(amount_in - 2, reserves)[-1] < amount_out
+
+
+def test_burn_amounts_are_pro_rata():
+	assert getBurnAmounts(25, 1000, 400, 800) == (10, 20)
+
+
+def test_burn_amounts_round_down():
+	assert getBurnAmounts(1, 3, 10, 10) == (3, 3)
+
+
+def test_sort_tokens_by_address():
+	low, high = "0x00000000000000000000000000000000000000aa", "0x0000000000000000000000000000000000000Bbb"
+
+	assert sortTokens(high, low) == (low, high)
+	assert sortTokens(low, high) == (low, high)
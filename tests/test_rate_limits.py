@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+
+from sfis import RateLimits, TokenBucket, wallet_label
+
+
+def test_burst_is_served_without_waiting():
+	bucket = TokenBucket(rate=1, burst=3)
+	start = time.monotonic()
+	for _ in range(3):
+		bucket.acquire()
+	assert time.monotonic() - start < 0.1
+
+
+def test_waiters_are_served_round_robin_across_wallets():
+	bucket = TokenBucket(rate=20, burst=1)
+	bucket.acquire()
+	served = []
+	lock = threading.Lock()
+
+	def _acquire(wallet: str) -> None:
+		wallet_label.set(wallet)
+		bucket.acquire()
+		with lock:
+			served.append(wallet)
+
+	# A busy wallet queues four requests before a second wallet asks for one.
+	threads = [threading.Thread(target=_acquire, args=("busy",)) for _ in range(4)]
+	for thread in threads:
+		thread.start()
+	time.sleep(0.02)
+	threads.append(threading.Thread(target=_acquire, args=("quiet",)))
+	threads[-1].start()
+	for thread in threads:
+		thread.join()
+
+	assert served == ["busy", "quiet", "busy", "busy", "busy"]
+
+
+def test_async_waiters_share_the_bucket():
+	bucket = TokenBucket(rate=50, burst=1)
+
+	async def _main() -> float:
+		start = time.monotonic()
+		await asyncio.gather(*(bucket.acquireAsync() for _ in range(6)))
+		return time.monotonic() - start
+
+	# One token from the burst, then five at 50 per second.
+	assert asyncio.run(_main()) >= 0.09
+
+
+def test_throttle_empties_the_bucket():
+	bucket = TokenBucket(rate=20, burst=5)
+	bucket.throttle()
+	start = time.monotonic()
+	bucket.acquire()
+	assert time.monotonic() - start >= 0.04
+
+
+def test_limits_are_per_host():
+	limits = RateLimits()
+	limits.configure({"default": {"rps": 5, "burst": 10}, "api.gelato.digital": {"rps": 2}})
+
+	assert limits.bucket("https://a.example/rpc") is limits.bucket("https://a.example/other")
+	assert limits.bucket("https://a.example/rpc") is not limits.bucket("https://b.example/rpc")
+	assert limits.bucket("https://a.example/rpc").burst == 10
+	# Host settings override the default ones they set.
+	gelato = limits.bucket("https://api.gelato.digital/raas")
+	assert (gelato.rate, gelato.burst) == (2, 10)
+
+
+def test_zero_rps_disables_limiting():
+	limits = RateLimits()
+	limits.configure({"localhost:8545": {"rps": 0}})
+
+	assert limits.bucket("http://localhost:8545") is None
+	limits.acquire("http://localhost:8545")
+	limits.throttle("http://localhost:8545")
@@ -0,0 +1,137 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+from web3.exceptions import TimeExhausted
+
+from sfis import RetryPolicy, classifyFailure, failureResult
+
+
+def failed(error: str = "", **fields) -> dict:
+	return {'status': 'failed', 'error': error, **fields}
+
+
+@pytest.mark.parametrize("result, kind", [
+	(failed("transaction underpriced"), "underpriced"),
+	(failed("max fee per gas less than block base fee"), "underpriced"),
+	(failed("nonce too low: next nonce 4, tx nonce 3"), "nonce"),
+	(failed("insufficient funds for gas * price + value"), "funds"),
+	(failed("Too Many Requests"), "rateLimit"),
+	(failed("Read timed out."), "timeout"),
+	(failed("already claimed", permanent=True), "permanent"),
+	({'status': 'failed', 'tx': "ab" * 32}, "revert"),
+	(failed("something else"), "other"),
+])
+def test_classify_by_message(result, kind):
+	assert classifyFailure(result) == kind
+
+
+@pytest.mark.parametrize("result, kind", [
+	(failed("429 Client Error", httpStatus=429), "rateLimit"),
+	(failed("request failed", code=-32005), "rateLimit"),
+	(failed("502 Server Error", httpStatus=502), "timeout"),
+	(failed("anything", timeout=True), "timeout"),
+])
+def test_classify_by_status_code_and_exception(result, kind):
+	assert classifyFailure(result) == kind
+
+
+@pytest.mark.parametrize("error, kind", [
+	("execution reverted: amount 4290 exceeds limit", "revert"),
+	("execution reverted: connection not allowed", "revert"),
+	("HTTP 400: invalid request", "other"),
+])
+def test_numbers_and_words_in_messages_are_not_misclassified(error, kind):
+	assert classifyFailure(failed(error)) == kind
+
+
+def test_failure_result_carries_http_status():
+	response = requests.Response()
+	response.status_code = 429
+	result = failureResult(requests.HTTPError("429 Client Error", response=response))
+
+	assert result['httpStatus'] == 429
+	assert classifyFailure(result) == "rateLimit"
+
+
+def test_failure_result_marks_timeouts():
+	result = failureResult(TimeExhausted("Transaction 0x01 is not in the chain after 120 seconds"))
+
+	assert result['timeout'] is True
+	assert classifyFailure(result) == "timeout"
+
+
+def test_nonce_and_underpriced_retry_at_once():
+	wallet = SimpleNamespace(fee_bump=0)
+	policy = RetryPolicy(wallet)
+	policy.begin("wrap")
+
+	assert policy.failed("wrap", failed("nonce too low")) == 0.0
+	assert policy.failed("wrap", failed("transaction underpriced")) == 0.0
+	assert wallet.fee_bump == 1
+
+	policy.succeeded("wrap")
+	assert wallet.fee_bump == 0
+
+
+def test_backoff_grows_with_consecutive_failures():
+	policy = RetryPolicy()
+	policy.begin("swap")
+
+	first = policy.failed("swap", failed("Read timed out."))
+	second = policy.failed("swap", failed("Read timed out."))
+	assert 0 < first <= 2
+	assert 2 <= second <= 4
+
+
+def test_insufficient_funds_abandons_the_wallet():
+	policy = RetryPolicy()
+	policy.begin("stake")
+
+	assert policy.failed("stake", failed("insufficient funds for gas")) is None
+	assert policy.abandoned == "Insufficient funds during stake"
+
+
+def test_permanent_failures_are_not_retried():
+	policy = RetryPolicy()
+	policy.begin("crymboTravelRules")
+
+	assert policy.failed("crymboTravelRules", failed("Already added", permanent=True)) is None
+	assert policy.abandoned is None
+
+
+def test_gives_up_after_max_attempts():
+	policy = RetryPolicy(settings={"maxAttempts": 3})
+	policy.begin("claim")
+
+	delays = [policy.failed("claim", failed("nonce too low")) for _ in range(3)]
+	assert delays == [0.0, 0.0, None]
+
+
+def test_operation_budget_stops_backoff():
+	policy = RetryPolicy(settings={"operationBudget": 1})
+	policy.begin("unwrap")
+
+	# The first backoff is at least 1 second, which doesn't fit the budget.
+	assert policy.failed("unwrap", failed("Read timed out.")) is None
+
+
+def test_wallet_budget_expires():
+	policy = RetryPolicy(settings={"walletBudget": 0})
+
+	assert policy.expired()
+	assert policy.abandoned == "Wallet budget of 0s exhausted"
+
+
+def test_report_counts_attempts_per_class():
+	policy = RetryPolicy()
+	policy.begin("wrap")
+	policy.failed("wrap", failed("nonce too low"), seconds=0.5)
+	policy.failed("wrap", failed("nonce too low"), seconds=0.25)
+	policy.failed("wrap", failed("insufficient funds"), seconds=1)
+
+	report = policy.report()
+	assert report['attempts'] == 3
+	assert report['seconds'] == 1.75
+	assert report['classes']['nonce'] == {'attempts': 2, 'seconds': 0.75}
+	assert report['classes']['funds'] == {'attempts': 1, 'seconds': 1.0}
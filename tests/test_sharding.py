@@ -0,0 +1,89 @@
+import argparse
+import json
+import logging
+
+import pytest
+
+from sfis import RunReport, mergeResults, parseShard, shardKeys, shardOf
+
+KEYS = ["0x" + f"{i:064x}" for i in range(1, 201)]
+
+
+@pytest.mark.parametrize("text, shard", [("0/4", (0, 4)), ("3/4", (3, 4)), ("0/1", (0, 1))])
+def test_parse_shard(text, shard):
+	assert parseShard(text) == shard
+
+
+@pytest.mark.parametrize("text", ["4/4", "-1/4", "1/0", "1", "a/b", "1/2/3", ""])
+def test_parse_shard_rejects_invalid(text):
+	with pytest.raises(argparse.ArgumentTypeError):
+		parseShard(text)
+
+
+def test_shard_is_stable():
+	# Pinned: every machine and every release must split a key file the same way.
+	assert shardOf("0x" + "11" * 32, 4) == 3
+	assert shardOf("0x" + "22" * 32, 4) == 3
+	assert shardOf("0x" + "33" * 32, 4) == 0
+
+
+def test_shard_ignores_key_prefix():
+	assert all(shardOf(key, 7) == shardOf(key[2:], 7) for key in KEYS[:20])
+
+
+def test_invalid_keys_land_in_shard_zero():
+	assert shardOf("not a key", 4) == 0
+
+
+def test_shards_cover_every_key_once():
+	shards = [list(shardKeys(iter(KEYS), index, 4)) for index in range(4)]
+
+	assert sorted(key for shard in shards for key in shard) == sorted(KEYS)
+	# A stable hash spreads the keys roughly evenly.
+	assert all(20 <= len(shard) <= 80 for shard in shards)
+
+
+def test_shard_keys_is_lazy():
+	keys = iter(KEYS)
+	next(shardKeys(keys, shardOf(KEYS[0], 4), 4))
+
+	assert next(keys) == KEYS[1]
+
+
+def writeShard(path, shard: tuple, summaries: list) -> str:
+	report = RunReport(str(path), shard, "run")
+	for summary in summaries:
+		report.add(summary)
+	report.close()
+	return str(path)
+
+
+def test_merge_results(tmp_path, caplog):
+	first = writeShard(tmp_path / "results-0-of-3.json", (0, 3), [
+		{'address': "0xB", 'status': 'failed', 'operations': {'wrap': 1}},
+		{'address': None, 'status': 'failed', 'operations': {}, 'error': "Invalid key"},
+	])
+	second = writeShard(tmp_path / "results-1-of-3.json", (1, 3), [
+		{'address': "0xA", 'status': 'success', 'operations': {'wrap': 2}},
+		{'address': "0xB", 'status': 'success', 'operations': {'wrap': 2}},
+	])
+	output = tmp_path / "results.json"
+
+	with caplog.at_level(logging.WARNING):
+		merged = mergeResults([first, second], str(output))
+
+	assert [summary['address'] for summary in merged] == ["0xA", "0xB", None]
+	assert merged[1]['status'] == 'success'
+	assert json.loads(output.read_text())['summaries'] == merged
+	assert "Missing results for shard(s): 2." in caplog.text
+
+
+def test_merge_warns_about_repeated_shards(tmp_path, caplog):
+	first = writeShard(tmp_path / "a.json", (0, 2), [])
+	second = writeShard(tmp_path / "b.json", (0, 2), [])
+
+	with caplog.at_level(logging.WARNING):
+		mergeResults([first, second])
+
+	assert "Shard 0/2 appears in both" in caplog.text
+	assert "Missing results for shard(s): 1." in caplog.text
@@ -0,0 +1,105 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from sfis import WalletBase, WithdrawalIndex
+
+ADDRESS = "0x00000000000000000000000000000000000000Aa"
+FIRST, SECOND, THIRD = "0x" + "01" * 32, "0x" + "02" * 32, "0x" + "03" * 32
+
+
+@pytest.fixture
+def index():
+	return WithdrawalIndex(":memory:")
+
+
+def test_new_withdrawals_start_initiated(index):
+	assert index.add(ADDRESS, [FIRST, SECOND]) == 2
+	assert index.add(ADDRESS, [SECOND, THIRD]) == 1
+
+	assert index.pending(ADDRESS, ("initiated",)) == [FIRST, SECOND, THIRD]
+	assert index.counts(ADDRESS) == {'initiated': 3, 'proven': 0, 'finalized': 0}
+
+
+def test_hashes_are_normalized(index):
+	index.add(ADDRESS, [FIRST.upper().replace("0X", "0x"), bytes.fromhex(FIRST[2:])])
+
+	assert index.pending(ADDRESS, ("initiated",)) == [FIRST]
+
+
+def test_states_advance(index):
+	index.add(ADDRESS, [FIRST, SECOND])
+
+	index.update(ADDRESS, FIRST, 100, "proven")
+	assert index.pending(ADDRESS, ("initiated",)) == [SECOND]
+	assert index.pending(ADDRESS, ("proven",)) == [FIRST]
+
+	index.update(ADDRESS, FIRST, 200, "finalized")
+	assert index.pending(ADDRESS, ("initiated", "proven")) == [SECOND]
+	assert index.counts(ADDRESS) == {'initiated': 1, 'proven': 0, 'finalized': 1}
+
+
+def test_update_without_state_keeps_it(index):
+	index.add(ADDRESS, [FIRST])
+	index.update(ADDRESS, FIRST, 100, "proven")
+	index.update(ADDRESS, FIRST, 101)
+
+	assert index.pending(ADDRESS, ("proven",)) == [FIRST]
+
+
+def test_withdrawals_checked_at_the_head_are_skipped(index):
+	index.add(ADDRESS, [FIRST, SECOND])
+	index.update(ADDRESS, FIRST, 100)
+
+	assert index.pending(ADDRESS, ("initiated",), head=100) == [SECOND]
+	assert index.pending(ADDRESS, ("initiated",), head=101) == [FIRST, SECOND]
+
+
+def test_addresses_are_separate(index):
+	index.add(ADDRESS, [FIRST])
+	index.add("0x00000000000000000000000000000000000000bB", [SECOND])
+
+	assert index.pending(ADDRESS, ("initiated",)) == [FIRST]
+
+
+def test_sync_freshness(index):
+	assert not index.synced(ADDRESS)
+	index.add(ADDRESS, [], checked_block=100)
+
+	assert index.synced(ADDRESS)
+	assert not index.synced(ADDRESS, max_age=0)
+
+
+def test_sync_expires(index, monkeypatch):
+	index.add(ADDRESS, [], checked_block=100)
+	later = time.time() + 3601
+	monkeypatch.setattr(time, "time", lambda: later)
+
+	assert not index.synced(ADDRESS)
+
+
+def test_index_persists(tmp_path):
+	path = str(tmp_path / "withdrawals.db")
+	WithdrawalIndex(path).add(ADDRESS, [FIRST])
+
+	assert WithdrawalIndex(path).pending(ADDRESS, ("initiated",)) == [FIRST]
+
+
+def test_wallet_records_results(index):
+	wallet = WalletBase("0x" + "11" * 32, SimpleNamespace(contracts={}), withdrawals=index)
+	wallet._indexWithdrawals([{'transactionHash': FIRST}, {'transactionHash': SECOND}], head=100)
+
+	wallet._recordWithdrawal(FIRST, {'status': 'success'}, 100, "proven")
+	wallet._recordWithdrawal(SECOND, {'status': 'failed', 'error': 'Failed to retrieve output index.'}, 100, "proven")
+
+	assert index.pending(wallet.address, ("proven",)) == [FIRST]
+	assert index.pending(wallet.address, ("initiated",)) == [SECOND]
+	assert index.pending(wallet.address, ("initiated",), head=100) == []
+
+
+def test_wallet_index_opens_lazily():
+	wallet = WalletBase("0x" + "11" * 32, SimpleNamespace(contracts={}))
+
+	assert wallet._withdrawals is None
+	assert wallet.withdrawals is wallet.withdrawals